@@ -0,0 +1,291 @@
+import os
+import json
+import uuid
+import time
+import asyncio
+import logging
+import argparse
+import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select, update, delete, func, bindparam, or_
+from sqlalchemy.exc import IntegrityError, OperationalError, DBAPIError
+
+import models
+import booking
+import catalogue
+import snapshots
+from database import SessionLocal, begin_batch
+
+logger = logging.getLogger(__name__)
+
+# --- [신청 폭주 대응: 예약 접수 대기열] ---
+# 노선 이름에 이 문자열이 들어가거나 ADMISSION_ROUTE_IDS에 있는 노선은 대기열로 접수합니다.
+ADMISSION_ROUTE_KEYWORD = os.getenv("ADMISSION_ROUTE_KEYWORD", "※신청전용")
+ADMISSION_ROUTE_IDS = {int(x) for x in os.getenv("ADMISSION_ROUTE_IDS", "").split(",") if x.strip()}
+ADMISSION_BATCH_SIZE = int(os.getenv("ADMISSION_BATCH_SIZE", "50"))
+# 처리 결과를 ticket id로 조회할 수 있는 시간(초). 지난 결과는 작업자가 지웁니다.
+ADMISSION_RESULT_TTL = float(os.getenv("ADMISSION_RESULT_TTL", "3600"))
+# 접수가 없어도 대기 중인 ticket을 확인하는 간격(초). 다른 인스턴스에서 접수된 ticket도 이 주기로 가져옵니다.
+ADMISSION_WORKER_INTERVAL = float(os.getenv("ADMISSION_WORKER_INTERVAL", "5"))
+# processing인 채로 이 시간(초)이 지난 ticket은 작업자가 중간에 죽은 것으로 보고 다시 가져옵니다.
+ADMISSION_STALE_AFTER = float(os.getenv("ADMISSION_STALE_AFTER", "300"))
+# 0이면 앱 안에서 작업자를 띄우지 않습니다. (서버리스 등에서는 python admission.py를 주기적으로 실행)
+ADMISSION_WORKER = os.getenv("ADMISSION_WORKER", "1") == "1"
+
+ACTIVE = ("queued", "processing")
+
+
+# 클릭 한 번마다 트랜잭션을 커밋하는 대신, 요청은 admission_tickets에 ticket만 넣고 바로 응답한 뒤
+# 백그라운드 작업자가 도착 순서(id순, FIFO)대로 ADMISSION_BATCH_SIZE개씩 가져와 배치당 한 번 커밋합니다.
+# ticket과 결과가 DB에 있으므로 재시작/배포 뒤에도 남고, 어느 워커/인스턴스에서 조회해도 같은 결과가 보입니다.
+# 가져오기는 passes.py와 같은 FOR UPDATE SKIP LOCKED 방식이라 작업자가 여러 개여도 같은 ticket을 두 번 처리하지 않습니다.
+class AdmissionQueue:
+    def __init__(self, batch_size: int = ADMISSION_BATCH_SIZE, session_factory=SessionLocal):
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self.batches = 0
+        self.processed = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def is_rush_route(self, route: dict) -> bool:
+        return route["id"] in ADMISSION_ROUTE_IDS or ADMISSION_ROUTE_KEYWORD in (route["route_name"] or "")
+
+    def submit(self, db, user_id: int, route_id: int, seat_number: Optional[int] = None,
+               service_date: Optional[datetime.date] = None) -> dict:
+        """ticket을 접수하고 상태를 반환합니다. commit은 호출한 쪽이 하고, 커밋 뒤 notify()를 부릅니다.
+
+        같은 사용자가 같은 운행편을 여러 번 눌러도 처리 전이면 같은 ticket을 돌려줍니다. (부분 유니크 인덱스)
+        """
+        T = models.AdmissionTicket
+        service_date = service_date or datetime.date.today()
+        ticket = T(
+            ticket_id=uuid.uuid4().hex, user_id=user_id, route_id=route_id,
+            service_date=service_date, seat_number=seat_number, status="queued",
+        )
+        try:
+            with db.begin_nested():
+                db.add(ticket)
+                db.flush()
+        except IntegrityError:
+            ticket = db.execute(
+                select(T).where(
+                    T.user_id == user_id, T.route_id == route_id,
+                    T.service_date == service_date, T.status.in_(ACTIVE),
+                )
+            ).scalar_one_or_none()
+            if ticket is None:
+                # 그 사이에 처리가 끝났으면 다시 접수합니다.
+                return self.submit(db, user_id, route_id, seat_number, service_date)
+        return self._status(db, ticket.id, ticket.ticket_id, ticket.status, None)
+
+    def _status(self, db, id_: int, ticket_id: str, status: str, result: Optional[str]) -> dict:
+        if status in ACTIVE:
+            T = models.AdmissionTicket
+            ahead = db.execute(select(func.count()).where(T.status.in_(ACTIVE), T.id < id_)).scalar()
+            return {"ticket_id": ticket_id, "status": "queued", "position": ahead + 1}
+        return {"ticket_id": ticket_id, **json.loads(result)}
+
+    def status(self, db, ticket_id: str) -> Optional[dict]:
+        T = models.AdmissionTicket
+        row = db.execute(select(T.id, T.status, T.result).where(T.ticket_id == ticket_id)).first()
+        if row is None:
+            return None
+        return self._status(db, row.id, ticket_id, row.status, row.result)
+
+    def _claim(self, db):
+        """queued(또는 오래 멈춘 processing) ticket을 id순으로 batch_size개 processing으로 바꾸며 가져옵니다."""
+        T = models.AdmissionTicket
+        now = datetime.datetime.now()
+        stale = now - datetime.timedelta(seconds=ADMISSION_STALE_AFTER)
+        ready = or_(T.status == "queued", (T.status == "processing") & (T.claimed_at < stale))
+        candidate = (
+            select(T.id).where(ready)
+            .order_by(T.id).limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        rows = db.execute(
+            update(T)
+            .where(T.id.in_(candidate), ready)
+            .values(status="processing", claimed_at=now)
+            .returning(T.id, T.user_id, T.route_id, T.seat_number, T.service_date, T.created_at)
+            .execution_options(synchronize_session=False)
+        ).all()
+        return sorted(rows, key=lambda r: r.id)
+
+    def _save_results(self, db, results):
+        table = models.AdmissionTicket.__table__
+        now = datetime.datetime.now()
+        db.execute(
+            update(table).where(table.c.id == bindparam("tid")).values(
+                status=bindparam("new_status"), result=bindparam("payload"), processed_at=now,
+            ),
+            [
+                {"tid": tid, "new_status": r["status"], "payload": json.dumps(r, ensure_ascii=False, default=str)}
+                for tid, r in results.items()
+            ],
+        )
+
+    def _reserve_all(self, db, tickets) -> dict:
+        """tickets를 한 트랜잭션에서 예약하고 결과를 저장한 뒤 커밋합니다. 예약 실패(HTTPException)는 결과로 남깁니다."""
+        results = {}
+        begin_batch(db)
+        for t in tickets:
+            try:
+                # 실패한 요청만 SAVEPOINT까지 되돌리고 나머지는 같은 트랜잭션에 남깁니다.
+                # 운행일은 처리하는 날이 아니라 접수한 날 기준으로 확인합니다.
+                with db.begin_nested():
+                    results[t.id] = booking.reserve(
+                        db, t.user_id, t.route_id, t.seat_number, t.service_date,
+                        t.created_at.date() if t.created_at else None,
+                    )
+            except HTTPException as e:
+                results[t.id] = {"status": "failed", "status_code": e.status_code, "detail": e.detail}
+        self._save_results(db, results)
+        db.commit()
+        return results
+
+    def _requeue(self, db, ids):
+        """일시적인 오류로 처리하지 못한 ticket을 순서(id) 그대로 대기열에 되돌립니다."""
+        T = models.AdmissionTicket
+        db.execute(
+            update(T).where(T.id.in_(ids), T.status == "processing")
+            .values(status="queued", claimed_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+    def process_batch(self) -> int:
+        """ticket 한 배치를 처리하고 결과가 정해진 수를 반환합니다. (없거나 모두 대기열로 되돌렸으면 0)
+
+        배치 트랜잭션이 실패하면 한 건씩 다시 처리합니다. 잠금 대기 초과나 연결 끊김 같은 일시적인 오류면
+        ticket을 대기열로 되돌려 다음 주기에 다시 처리하고, 그 밖의 오류가 난 ticket만 실패(500)로 남깁니다.
+        """
+        db = self.session_factory()
+        requeued = []
+        try:
+            # 가져오기와 배치에 필요한 운행편 좌석 만들기는 각각 짧은 트랜잭션으로 먼저 커밋합니다.
+            # (SQLite에서는 배치 트랜잭션을 BEGIN IMMEDIATE로 새로 열어야 하므로 그 전에 끝내 둡니다.)
+            batch = self._claim(db)
+            db.commit()
+            if not batch:
+                return 0
+            try:
+                for route_id, day in sorted({(t.route_id, t.service_date) for t in batch}):
+                    route = catalogue.routes.row(db, route_id)
+                    if route:
+                        booking.ensure_seats(db, route_id, day, route["total_seats"])
+                db.commit()
+                self._reserve_all(db, batch)
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"예약 대기열 배치 처리 실패, 한 건씩 다시 처리합니다: {e}")
+                for t in batch:
+                    try:
+                        self._reserve_all(db, [t])
+                    except Exception as e:
+                        db.rollback()
+                        if _transient(e):
+                            requeued.append(t.id)
+                            continue
+                        logger.warning(f"예약 ticket {t.id} 처리 실패: {e}")
+                        self._save_results(db, {t.id: {"status": "failed", "status_code": 500, "detail": "처리 중 오류가 발생했습니다."}})
+                        db.commit()
+                if requeued:
+                    self._requeue(db, requeued)
+        finally:
+            db.close()
+
+        for t in batch:
+            snapshots.invalidate(t.user_id)
+        self.batches += 1
+        self.processed += len(batch) - len(requeued)
+        return len(batch) - len(requeued)
+
+    def purge(self) -> int:
+        """조회 가능 시간이 지난 처리 결과를 지웁니다."""
+        T = models.AdmissionTicket
+        cutoff = datetime.datetime.now() - datetime.timedelta(seconds=ADMISSION_RESULT_TTL)
+        db = self.session_factory()
+        try:
+            deleted = db.execute(delete(T).where(T.status.notin_(ACTIVE), T.processed_at < cutoff)).rowcount
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    def drain(self) -> int:
+        """대기 중인 ticket이 없을 때까지 배치를 처리하고 처리한 수를 반환합니다.
+
+        배치를 모두 대기열로 되돌렸으면 (일시적인 오류) 멈추고 다음 주기에 다시 처리합니다.
+        """
+        total = 0
+        while True:
+            n = self.process_batch()
+            if not n:
+                return total
+            total += n
+
+    def notify(self):
+        """새 ticket이 접수되었음을 작업자에게 알립니다. (다음 주기를 기다리지 않고 바로 처리)"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.drain)
+                await asyncio.to_thread(self.purge)
+            except Exception as e:
+                logger.warning(f"예약 대기열 처리 실패: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), ADMISSION_WORKER_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self):
+        if self._worker is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # 남은 ticket은 DB에 있으므로 다른 작업자나 다음 기동 때 처리됩니다.
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+            self._loop = None
+
+    def stats(self):
+        T = models.AdmissionTicket
+        db = self.session_factory()
+        try:
+            pending = db.execute(select(func.count()).where(T.status.in_(ACTIVE))).scalar()
+        finally:
+            db.close()
+        return {"pending": pending, "batches": self.batches, "processed": self.processed}
+
+
+def _transient(e: Exception) -> bool:
+    """다시 하면 될 수 있는 DB 오류인지 (잠금 대기 초과, 교착, 연결 끊김 등)."""
+    return isinstance(e, OperationalError) or (isinstance(e, DBAPIError) and e.connection_invalidated)
+
+
+queue = AdmissionQueue()
+
+
+if __name__ == "__main__":
+    # cron 등에서 주기적으로 실행: python admission.py (대기 중인 ticket을 모두 처리하고 종료)
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=ADMISSION_BATCH_SIZE)
+    args = parser.parse_args()
+    queue.batch_size = args.batch_size
+    started = time.perf_counter()
+    processed = queue.drain()
+    purged = queue.purge()
+    print(f"✅ 예약 ticket {processed}건 처리, 지난 결과 {purged}건 삭제 ({time.perf_counter() - started:.2f}초)")
@@ -5,6 +5,16 @@ import sys
 # database.py, models.py 등을 불러올 수 있게 합니다.
 sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
 
+# 서버리스 인스턴스는 자주 새로 뜨므로 콜드 스타트마다 마이그레이션을 돌리지 않습니다.
+# 스키마 변경은 배포 단계에서 python migrations.py로 적용합니다.
+os.environ.setdefault("AUTO_MIGRATE", "0")
+# 예약 대기열(admission.py)과 정기권 신청(passes.py) 작업자도 띄우지 않습니다. 서버리스 인스턴스는 호출 사이에
+# 멈춰 있어서 백그라운드 루프가 돌지 않고, 콜드 스타트마다 루프가 하나씩 더 생깁니다.
+# 대신 계속 떠 있는 별도 작업 서버(또는 cron)에서 python admission.py, python passes.py를 주기적으로 실행해야
+# 접수된 ticket/신청이 처리됩니다. (둘 다 대기 중인 것을 모두 처리하고 종료합니다.)
+os.environ.setdefault("ADMISSION_WORKER", "0")
+os.environ.setdefault("PASS_WORKER", "0")
+
 from fastapi import FastAPI
 from main import app as real_app # 기존 main.py의 FastAPI 인스턴스를 가져옴
 
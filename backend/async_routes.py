@@ -0,0 +1,48 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+import inbox
+import schemas
+import snapshots
+from database import get_async_db
+
+# --- [비동기 DB 경로] ---
+# DB_ASYNC=1이면 main.py가 이 라우터를 동기 라우트보다 먼저 등록해서 같은 경로를 이쪽이 처리합니다.
+# 요청이 스레드풀 대신 이벤트 루프에서 AsyncSession으로 처리되므로, 자주 불리는 읽기 API만 옮겨 두었습니다.
+router = APIRouter()
+
+
+@router.post("/api/auth/login", response_model=schemas.UserStatus)
+async def login(email: str = Query(...), password: str = Query(...), db=Depends(get_async_db)):
+    user = await snapshots.authenticate_async(db, email, password)
+    if not user:
+        raise HTTPException(status_code=401, detail="이메일 또는 비밀번호가 잘못되었습니다.")
+    return {**user, "status": "success"}
+
+
+@router.get("/api/user/status", response_model=schemas.UserStatus)
+async def get_status(user_id: int, db=Depends(get_async_db)):
+    user = await snapshots.get_async(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {**user, "status": "success"}
+
+
+@router.get("/api/messages", response_model=List[schemas.MessagePreview])
+async def get_messages(
+    response: Response,
+    user_id: int,
+    cursor: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=inbox.MAX_PAGE_SIZE),
+    db=Depends(get_async_db),
+):
+    items, next_cursor = await inbox.list_page_async(db, user_id, cursor, limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return items
+
+
+@router.get("/api/messages/unread-count", response_model=schemas.UnreadCount)
+async def get_unread_count(user_id: int, db=Depends(get_async_db)):
+    return {"status": "success", "unread": await inbox.unread_count_async(db, user_id)}
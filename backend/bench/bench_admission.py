@@ -0,0 +1,114 @@
+"""신청 폭주(※신청전용 노선) 예약 부하 생성 스크립트.
+
+API 서버를 로컬에서 띄운 뒤 사용자 N명이 동시에 예약 버튼을 누르는 상황을 만들고,
+대기열 접수(queue) 방식과 요청마다 커밋하는 기존 방식(direct)을 비교합니다.
+queue 모드에서는 모든 ticket이 처리될 때까지 조회해서 배치 처리량도 측정합니다.
+대상 DB의 테이블을 모두 지우고 시작합니다. (운영 DB 주소를 DATABASE_URL로 주지 마세요.)
+
+    python bench/bench_admission.py --users 1000 --concurrency 100
+"""
+import os
+import time
+import asyncio
+import tempfile
+import argparse
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_admission.db"))
+
+import httpx  # noqa: E402
+
+from common import start_app_server, summarize, report  # noqa: E402
+import models  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+
+RUSH_ROUTE = "※신청전용(포항)"
+DIRECT_ROUTE = "포항(등교)"
+
+
+def setup(users):
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    rush = models.BusRoute(route_name=RUSH_ROUTE, location=RUSH_ROUTE, total_seats=45)
+    direct = models.BusRoute(route_name=DIRECT_ROUTE, location=DIRECT_ROUTE, total_seats=45)
+    db.add_all([rush, direct])
+    db.add_all(models.User(email=f"rush{i}@cu.ac.kr", hashed_password="x", name=f"u{i}", points=10000) for i in range(users))
+    db.commit()
+    ids = rush.id, direct.id
+    db.close()
+    return ids
+
+
+async def burst(base_url, route_id, users, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+    latencies, bodies = [], []
+
+    async def click(http, user_id):
+        async with sem:
+            start = time.perf_counter()
+            res = await http.post("/api/bookings/reserve", params={"user_id": user_id, "route_id": route_id})
+            latencies.append(time.perf_counter() - start)
+            bodies.append((res.status_code, res.json()))
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(click(http, uid) for uid in range(1, users + 1)))
+        return latencies, bodies, time.perf_counter() - start
+
+
+async def wait_for_tickets(base_url, tickets):
+    outcomes = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as http:
+        pending = list(tickets)
+        while pending:
+            still = []
+            for ticket_id in pending:
+                body = (await http.get(f"/api/bookings/tickets/{ticket_id}")).json()
+                if body["status"] in ("queued", "processing"):
+                    still.append(ticket_id)
+                else:
+                    outcomes[body["status"]] = outcomes.get(body["status"], 0) + 1
+            pending = still
+            if pending:
+                await asyncio.sleep(0.05)
+    return outcomes
+
+
+async def main(args):
+    rush_id, direct_id = setup(args.users)
+    import main as app_module
+    server, base_url = start_app_server(app_module.app)
+    results = []
+
+    if args.mode in ("queue", "both"):
+        start = time.perf_counter()
+        latencies, bodies, elapsed = await burst(base_url, rush_id, args.users, args.concurrency)
+        tickets = [b["ticket_id"] for code, b in bodies if code == 202]
+        outcomes = await wait_for_tickets(base_url, tickets)
+        drained = time.perf_counter() - start
+        results.append(summarize(
+            "queue_ack", latencies, elapsed,
+            outcomes=outcomes,
+            drained_s=round(drained, 3),
+            tickets_per_s=round(len(tickets) / drained, 1),
+            **app_module.admission.queue.stats(),
+        ))
+
+    if args.mode in ("direct", "both"):
+        latencies, bodies, elapsed = await burst(base_url, direct_id, args.users, args.concurrency)
+        outcomes = {}
+        for code, _ in bodies:
+            outcomes[code] = outcomes.get(code, 0) + 1
+        results.append(summarize("direct_commit", latencies, elapsed, outcomes=outcomes))
+
+    server.should_exit = True
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--mode", choices=["queue", "direct", "both"], default="both")
+    asyncio.run(main(parser.parse_args()))
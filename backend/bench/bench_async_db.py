@@ -0,0 +1,141 @@
+"""동기(스레드풀) vs 비동기(AsyncSession) DB 경로 벤치마크.
+
+같은 데이터(사용자 2,000명, 쪽지 20,000건)를 넣은 DB로 앱을 설정별로 새 프로세스에서 띄우고
+로그인/상태 조회/쪽지 목록/안 읽은 수를 동시 요청으로 보내 처리량, 지연 시간, 풀 대기 시간을 잽니다.
+  - sync: 기본 설정 (DB_ASYNC=0, pre-ping 켬)
+  - sync_no_preping: DB_POOL_PRE_PING=0
+  - async: DB_ASYNC=1 (aiosqlite/asyncpg 필요)
+대상 DB의 테이블을 모두 지우고 시작합니다. (운영 DB 주소를 DATABASE_URL로 주지 마세요.)
+
+    python bench/bench_async_db.py --requests 4000 --concurrency 64
+    DATABASE_URL=postgresql://localhost/shuttle_bench python bench/bench_async_db.py
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import tempfile
+import argparse
+import subprocess
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_async_db.db"))
+
+from common import summarize, report, start_app_server  # noqa: E402
+
+CONFIGS = {
+    "sync": {"DB_ASYNC": "0"},
+    "sync_no_preping": {"DB_ASYNC": "0", "DB_POOL_PRE_PING": "0"},
+    "async": {"DB_ASYNC": "1"},
+}
+
+
+def setup(args):
+    import models
+    import migrations
+    from database import engine
+
+    models.Base.metadata.drop_all(bind=engine)
+    migrations.migrate(engine)
+    rng = random.Random(1)
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [
+            {"id": i, "email": f"u{i}@cu.ac.kr", "hashed_password": "pw", "name": f"u{i}", "points": 10000}
+            for i in range(1, args.users + 1)
+        ])
+        conn.execute(models.Message.__table__.insert(), [
+            {"receiver_id": rng.randint(1, args.users), "title": "공지", "content": "운행 안내" * 20, "is_read": 0}
+            for _ in range(args.users * 10)
+        ])
+
+
+def instrument_pool(pool, waits):
+    """풀에서 연결을 받을 때까지 걸린 시간을 waits에 모읍니다."""
+    connect = pool.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        conn = connect()
+        waits.append(time.perf_counter() - start)
+        return conn
+
+    pool.connect = timed_connect
+
+
+async def load(base_url, args):
+    import httpx
+
+    rng = random.Random(2)
+    calls = []
+    for _ in range(args.requests):
+        uid = rng.randint(1, args.users)
+        calls.append(rng.choice([
+            ("POST", "/api/auth/login", {"email": f"u{uid}@cu.ac.kr", "password": "pw"}),
+            ("GET", "/api/user/status", {"user_id": uid}),
+            ("GET", "/api/messages", {"user_id": uid}),
+            ("GET", "/api/messages/unread-count", {"user_id": uid}),
+        ]))
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for call in calls:
+        queue.put_nowait(call)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                method, path, params = queue.get_nowait()
+                start = time.perf_counter()
+                r = await client.request(method, path, params=params)
+                latencies.append(time.perf_counter() - start)
+                errors += r.status_code != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+    return latencies, elapsed, errors
+
+
+def child(name, args):
+    import main
+    from database import engine, async_engine
+
+    waits = []
+    instrument_pool((async_engine.sync_engine if async_engine is not None else engine).pool, waits)
+    server, url = start_app_server(main.app)
+    latencies, elapsed, errors = asyncio.run(load(url, args))
+    server.should_exit = True
+    print(json.dumps(summarize(
+        name, latencies, elapsed, errors=errors, checkouts=len(waits),
+        pool_wait_p50_ms=round(sorted(waits)[len(waits) // 2] * 1000, 3) if waits else 0.0,
+        pool_wait_max_ms=round(max(waits, default=0.0) * 1000, 3),
+    )))
+
+
+def main(args):
+    setup(args)
+    results = []
+    for name in args.configs:
+        env = {**os.environ, **CONFIGS[name]}
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", name, "--requests", str(args.requests),
+             "--concurrency", str(args.concurrency), "--users", str(args.users)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+    report({"database_url": os.environ["DATABASE_URL"].split("@")[-1], "results": results})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--configs", nargs="+", default=list(CONFIGS), choices=list(CONFIGS))
+    parser.add_argument("--child")
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args)
+    else:
+        main(args)
@@ -0,0 +1,110 @@
+"""노선 변경 공지 일괄 발송 벤치마크.
+
+사용자(기본 10만 명)가 한 노선을 즐겨찾기/예약해 둔 상태에서 같은 공지를
+  - naive: 수신자를 읽어 와 Message 객체를 한 명씩 db.add (기존 방식)
+  - executemany: inbox.send_bulk (BROADCAST_CHUNK개씩)
+  - insert_select: inbox.broadcast (INSERT ... SELECT 한 문장)
+으로 보내고 초당 삽입 행 수를 비교합니다.
+대상 DB의 테이블을 모두 지우고 시작합니다. (운영 DB 주소를 DATABASE_URL로 주지 마세요.)
+
+    python bench/bench_broadcast.py --users 100000
+    DATABASE_URL=postgresql://localhost/shuttle_bench python bench/bench_broadcast.py
+"""
+import os
+import time
+import tempfile
+import argparse
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_broadcast.db"))
+
+from sqlalchemy import text  # noqa: E402
+
+from common import report  # noqa: E402
+import models  # noqa: E402
+import inbox  # noqa: E402
+from database import engine, SessionLocal  # noqa: E402
+
+ROUTE_ID = 1
+TITLE = "노선 변경 안내"
+CONTENT = "다음 주부터 운행 시간이 변경됩니다. 자세한 내용은 노선표를 확인하세요."
+
+
+def setup(args):
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [
+            {"id": i, "email": f"u{i}@cu.ac.kr", "hashed_password": "x", "name": f"u{i}", "points": 0}
+            for i in range(1, args.users + 1)
+        ])
+        conn.execute(models.BusRoute.__table__.insert(), [
+            {"id": ROUTE_ID, "route_name": "대구-하양", "location": "대구-하양", "total_seats": 45},
+        ])
+        conn.execute(models.Favorite.__table__.insert(), [
+            {"user_id": i, "route_id": ROUTE_ID} for i in range(1, args.users + 1)
+        ])
+        # 절반은 즐겨찾기와 예약이 겹치게 해서 UNION 중복 제거가 일어나도록 합니다.
+        conn.execute(models.Booking.__table__.insert(), [
+            {"user_id": i, "route_id": ROUTE_ID, "status": "reserved"} for i in range(1, args.users + 1, 2)
+        ])
+
+
+def clear_messages():
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM messages"))
+
+
+def naive(db):
+    start = time.perf_counter()
+    user_ids = {f.user_id for f in db.query(models.Favorite).filter(models.Favorite.route_id == ROUTE_ID)}
+    user_ids |= {b.user_id for b in db.query(models.Booking).filter(
+        models.Booking.route_id == ROUTE_ID, models.Booking.status == "reserved")}
+    for uid in user_ids:
+        db.add(models.Message(receiver_id=uid, title=TITLE, content=CONTENT, is_read=0))
+    db.flush()
+    return len(user_ids)
+
+
+def executemany(db):
+    user_ids = [uid for (uid,) in db.execute(inbox._recipients(ROUTE_ID, "all"))]
+    return inbox.send_bulk(db, user_ids, TITLE, CONTENT)
+
+
+def insert_select(db):
+    return inbox.broadcast(db, TITLE, CONTENT, ROUTE_ID, "all")
+
+
+def run(name, fn):
+    clear_messages()
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        sent = fn(db)
+        db.commit()
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    with engine.connect() as conn:
+        stored = conn.execute(text("SELECT count(*) FROM messages")).scalar()
+    return {
+        "name": name,
+        "sent": sent,
+        "stored": stored,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_sec": round(sent / elapsed),
+    }
+
+
+def main(args):
+    setup(args)
+    results = [run("insert_select", insert_select), run("executemany", executemany)]
+    if not args.skip_naive:
+        results.append(run("naive", naive))
+    report({"database": engine.dialect.name, "users": args.users, "results": results})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--skip-naive", action="store_true")
+    main(parser.parse_args())
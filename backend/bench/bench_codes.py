@@ -0,0 +1,70 @@
+"""인증번호 저장소 벤치마크.
+
+학기 초 가입 몰림을 흉내내어 여러 스레드가 서로 다른 이메일로 발송(issue) → 확인(consume)을 반복하고
+저장소(memory / db)별 처리량을 잽니다. 같은 코드를 여러 스레드가 동시에 쓰면 한 번만 성공하는지,
+CODE_MAX_ATTEMPTS번 틀린 뒤에는 맞는 코드도 거절되는지(추측 공격 차단)도 확인합니다.
+DB 저장소는 대상 DB의 verification_codes 테이블을 비우고 시작합니다.
+
+    python bench/bench_codes.py --emails 5000 --threads 8
+    DATABASE_URL=postgresql://localhost/shuttle_bench python bench/bench_codes.py
+"""
+import os
+import time
+import tempfile
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_codes.db"))
+
+from common import summarize, report  # noqa: E402
+import codes  # noqa: E402
+import migrations  # noqa: E402
+from database import engine  # noqa: E402
+
+
+def signup_flow(store, email):
+    start = time.perf_counter()
+    code = store.issue(email)
+    assert code is not None and store.consume(email, code)
+    return time.perf_counter() - start
+
+
+def run(name, store, args):
+    emails = [f"s{i}@cu.ac.kr" for i in range(args.emails)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        latencies = list(pool.map(lambda e: signup_flow(store, e), emails))
+    elapsed = time.perf_counter() - start
+
+    # 같은 코드를 동시에 제출하면 정확히 한 번만 통과해야 합니다.
+    code = store.issue("race@cu.ac.kr")
+    with ThreadPoolExecutor(args.threads) as pool:
+        wins = sum(pool.map(lambda _: store.consume("race@cu.ac.kr", code), range(args.threads * 4)))
+
+    # 틀린 코드를 한도만큼 넣은 뒤에는 맞는 코드를 넣어도 실패해야 합니다.
+    code = store.issue("guess@cu.ac.kr")
+    wrong = [c for c in (f"{n:06d}" for n in range(100000, 100000 + codes.CODE_MAX_ATTEMPTS + 1)) if c != code]
+    for c in wrong[:codes.CODE_MAX_ATTEMPTS]:
+        store.consume("guess@cu.ac.kr", c)
+    guessed = store.consume("guess@cu.ac.kr", code)
+    return summarize(name, latencies, elapsed, double_consume_wins=wins, accepted_after_lockout=guessed)
+
+
+def main(args):
+    migrations.migrate(engine)
+    with engine.begin() as conn:
+        conn.execute(codes.models.VerificationCode.__table__.delete())
+    report({
+        "database": engine.dialect.name,
+        "results": [
+            run("memory", codes.MemoryCodeStore(), args),
+            run("db", codes.DBCodeStore(), args),
+        ],
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--emails", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=8)
+    main(parser.parse_args())
@@ -0,0 +1,50 @@
+"""직선거리 ETA 벤치마크: 스칼라 get_haversine_distance vs 벡터화 haversine_matrix.
+
+    python bench/bench_eta_batch.py --origins 100 --destinations 100
+"""
+import time
+import random
+import argparse
+
+import numpy as np
+
+from common import report
+from geo import get_haversine_distance, haversine_matrix
+
+
+def random_points(n, rng):
+    # 대구/경산 일대 좌표
+    return [f"{rng.uniform(128.45, 128.85):.6f},{rng.uniform(35.80, 35.95):.6f}" for _ in range(n)]
+
+
+def main(args):
+    rng = random.Random(42)
+    origins = random_points(args.origins, rng)
+    destinations = random_points(args.destinations, rng)
+    pairs = args.origins * args.destinations
+
+    start = time.perf_counter()
+    scalar = [[get_haversine_distance(o, d) for d in destinations] for o in origins]
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    dist, dur = haversine_matrix(origins, destinations)
+    vector_s = time.perf_counter() - start
+
+    scalar_dist = np.array([[c[0] for c in row] for row in scalar])
+    scalar_dur = np.array([[c[1] for c in row] for row in scalar])
+    report({
+        "pairs": pairs,
+        "scalar_ms": round(scalar_s * 1000, 3),
+        "vectorized_ms": round(vector_s * 1000, 3),
+        "speedup": round(scalar_s / vector_s, 1),
+        "max_distance_diff_km": float(np.abs(scalar_dist - dist).max()),
+        "duration_mismatches": int((scalar_dur != dur).sum()),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--origins", type=int, default=100)
+    parser.add_argument("--destinations", type=int, default=100)
+    main(parser.parse_args())
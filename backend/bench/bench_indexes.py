@@ -0,0 +1,147 @@
+"""조회용 인덱스 마이그레이션 전후 비교 벤치마크.
+
+인덱스가 없는 예전 스키마에 예약/쪽지를 대량(기본 100만 건씩)으로 넣고
+자주 쓰는 조회의 실행 계획과 지연 시간을 잰 뒤, migrations.migrate()를 적용하고 다시 잽니다.
+대상 DB의 테이블을 모두 지우고 시작합니다. (운영 DB 주소를 DATABASE_URL로 주지 마세요.)
+
+    python bench/bench_indexes.py --rows 1000000
+    DATABASE_URL=postgresql://localhost/shuttle_bench python bench/bench_indexes.py
+"""
+import os
+import time
+import random
+import tempfile
+import argparse
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_indexes.db"))
+
+from sqlalchemy import text  # noqa: E402
+
+from common import percentile, report  # noqa: E402
+import models  # noqa: E402
+import migrations  # noqa: E402
+from database import engine  # noqa: E402
+
+NEW_INDEXES = [
+    "uq_favorites_user_route", "ix_favorites_route_id",
+    "ix_bookings_user_booked", "ix_bookings_route_status",
+    "ix_messages_receiver_created", "ix_messages_receiver_unread", "ix_messages_sender_id",
+]
+
+QUERIES = {
+    "favorites_by_user": "SELECT route_id FROM favorites WHERE user_id = :uid",
+    "bookings_by_user": "SELECT id, route_id, status, booked_at FROM bookings WHERE user_id = :uid ORDER BY booked_at DESC LIMIT 20",
+    "route_reserved_count": "SELECT count(*) FROM bookings WHERE route_id = :rid AND status = 'reserved'",
+    "inbox_first_page": "SELECT id, title, created_at FROM messages WHERE receiver_id = :uid ORDER BY created_at DESC, id DESC LIMIT 20",
+    "unread_count": "SELECT count(*) FROM messages WHERE receiver_id = :uid AND is_read = 0",
+    "sent_by_user": "SELECT id FROM messages WHERE sender_id = :uid LIMIT 20",
+}
+
+
+def chunks(rows, size=50000):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def setup(args):
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    rng = random.Random(1)
+    base = datetime(2026, 3, 2)
+    with engine.begin() as conn:
+        # 예전 스키마를 흉내내기 위해 새 인덱스를 지웁니다. (schema_migrations는 방금 만들어서 비어 있습니다.)
+        for name in NEW_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        conn.execute(models.User.__table__.insert(), [
+            {"id": i, "email": f"u{i}@cu.ac.kr", "hashed_password": "x", "name": f"u{i}", "points": 0}
+            for i in range(1, args.users + 1)
+        ])
+        conn.execute(models.BusRoute.__table__.insert(), [
+            {"id": i, "route_name": f"route{i}", "location": f"route{i}", "total_seats": 45}
+            for i in range(1, args.routes + 1)
+        ])
+        conn.execute(models.Favorite.__table__.insert(), [
+            {"user_id": i, "route_id": r}
+            for i in range(1, args.users + 1) for r in rng.sample(range(1, args.routes + 1), 3)
+        ])
+    for batch in chunks({
+        "user_id": rng.randint(1, args.users),
+        "route_id": rng.randint(1, args.routes),
+        "status": "reserved" if rng.random() < 0.9 else "cancelled",
+        "booked_at": base + timedelta(minutes=n),
+    } for n in range(args.rows)):
+        with engine.begin() as conn:
+            conn.execute(models.Booking.__table__.insert(), batch)
+    for batch in chunks({
+        "sender_id": rng.randint(1, args.users) if rng.random() < 0.2 else None,
+        "receiver_id": rng.randint(1, args.users),
+        "title": "노선 변경 안내",
+        "content": "운행 시간이 변경되었습니다." * 5,
+        "is_read": int(rng.random() < 0.7),
+        "created_at": base + timedelta(minutes=n),
+    } for n in range(args.rows)):
+        with engine.begin() as conn:
+            conn.execute(models.Message.__table__.insert(), batch)
+
+
+def plan(conn, sql, params):
+    if engine.dialect.name == "sqlite":
+        return [row[-1] for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql), params)]
+    return [row[0] for row in conn.execute(text("EXPLAIN " + sql), params)]
+
+
+def measure(args, rng):
+    results = {}
+    with engine.connect() as conn:
+        for name, sql in QUERIES.items():
+            samples = []
+            for _ in range(args.samples):
+                params = {"uid": rng.randint(1, args.users), "rid": rng.randint(1, args.routes)}
+                start = time.perf_counter()
+                conn.execute(text(sql), params).all()
+                samples.append(time.perf_counter() - start)
+            results[name] = {
+                "p50_ms": round(percentile(samples, 50) * 1000, 3),
+                "p99_ms": round(percentile(samples, 99) * 1000, 3),
+                "plan": plan(conn, sql, {"uid": 1, "rid": 1}),
+            }
+    return results
+
+
+def main(args):
+    start = time.perf_counter()
+    setup(args)
+    seeded_s = time.perf_counter() - start
+
+    before = measure(args, random.Random(2))
+    start = time.perf_counter()
+    applied = migrations.migrate(engine)
+    migrate_s = time.perf_counter() - start
+    after = measure(args, random.Random(2))
+
+    report({
+        "database": engine.dialect.name,
+        "rows": args.rows,
+        "seed_s": round(seeded_s, 2),
+        "migrations_applied": applied,
+        "migrate_s": round(migrate_s, 2),
+        "missing_indexes_after": migrations.missing_indexes(engine),
+        "before": before,
+        "after": after,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--routes", type=int, default=96)
+    parser.add_argument("--samples", type=int, default=30)
+    main(parser.parse_args())
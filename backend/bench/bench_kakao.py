@@ -0,0 +1,74 @@
+"""카카오 길찾기 클라이언트 벤치마크.
+
+같은 버스를 추적하는 화면 N개가 동시에 ETA를 요청하는 상황을 로컬 스텁 서버로 재현하고,
+매 요청마다 새 연결을 여는 기존 방식과 풀/캐시/요청 합치기를 쓰는 DirectionsClient를 비교합니다.
+
+    python bench/bench_kakao.py --clients 500 --delay 0.05
+"""
+import time
+import asyncio
+import argparse
+
+import httpx
+
+from common import start_kakao_stub, summarize, report
+from kakao import DirectionsClient
+
+ORIGIN = "128.8132,35.9130"
+DESTINATION = "128.7521,35.9087"
+
+
+async def run_naive(url, clients):
+    async def one():
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=10) as http:
+            await http.get(url, params={"origin": ORIGIN, "destination": DESTINATION, "priority": "TIME"})
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(clients)))
+    return latencies, time.perf_counter() - start
+
+
+async def run_client(url, clients, rounds):
+    client = DirectionsClient("bench", url=url)
+    latencies = []
+
+    async def one(i):
+        # 같은 격자 안에서 조금씩 다른 좌표로 요청해도 하나로 합쳐져야 합니다.
+        jitter = (i % 5) * 0.00001
+        origin = f"{128.8132 + jitter},{35.9130 - jitter}"
+        start = time.perf_counter()
+        await client.get_route(origin, DESTINATION)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*(one(i) for i in range(clients)))
+    elapsed = time.perf_counter() - start
+    stats = client.stats()
+    await client.aclose()
+    return latencies, elapsed, stats
+
+
+async def main(args):
+    server, url = start_kakao_stub(delay=args.delay)
+    results = []
+
+    latencies, elapsed = await run_naive(url, args.clients)
+    results.append(summarize("naive_new_connection", latencies, elapsed, upstream_calls=server.calls))
+
+    server.calls = 0
+    latencies, elapsed, stats = await run_client(url, args.clients, args.rounds)
+    results.append(summarize("pooled_cached_client", latencies, elapsed, stub_calls=server.calls, **stats))
+
+    server.shutdown()
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--delay", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
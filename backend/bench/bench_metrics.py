@@ -0,0 +1,128 @@
+"""계측 미들웨어/SQL 이벤트 오버헤드 벤치마크.
+
+소켓 없이 ASGI로 직접 앱을 호출해서, 설정별로 새 프로세스에서 같은 요청을 반복하고 처리 시간을 비교합니다.
+  - off: METRICS_ENABLED=0
+  - on: 기본값 (미들웨어 + SQL 이벤트)
+  - on_server_timing: METRICS_SERVER_TIMING=1
+요청은 DB를 안 쓰는 /api/routes/{id}(카탈로그 메모리 응답)와 매번 DB를 읽는 /api/user/status(스냅샷 캐시 끔)입니다.
+앱 전체 요청은 잡음이 커서, 빈 ASGI 앱에 미들웨어만 씌운 경우와 SQL 이벤트 훅 한 쌍의 비용도 따로 잽니다.
+대상 DB의 테이블을 모두 지우고 시작합니다. (운영 DB 주소를 DATABASE_URL로 주지 마세요.)
+
+    python bench/bench_metrics.py --requests 5000
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+import argparse
+import subprocess
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_metrics.db"))
+
+from common import summarize, report  # noqa: E402
+
+CONFIGS = {
+    "off": {"METRICS_ENABLED": "0"},
+    "on": {"METRICS_ENABLED": "1"},
+    "on_server_timing": {"METRICS_ENABLED": "1", "METRICS_SERVER_TIMING": "1"},
+}
+
+
+def setup():
+    import models
+    import migrations
+    from database import engine
+
+    models.Base.metadata.drop_all(bind=engine)
+    migrations.migrate(engine)
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [{"id": 1, "email": "u1@cu.ac.kr", "hashed_password": "x", "name": "u", "points": 0}])
+        conn.execute(models.BusRoute.__table__.insert(), [{"id": 1, "route_name": "사월역(08:00)", "location": "사월역", "time": "08:00", "total_seats": 45}])
+
+
+async def drive(app, path, n):
+    import httpx
+
+    latencies = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await client.get(path)
+        start = time.perf_counter()
+        for _ in range(n):
+            t = time.perf_counter()
+            r = await client.get(path)
+            latencies.append(time.perf_counter() - t)
+            assert r.status_code == 200, r.text
+        elapsed = time.perf_counter() - start
+    return latencies, elapsed
+
+
+def child(name, args):
+    import main
+    import snapshots
+
+    snapshots.cache.ttl = 0  # 매 요청 DB를 읽도록
+    results = []
+    for path in ("/api/routes/1", "/api/user/status?user_id=1"):
+        latencies, elapsed = asyncio.run(drive(main.app, path, args.requests))
+        results.append(summarize(f"{name} {path}", latencies, elapsed))
+    print(json.dumps(results))
+
+
+def isolated_overhead(n):
+    """미들웨어 한 번, SQL 이벤트 훅 한 쌍에 드는 시간(us)."""
+    import metrics
+
+    async def noop(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    async def run(app):
+        scope = {"type": "http", "method": "GET", "path": "/"}
+        start = time.perf_counter()
+        for _ in range(n):
+            await app(dict(scope), None, send)
+        return (time.perf_counter() - start) / n * 1e6
+
+    bare = asyncio.run(run(noop))
+    wrapped = asyncio.run(run(metrics.MetricsMiddleware(noop)))
+
+    class Conn:
+        info = {}
+
+    conn, stats = Conn(), metrics.RequestStats()
+    token = metrics._current.set(stats)
+    start = time.perf_counter()
+    for _ in range(n):
+        metrics._before_cursor_execute(conn, None, "SELECT 1", None, None, False)
+        metrics._after_cursor_execute(conn, None, "SELECT 1", None, None, False)
+    hooks = (time.perf_counter() - start) / n * 1e6
+    metrics._current.reset(token)
+    return {"middleware_us": round(wrapped - bare, 2), "sql_hooks_per_query_us": round(hooks, 2)}
+
+
+def main(args):
+    setup()
+    results = []
+    for name in CONFIGS:
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", name, "--requests", str(args.requests)],
+            env={**os.environ, **CONFIGS[name]}, capture_output=True, text=True, check=True,
+        ).stdout
+        results += json.loads(out.strip().splitlines()[-1])
+    report({"requests": args.requests, "isolated": isolated_overhead(100000), "results": results})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--child")
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args)
+    else:
+        main(args)
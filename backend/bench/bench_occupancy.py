@@ -0,0 +1,135 @@
+"""노선 점유율 보고서 벤치마크.
+
+1년치 운행일의 예약(기본 50만 건)을 넣고 같은 질문을
+  - scan: bookings를 직접 GROUP BY
+  - rollup: booking_daily 집계 테이블 (occupancy.route_days / occupancy.summary)
+로 답하는 시간을 비교합니다. 질문은 "한 노선의 이번 달 날짜별 예약 수"와 "1년간 노선별 합계"입니다.
+집계 전체 재계산, 최근 2일 재계산, 예약 한 건당 인라인 upsert 비용도 같이 잽니다.
+대상 DB의 테이블을 모두 지우고 시작합니다. (운영 DB 주소를 DATABASE_URL로 주지 마세요.)
+
+    python bench/bench_occupancy.py --bookings 500000
+    DATABASE_URL=postgresql://localhost/shuttle_bench python bench/bench_occupancy.py
+"""
+import os
+import time
+import random
+import datetime
+import tempfile
+import argparse
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_occupancy.db"))
+
+from sqlalchemy import select, func, case  # noqa: E402
+
+from common import report  # noqa: E402
+import models  # noqa: E402
+import seed  # noqa: E402
+import catalogue  # noqa: E402
+import occupancy  # noqa: E402
+import migrations  # noqa: E402
+from database import engine, SessionLocal  # noqa: E402
+
+END = datetime.date(2026, 10, 31)
+START = END - datetime.timedelta(days=364)
+MONTH = (datetime.date(2026, 10, 1), END)
+
+
+def setup(args):
+    models.Base.metadata.drop_all(bind=engine)
+    migrations.migrate(engine)
+    seed.sync_routes(seed.parse_routes(seed.shuttle_data_raw))
+    rng = random.Random(1)
+    with engine.connect() as conn:
+        route_ids = [r for (r,) in conn.execute(select(models.BusRoute.id))]
+    base = datetime.datetime.combine(START, datetime.time(7))
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [{"id": 1, "email": "u1@cu.ac.kr", "hashed_password": "x", "name": "u1", "points": 0}])
+        for lo in range(0, args.bookings, 50000):
+            rows = []
+            for _ in range(lo, min(lo + 50000, args.bookings)):
+                day = START + datetime.timedelta(days=rng.randrange(365))
+                rows.append({
+                    "user_id": 1,
+                    "route_id": rng.choice(route_ids),
+                    "status": "cancelled" if rng.random() < 0.15 else "reserved",
+                    "service_date": day,
+                    # 예약은 운행일 0~7일 전에 합니다.
+                    "booked_at": base + datetime.timedelta(days=(day - START).days - rng.randrange(8), minutes=rng.randrange(600)),
+                })
+            conn.execute(models.Booking.__table__.insert(), rows)
+    return route_ids
+
+
+def scan_route_month(db, route_id):
+    B = models.Booking
+    return db.execute(
+        select(B.service_date, func.sum(case((B.status == "reserved", 1), else_=0)), func.sum(case((B.status == "cancelled", 1), else_=0)))
+        .where(B.route_id == route_id, B.service_date >= MONTH[0], B.service_date <= MONTH[1])
+        .group_by(B.service_date).order_by(B.service_date)
+    ).all()
+
+
+def scan_year_summary(db):
+    B = models.Booking
+    return db.execute(
+        select(B.route_id, B.status, func.count())
+        .where(B.service_date >= START, B.service_date <= END)
+        .group_by(B.route_id, B.status)
+    ).all()
+
+
+def timed(name, fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return {"name": name, "ms": round((time.perf_counter() - start) / repeat * 1000, 3), "rows": len(result)}
+
+
+def main(args):
+    route_ids = setup(args)
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        rollup_rows = occupancy.rebuild(db)
+        db.commit()
+        rebuild_all_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        occupancy.rebuild(db, END - datetime.timedelta(days=1), END)
+        db.commit()
+        rebuild_2d_ms = (time.perf_counter() - start) * 1000
+
+        catalogue.routes.refresh(db, force=True)
+        route = catalogue.routes.row(db, route_ids[0])
+        routes = catalogue.routes.row_by_id
+        results = [
+            timed("scan route x month", lambda: scan_route_month(db, route["id"]), args.repeat),
+            timed("rollup route x month", lambda: occupancy.route_days(db, route, *MONTH)[0], args.repeat),
+            timed("scan year summary", lambda: scan_year_summary(db), max(1, args.repeat // 10)),
+            timed("rollup year summary", lambda: occupancy.summary(db, routes, START, END, limit=occupancy.MAX_PAGE_SIZE)[0], args.repeat),
+        ]
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            occupancy.record_reserve(db, route["id"], datetime.date.today())
+        inline_us = (time.perf_counter() - start) / args.repeat * 1e6
+        db.rollback()
+    finally:
+        db.close()
+    report({
+        "database": engine.dialect.name,
+        "bookings": args.bookings,
+        "routes": len(route_ids),
+        "rollup_rows": rollup_rows,
+        "rebuild_all_ms": round(rebuild_all_ms, 1),
+        "rebuild_last_2_days_ms": round(rebuild_2d_ms, 1),
+        "inline_upsert_us": round(inline_us, 1),
+        "results": results,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bookings", type=int, default=500000)
+    parser.add_argument("--repeat", type=int, default=50)
+    main(parser.parse_args())
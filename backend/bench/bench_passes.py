@@ -0,0 +1,136 @@
+"""정기권 신청 일괄 처리 벤치마크.
+
+사용자 1만 명이 정기권을 신청해 둔 상태(pending 1만 건, 10%는 포인트 부족, 정원은 신청의 80%)에서
+  - naive: 신청 한 건씩 사용자를 읽고 정원/잔액 확인 후 차감하고 커밋
+  - batch: passes.run_batch (SKIP LOCKED로 가져와 조건부 UPDATE로 정원을 잡고, 배치당 한 트랜잭션), 작업자 1개/여러 개
+로 모두 처리하는 시간과 초당 처리 건수를 비교합니다.
+처리 후 정원 초과 승인이 없는지, 포인트 원장과 잔액이 맞는지(points.reconcile), pass_quotas.used가 승인 수와 같은지,
+거절된 신청마다 안내 쪽지가 갔는지도 확인합니다.
+대상 DB의 테이블을 모두 지우고 시작합니다. (운영 DB 주소를 DATABASE_URL로 주지 마세요.)
+
+    python bench/bench_passes.py --applications 10000 --workers 1 4 --naive
+    DATABASE_URL=postgresql://localhost/shuttle_bench python bench/bench_passes.py
+"""
+import os
+import time
+import random
+import datetime
+import tempfile
+import argparse
+import threading
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_passes.db"))
+
+from sqlalchemy import select, func, text  # noqa: E402
+
+from common import report  # noqa: E402
+import models  # noqa: E402
+import points  # noqa: E402
+import passes  # noqa: E402
+import migrations  # noqa: E402
+from database import engine, SessionLocal  # noqa: E402
+
+PRICE = passes.PASS_PRICES["SEMESTER"]
+
+
+def setup(args):
+    models.Base.metadata.drop_all(bind=engine)
+    migrations.migrate(engine)
+    rng = random.Random(1)
+    now = datetime.datetime.now()
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [{
+            "id": i, "email": f"u{i}@cu.ac.kr", "hashed_password": "x", "name": f"u{i}",
+            "points": PRICE - 1000 if rng.random() < 0.1 else PRICE + rng.randrange(0, 100000),
+        } for i in range(1, args.applications + 1)])
+        migrations.m004_points_opening_balances(conn)
+        conn.execute(models.SemesterPass.__table__.insert(), [
+            {"user_id": i, "route_type": "SEMESTER", "status": "pending", "applied_at": now}
+            for i in range(1, args.applications + 1)
+        ])
+        conn.execute(models.PassQuota.__table__.insert(), [{"route_type": "SEMESTER", "capacity": int(args.applications * 0.8)}])
+
+
+def naive(db):
+    """신청 한 건씩 처리하는 방식 (비교용)."""
+    P, U = models.SemesterPass, models.User
+    capacity = db.query(models.PassQuota.capacity).filter(models.PassQuota.route_type == "SEMESTER").scalar()
+    for p in db.query(P).filter(P.status == "pending").order_by(P.id).all():
+        user = db.query(U).filter(U.id == p.user_id).first()
+        used = db.query(func.count(P.id)).filter(P.route_type == "SEMESTER", P.status == "approved").scalar()
+        if used >= capacity:
+            p.status, p.reason = "rejected", "정원 초과"
+        elif (user.points or 0) < PRICE:
+            p.status, p.reason = "rejected", "포인트 부족"
+        else:
+            user.points -= PRICE
+            db.add(models.PointsLedger(user_id=user.id, delta=-PRICE, balance_after=user.points, reason="pass", ref_id=p.id))
+            p.status, p.expires_at = "approved", passes.semester_end(datetime.datetime.now())
+        db.commit()
+
+
+def run(name, args, workers=0):
+    setup(args)
+    start = time.perf_counter()
+    if workers:
+        totals, lock = [], threading.Lock()
+
+        def worker():
+            result = passes.drain(batch_size=args.batch_size)
+            with lock:
+                totals.append(result)
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        batches = sum(t["batches"] for t in totals)
+    else:
+        db = SessionLocal()
+        try:
+            naive(db)
+        finally:
+            db.close()
+        batches = None
+    elapsed = time.perf_counter() - start
+
+    db = SessionLocal()
+    try:
+        counts = dict(db.execute(select(models.SemesterPass.status, func.count()).group_by(models.SemesterPass.status)).all())
+        mismatches = points.reconcile(db)
+        charged = db.execute(text("SELECT COALESCE(-SUM(delta), 0) FROM points_ledger WHERE reason = 'pass'")).scalar()
+        used = db.execute(select(models.PassQuota.used).where(models.PassQuota.route_type == "SEMESTER")).scalar()
+        notices = db.execute(select(func.count()).select_from(models.Message)).scalar()
+    finally:
+        db.close()
+    approved = counts.get("approved", 0)
+    return {
+        "name": name,
+        "applications": args.applications,
+        "elapsed_s": round(elapsed, 3),
+        "per_sec": round(args.applications / elapsed),
+        "batches": batches,
+        "statuses": counts,
+        "over_capacity": max(0, approved - int(args.applications * 0.8)),
+        "charged_matches_approved": charged == approved * PRICE,
+        "quota_used_matches_approved": used == approved if workers else None,
+        "rejection_notices_match": notices == counts.get("rejected", 0) if workers else None,
+        "ledger_mismatches": len(mismatches),
+    }
+
+
+def main(args):
+    results = [run(f"batch x{n}", args, workers=n) for n in args.workers]
+    if args.naive:
+        results.append(run("naive", args))
+    report({"database": engine.dialect.name, "batch_size": args.batch_size, "results": results})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--applications", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=passes.PASS_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--naive", action="store_true", help="한 건씩 처리하는 방식도 잽니다. (1만 건이면 몇 분 걸립니다)")
+    main(parser.parse_args())
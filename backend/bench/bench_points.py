@@ -0,0 +1,132 @@
+"""포인트 동시 충전/사용 벤치마크.
+
+소수의 사용자(기본 20명)에게 여러 스레드가 동시에 충전(+)과 사용(-)을 섞어 보내고
+  - naive: ORM으로 user.points를 읽고-더하고-쓰기 (기존 charge 방식)
+  - ledger: points.apply_delta (UPDATE ... RETURNING + 원장 추가)
+의 초당 처리 수와 유실된 갱신 수(기대 잔액과 실제 잔액의 차이)를 비교하고, 마지막에 points.reconcile로 원장을 검사합니다.
+대상 DB의 테이블을 모두 지우고 시작합니다. (운영 DB 주소를 DATABASE_URL로 주지 마세요.)
+
+    python bench/bench_points.py --threads 16 --ops 4000
+    DATABASE_URL=postgresql://localhost/shuttle_bench python bench/bench_points.py
+"""
+import os
+import time
+import random
+import tempfile
+import argparse
+import threading
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_points.db"))
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from common import report  # noqa: E402
+import models  # noqa: E402
+import points  # noqa: E402
+import migrations  # noqa: E402
+from database import engine, SessionLocal  # noqa: E402
+
+START_BALANCE = 1000000
+
+
+def setup(args):
+    models.Base.metadata.drop_all(bind=engine)
+    migrations.migrate(engine)
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [
+            {"id": i, "email": f"u{i}@cu.ac.kr", "hashed_password": "x", "name": f"u{i}", "points": 0}
+            for i in range(1, args.users + 1)
+        ])
+    db = SessionLocal()
+    for i in range(1, args.users + 1):
+        points.apply_delta(db, i, START_BALANCE, "charge")
+    db.commit()
+    db.close()
+
+
+def naive(db, user_id, delta):
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user.points += delta
+    db.commit()
+
+
+def ledger(db, user_id, delta):
+    points.apply_delta(db, user_id, delta, "charge" if delta > 0 else "reserve")
+    db.commit()
+
+
+def run(name, fn, args):
+    rng = random.Random(1)
+    work = [
+        [(rng.randint(1, args.users), rng.choice([1000, 500, -3000, -500])) for _ in range(args.ops // args.threads)]
+        for _ in range(args.threads)
+    ]
+    with engine.connect() as conn:
+        before = dict(conn.execute(models.User.__table__.select().with_only_columns(models.User.id, models.User.points)).all())
+    expected, applied, errors = dict(before), threading.Lock(), [0]
+
+    def worker(ops):
+        db = SessionLocal()
+        try:
+            for user_id, delta in ops:
+                for _ in range(20):
+                    try:
+                        fn(db, user_id, delta)
+                        break
+                    except OperationalError:  # SQLite "database is locked" 재시도
+                        db.rollback()
+                        time.sleep(0.001)
+                else:
+                    errors[0] += 1
+                    continue
+                with applied:
+                    expected[user_id] += delta
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=worker, args=(ops,)) for ops in work]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    with engine.connect() as conn:
+        after = dict(conn.execute(models.User.__table__.select().with_only_columns(models.User.id, models.User.points)).all())
+    ops = sum(len(w) for w in work) - errors[0]
+    return {
+        "name": name,
+        "ops": ops,
+        "errors": errors[0],
+        "elapsed_s": round(elapsed, 3),
+        "ops_per_sec": round(ops / elapsed),
+        "lost_updates_points": sum(abs(expected[u] - after[u]) for u in after),
+        "users_off": sum(expected[u] != after[u] for u in after),
+    }
+
+
+def main(args):
+    setup(args)
+    results = [run("ledger", ledger, args)]
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        mismatches = points.reconcile(db)
+        reconcile_ms = (time.perf_counter() - start) * 1000
+    finally:
+        db.close()
+    results.append(run("naive", naive, args))
+    report({
+        "database": engine.dialect.name, "users": args.users, "threads": args.threads,
+        "results": results,
+        "reconcile_after_ledger": {"mismatches": len(mismatches), "elapsed_ms": round(reconcile_ms, 1)},
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=4000)
+    main(parser.parse_args())
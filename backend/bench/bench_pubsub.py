@@ -0,0 +1,78 @@
+"""실시간 위치 push 부하 테스트.
+
+구독자 수천 명(일부는 느린 단말)을 노선별로 붙여 놓고 위치를 발행해서
+발행 1건당 fan-out 시간, 전달 지연(p50/p95/p99), drop-oldest로 버린 메시지 수를 측정합니다.
+
+    python bench/bench_pubsub.py --subscribers 5000 --routes 20 --updates 1000
+"""
+import time
+import random
+import asyncio
+import argparse
+
+from common import percentile, report
+from pubsub import Broker
+
+
+async def subscriber(sub, latencies, slow, stop):
+    while not stop.is_set():
+        payload, _ = await sub.get()
+        latencies.append(time.perf_counter() - payload["sent_at"])
+        if slow:
+            # 느린 폰: 메시지마다 오래 걸려서 큐가 넘칩니다.
+            await asyncio.sleep(0.2)
+
+
+async def main(args):
+    rng = random.Random(7)
+    broker = Broker(queue_size=args.queue_size)
+    latencies = []
+    stop = asyncio.Event()
+    subs, tasks = [], []
+    for i in range(args.subscribers):
+        sub = broker.subscribe(i % args.routes)
+        slow = rng.random() < args.slow_ratio
+        subs.append(sub)
+        tasks.append(asyncio.create_task(subscriber(sub, latencies, slow, stop)))
+
+    fan_out = []
+    start = time.perf_counter()
+    for n in range(args.updates):
+        route_id = n % args.routes
+        t0 = time.perf_counter()
+        broker.publish(route_id, {"route_id": route_id, "lat": 35.9, "lng": 128.8 + n * 1e-5, "sent_at": t0})
+        fan_out.append(time.perf_counter() - t0)
+        # 발행 사이에 구독자 태스크가 돌 수 있도록 양보합니다.
+        await asyncio.sleep(args.interval)
+    await asyncio.sleep(0.2)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    report({
+        "subscribers": args.subscribers,
+        "routes": args.routes,
+        "updates": args.updates,
+        "elapsed_s": round(elapsed, 3),
+        "delivered": len(latencies),
+        "dropped_oldest": sum(s.dropped for s in subs),
+        "fan_out_p50_ms": round(percentile(fan_out, 50) * 1000, 3),
+        "fan_out_p99_ms": round(percentile(fan_out, 99) * 1000, 3),
+        "delivery_p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "delivery_p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "delivery_p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--routes", type=int, default=20)
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--interval", type=float, default=0.001)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--slow-ratio", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
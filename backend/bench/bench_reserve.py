@@ -0,0 +1,94 @@
+"""좌석 예약 동시성 벤치마크.
+
+좌석 45개 노선 하나에 예약 시도 1,000건을 동시에 보내고
+초과 예약/중복 좌석/포인트 불일치가 없는지와 처리량, 지연 시간을 확인합니다.
+DATABASE_URL을 주면 그 DB(예: 로컬 Postgres)를, 없으면 임시 SQLite 파일을 씁니다.
+대상 DB의 테이블을 모두 지우고 시작합니다. (운영 DB 주소를 DATABASE_URL로 주지 마세요.)
+
+    python bench/bench_reserve.py --attempts 1000 --workers 50
+    DATABASE_URL=postgresql://localhost/shuttle_bench python bench/bench_reserve.py
+"""
+import os
+import time
+import tempfile
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_reserve.db"))
+
+from common import summarize, report  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+from sqlalchemy import func  # noqa: E402
+
+import models  # noqa: E402
+import booking  # noqa: E402
+from database import SessionLocal, engine  # noqa: E402
+
+PAID_ROUTE = "※신청전용(포항)"
+
+
+def setup(users, points):
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    route = models.BusRoute(route_name=PAID_ROUTE, location=PAID_ROUTE, total_seats=45)
+    db.add(route)
+    db.add_all(models.User(email=f"bench{i}@cu.ac.kr", hashed_password="x", name=f"u{i}", points=points) for i in range(users))
+    db.commit()
+    route_id = route.id
+    db.close()
+    return route_id
+
+
+def attempt(user_id, route_id):
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        booking.reserve(db, user_id, route_id)
+        db.commit()
+        outcome = "reserved"
+    except HTTPException as e:
+        db.rollback()
+        outcome = f"http_{e.status_code}"
+    except Exception as e:
+        db.rollback()
+        outcome = type(e).__name__
+    finally:
+        db.close()
+    return outcome, time.perf_counter() - start
+
+
+def main(args):
+    route_id = setup(args.attempts, booking.PAID_ROUTE_COST)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(lambda uid: attempt(uid, route_id), range(1, args.attempts + 1)))
+    elapsed = time.perf_counter() - start
+
+    outcomes = {}
+    for outcome, _ in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    db = SessionLocal()
+    bookings = db.query(func.count(models.Booking.id)).scalar()
+    seats = db.query(func.count(func.distinct(models.Booking.seat_number))).scalar()
+    spent = db.query(func.count(models.User.id)).filter(models.User.points == 0).scalar()
+    db.close()
+
+    report(summarize(
+        "reserve_burst", [lat for _, lat in results], elapsed,
+        database=engine.dialect.name,
+        outcomes=outcomes,
+        bookings=bookings,
+        distinct_seats=seats,
+        users_charged=spent,
+        consistent=bookings == seats == spent <= 45,
+    ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--attempts", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=50)
+    main(parser.parse_args())
@@ -0,0 +1,81 @@
+"""seed.py 노선 동기화 벤치마크.
+
+학기 전체 시간표(기본 5000개 출발편, 중복 포함)를 CSV로 만들어
+  - 빈 DB에 처음 동기화 (전부 추가)
+  - 같은 파일로 다시 동기화 (변경 없음)
+  - 10%의 좌석 수를 바꾼 파일로 동기화 (일부 변경 + 일부 추가)
+에 걸리는 시간을 잽니다. 대상 DB의 테이블을 모두 지우고 시작합니다. (운영 DB 주소를 DATABASE_URL로 주지 마세요.)
+
+    python bench/bench_seed_sync.py --departures 5000
+"""
+import os
+import csv
+import time
+import random
+import tempfile
+import argparse
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_seed_sync.db"))
+
+from common import report  # noqa: E402
+import models  # noqa: E402
+import seed  # noqa: E402
+import migrations  # noqa: E402
+from database import engine  # noqa: E402
+
+STOPS = ["하양역", "사월역", "성예로니모관", "성요한보스코관", "교양관", "파인앤유더퍼스트오피스텔", "반월당", "동대구역"]
+
+
+def timetable(n, rng, seat_change=0.0):
+    rows = []
+    for i in range(n):
+        origin, dest = STOPS[i % len(STOPS)], STOPS[(i // len(STOPS)) % len(STOPS)]
+        minute = (i * 7) % (16 * 60)
+        name = f"{origin}({7 + minute // 60:02d}:{minute % 60:02d})-{dest}#{i // 50}"
+        seats = 45 if rng.random() >= seat_change else 28
+        rows.append({"route_name": name, "total_seats": seats})
+        if rng.random() < 0.02:
+            rows.append({"route_name": name, "total_seats": seats})  # 원본 목록처럼 중복 행 섞기
+    return rows
+
+
+def write_csv(rows, path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["route_name", "total_seats"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def run(name, path):
+    start = time.perf_counter()
+    rows = seed.load_timetable(path)
+    parsed_ms = (time.perf_counter() - start) * 1000
+    diff = seed.sync_routes(rows)
+    return {
+        "name": name,
+        "rows": len(rows),
+        "parse_ms": round(parsed_ms, 1),
+        "sync_ms": diff["elapsed_ms"],
+        "added": len(diff["added"]),
+        "updated": len(diff["updated"]),
+        "unchanged": diff["unchanged"],
+    }
+
+
+def main(args):
+    models.Base.metadata.drop_all(bind=engine)
+    migrations.migrate(engine)
+    rng = random.Random(1)
+    tmp = tempfile.mkdtemp()
+    first, changed = os.path.join(tmp, "semester.csv"), os.path.join(tmp, "semester_changed.csv")
+    write_csv(timetable(args.departures, random.Random(1)), first)
+    write_csv(timetable(int(args.departures * 1.05), rng, seat_change=0.1), changed)
+
+    results = [run("initial", first), run("no_change", first), run("changed", changed)]
+    report({"database": engine.dialect.name, "departures": args.departures, "results": results})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--departures", type=int, default=5000)
+    main(parser.parse_args())
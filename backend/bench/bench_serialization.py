@@ -0,0 +1,110 @@
+"""응답 직렬화 벤치마크.
+
+전체 노선 목록과 쪽지 1,000건 목록을 응답 한 번 분량으로 직렬화하는 시간을 경로별로 잽니다.
+  - jsonable_encoder: response_model 없이 ORM 객체/dict를 돌려줄 때 (jsonable_encoder + json.dumps)
+  - response_model: schemas 모델로 검증/직렬화 + 기본 응답 클래스(orjson)로 렌더링
+  - catalogue: 미리 직렬화해 둔 카탈로그 바이트 (노선 목록만)
+각 경로의 gzip 압축 시간과 압축 후 크기도 같이 적습니다.
+대상 DB의 테이블을 모두 지우고 시작합니다. (운영 DB 주소를 DATABASE_URL로 주지 마세요.)
+
+    python bench/bench_serialization.py --messages 1000
+"""
+import os
+import gzip
+import time
+import tempfile
+import argparse
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_serialization.db"))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from common import report  # noqa: E402
+import main as app_main  # noqa: E402
+import models  # noqa: E402
+import seed  # noqa: E402
+import inbox  # noqa: E402
+import schemas  # noqa: E402
+import catalogue  # noqa: E402
+import migrations  # noqa: E402
+from database import engine, SessionLocal  # noqa: E402
+
+
+def setup(args):
+    models.Base.metadata.drop_all(bind=engine)
+    migrations.migrate(engine)
+    seed.sync_routes(seed.parse_routes(seed.shuttle_data_raw))
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), [{"id": 1, "email": "u1@cu.ac.kr", "hashed_password": "x", "name": "u1", "points": 0}])
+        conn.execute(models.Message.__table__.insert(), [
+            {"receiver_id": 1, "sender_id": 2, "title": f"노선 변경 안내 {i}", "content": "다음 주부터 운행 시간이 변경됩니다. " * 5, "is_read": i % 2}
+            for i in range(args.messages)
+        ])
+
+
+def timed(fn, n):
+    body = fn()
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    per_call = (time.perf_counter() - start) / n
+    start = time.perf_counter()
+    for _ in range(n):
+        gzip.compress(body, 6)
+    gzip_per_call = (time.perf_counter() - start) / n
+    return {
+        "serialize_ms": round(per_call * 1000, 3),
+        "gzip_ms": round(gzip_per_call * 1000, 3),
+        "bytes": len(body),
+        "gzip_bytes": len(gzip.compress(body, 6)),
+    }
+
+
+def response_model_path(model):
+    """FastAPI가 response_model이 있을 때 하는 일: 검증 -> JSON 모드 덤프 -> 기본 응답 클래스 렌더링."""
+    adapter = TypeAdapter(model)
+    response = app_main.DefaultResponse(content=None)
+
+    def run(content):
+        return response.render(adapter.dump_python(adapter.validate_python(content), mode="json"))
+    return run
+
+
+def main(args):
+    setup(args)
+    db = SessionLocal()
+    try:
+        orm_routes = db.query(models.BusRoute).all()
+        entry = catalogue.routes.list(db)
+        rows, _ = inbox._page_result(db.execute(inbox._page_query(1, None, args.messages)).all(), args.messages)
+    finally:
+        db.close()
+    plain = JSONResponse(content=None)
+    routes_fast = response_model_path(List[schemas.Route])
+    messages_fast = response_model_path(List[schemas.MessagePreview])
+
+    results = []
+    for name, fn in (
+        ("routes jsonable_encoder (ORM)", lambda: plain.render(jsonable_encoder(orm_routes))),
+        ("routes response_model (ORM)", lambda: routes_fast(orm_routes)),
+        ("routes catalogue", lambda: entry.body),
+        ("messages jsonable_encoder", lambda: plain.render(jsonable_encoder(rows))),
+        ("messages response_model", lambda: messages_fast(rows)),
+    ):
+        results.append({"name": name, **timed(fn, args.repeat)})
+    report({
+        "routes": len(orm_routes),
+        "messages": len(rows),
+        "response_class": app_main.DefaultResponse.__name__,
+        "results": results,
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    main(parser.parse_args())
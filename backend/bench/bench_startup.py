@@ -0,0 +1,119 @@
+"""서버리스 콜드 스타트 벤치마크 (회귀 예산 포함).
+
+api/index.py(Vercel 진입점)를 새 파이썬 프로세스에서 여러 번 불러와
+  - python -X importtime으로 잰 main import 시간과 가장 오래 걸린 모듈
+  - 프로세스 시작부터 lifespan startup을 거쳐 첫 요청(GET /) 응답까지 걸린 시간
+을 재고, 예산을 넘거나 지연 import 대상(numpy, httpx 등)이 시작 시점에 불려 오면 종료 코드 1로 끝납니다.
+
+    python bench/bench_startup.py --runs 5 --budget-ms 900
+"""
+import os
+import sys
+import json
+import tempfile
+import argparse
+import subprocess
+import statistics
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_startup.db"))
+
+from common import report  # noqa: E402
+
+BACKEND = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+
+# 시작 경로에서 불려 오면 안 되는 모듈 (처음 쓰일 때 불러오도록 되어 있는 것들)
+LAZY_MODULES = ["numpy", "httpx", "uvicorn", "email.mime", "googleapiclient", "requests"]
+
+CHILD = r"""
+import time, json, asyncio, runpy
+start = time.perf_counter()
+app = runpy.run_path("api/index.py")["app"]
+imported = time.perf_counter()
+
+async def first_request():
+    lifespan = asyncio.Queue()
+    await lifespan.put({"type": "lifespan.startup"})
+    started = asyncio.Event()
+
+    async def lifespan_send(message):
+        if message["type"].startswith("lifespan.startup"):
+            started.set()
+
+    task = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}}, lifespan.get, lifespan_send))
+    await started.wait()
+
+    status = {}
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+             "path": "/", "raw_path": b"/", "query_string": b"", "headers": [], "client": ("127.0.0.1", 1),
+             "server": ("127.0.0.1", 80), "root_path": ""}
+    await app(scope, receive, send)
+    served = time.perf_counter()
+    await lifespan.put({"type": "lifespan.shutdown"})
+    await task
+    return status.get("code"), served
+
+code, served = asyncio.run(first_request())
+print(json.dumps({"import_ms": (imported - start) * 1000, "first_response_ms": (served - start) * 1000, "status": code}))
+"""
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력에서 (모듈, 자체 us, 누적 us) 목록을 뽑습니다."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        rows.append((name, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def run_once(env):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True,
+    )
+    timings = json.loads(proc.stdout.strip().splitlines()[-1])
+    return timings, parse_importtime(proc.stderr)
+
+
+def main(args):
+    # 배포 단계처럼 스키마는 미리 적용해 두고, 측정하는 프로세스는 api/index.py 기본값(AUTO_MIGRATE=0)으로 뜹니다.
+    subprocess.run([sys.executable, "migrations.py"], cwd=BACKEND, check=True, capture_output=True)
+    env = {**os.environ}
+    env.pop("AUTO_MIGRATE", None)
+    run_once(env)  # .pyc 생성용 첫 실행은 버립니다.
+    runs = [run_once(env) for _ in range(args.runs)]
+
+    main_import_ms = [next(c for n, _, c in rows if n == "main") / 1000 for _, rows in runs]
+    first_response_ms = [t["first_response_ms"] for t, _ in runs]
+    _, last_rows = runs[-1]
+    loaded = {n for n, _, _ in last_rows}
+    violations = [m for m in LAZY_MODULES if m in loaded]
+    slowest = sorted(last_rows, key=lambda r: r[1], reverse=True)[:args.top]
+
+    result = {
+        "runs": args.runs,
+        "main_import_ms_p50": round(statistics.median(main_import_ms), 1),
+        "first_response_ms_p50": round(statistics.median(first_response_ms), 1),
+        "first_response_status": runs[-1][0]["status"],
+        "budget_ms": args.budget_ms,
+        "lazy_import_violations": violations,
+        "slowest_modules_self_ms": [[n, round(s / 1000, 1)] for n, s, _ in slowest],
+    }
+    result["ok"] = result["first_response_ms_p50"] <= args.budget_ms and not violations
+    report(result)
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=900)
+    parser.add_argument("--top", type=int, default=10)
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,90 @@
+"""다음 출발편 조회 마이크로 벤치마크.
+
+정류장 수십 개, 출발편 수천 개(기본 5000)의 노선 행으로
+  - scan: 노선 행 전체를 훑어 정류장/시간을 비교하고 정렬 (기존 방식)
+  - index: timetable.TimetableIndex 이진 탐색
+의 조회 지연과 인덱스 생성 시간을 잽니다. DB는 쓰지 않습니다.
+
+    python bench/bench_timetable.py --routes 5000 --queries 20000
+"""
+import os
+import time
+import random
+import tempfile
+import argparse
+
+# timetable이 catalogue → database를 import하므로 연결 주소만 로컬 파일로 둡니다. (연결은 하지 않습니다.)
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench_timetable.db"))
+
+from common import percentile, report  # noqa: E402
+import timetable  # noqa: E402
+
+STOPS = ["하양역", "사월역", "성예로니모관", "성요한보스코관", "교양관", "파인앤유더퍼스트오피스텔",
+         "하양(대구가톨릭대)역건너", "성야고보관", "반월당", "동대구역"]
+
+
+def make_rows(n, rng):
+    rows = []
+    for i in range(n):
+        origin = rng.choice(STOPS)
+        minute = rng.randrange(7 * 60, 22 * 60)
+        t = f"{minute // 60:02d}:{minute % 60:02d}"
+        location = f"{origin}-{rng.choice(STOPS)}"
+        rows.append({"id": i + 1, "route_name": f"{origin}({t})-{i}", "location": location, "time": t, "total_seats": 45})
+    return rows
+
+
+def scan(rows, stop, after, limit):
+    found = []
+    for r in rows:
+        minutes = timetable.to_minutes(r["time"])
+        origin, _ = timetable.split_stops(r["location"])
+        if minutes is not None and origin == stop and minutes >= after:
+            found.append((minutes, r["id"], r))
+    found.sort(key=lambda x: (x[0], x[1]))
+    return [r for _, _, r in found[:limit]]
+
+
+def measure(fn, queries):
+    samples = []
+    for stop, after in queries:
+        start = time.perf_counter()
+        fn(stop, after)
+        samples.append(time.perf_counter() - start)
+    return {
+        "p50_us": round(percentile(samples, 50) * 1e6, 2),
+        "p99_us": round(percentile(samples, 99) * 1e6, 2),
+        "qps": round(len(samples) / sum(samples)),
+    }
+
+
+def main(args):
+    rng = random.Random(1)
+    rows = make_rows(args.routes, rng)
+    queries = [(rng.choice(STOPS), rng.randrange(6 * 60, 23 * 60)) for _ in range(args.queries)]
+
+    idx = timetable.TimetableIndex()
+    start = time.perf_counter()
+    idx.build(rows)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    # 두 방식이 같은 결과를 내는지 먼저 확인합니다.
+    for stop, after in queries[:200]:
+        expected = [r["id"] for r in scan(rows, stop, after, args.limit)]
+        assert [d["route_id"] for d in idx.next_departures(stop, after, args.limit)] == expected
+
+    report({
+        "routes": args.routes,
+        "queries": args.queries,
+        "build_ms": round(build_ms, 2),
+        "scan": measure(lambda s, a: scan(rows, s, a, args.limit), queries[:min(len(queries), 2000)]),
+        "index": measure(lambda s, a: idx.next_departures(s, a, args.limit), queries),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--routes", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,82 @@
+import os
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# bench/ 상위의 backend 디렉토리를 파이썬 경로에 추가해서 main, models 등을 불러옵니다.
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+
+def percentile(samples, p):
+    """정렬되지 않은 샘플 목록에서 p(0~100) 백분위 값을 구합니다."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, int(round(p / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def summarize(name, latencies, elapsed, **extra):
+    """지연 시간(초) 목록을 처리량과 p50/p95/p99(ms) 요약으로 바꿉니다."""
+    result = {
+        "name": name,
+        "requests": len(latencies),
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+    result.update(extra)
+    return result
+
+
+def report(results):
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+def start_app_server(app, port: int = 0):
+    """FastAPI 앱을 uvicorn으로 백그라운드 스레드에서 띄우고 (server, base_url)을 반환합니다."""
+    import uvicorn
+
+    # 부하 중에는 한 연결이 기본 keep-alive(5초)보다 오래 놀 수 있는데, 서버가 닫는 순간 클라이언트가 그 연결로 보내면
+    # "Server disconnected"로 실패하므로 넉넉히 둡니다.
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", timeout_keep_alive=120))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}"
+
+
+# --- [카카오 길찾기 스텁 서버] ---
+# 실제 API 대신 고정 지연 후 카카오 모빌리티와 같은 모양의 응답을 돌려주는 로컬 서버입니다.
+class _KakaoStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.calls += 1
+        time.sleep(self.server.delay)
+        body = json.dumps({
+            "routes": [{"result_code": 0, "summary": {"distance": 12345, "duration": 1260}}]
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_kakao_stub(delay: float = 0.05, port: int = 0):
+    """스텁 서버를 백그라운드 스레드로 띄우고 (server, url)을 반환합니다."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), _KakaoStubHandler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.calls = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1/directions"
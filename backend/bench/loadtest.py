@@ -0,0 +1,205 @@
+"""셔틀 API 종합 부하 테스트.
+
+로컬 SQLite(기본) 또는 DATABASE_URL의 Postgres에 실제와 비슷한 규모의 데이터를 넣고
+main.app을 uvicorn으로 띄운 뒤, 아래 시나리오를 차례로 돌려 시나리오별 처리량과 p50/p95/p99를 JSON으로 출력합니다.
+  - login_storm: 수업 직전 로그인 몰림
+  - status_polling: 앱이 켜져 있는 동안의 상태(포인트/즐겨찾기) 조회
+  - reserve_burst: 일반 노선 동시 예약
+  - eta_polling: 정류장 근처 사용자들의 도착 예정 시간 조회 (카카오 길찾기는 로컬 스텁)
+  - mixed: 위 요청을 실제 비율에 가깝게 섞은 것
+같은 --seed면 같은 데이터와 요청 순서를 쓰므로, --output으로 저장한 결과를 커밋끼리 비교할 수 있습니다.
+대상 DB의 테이블을 모두 지우고 시작합니다. (운영 DB 주소를 DATABASE_URL로 주지 마세요.)
+
+    python bench/loadtest.py --users 5000 --bookings 200000 --messages 200000 --output before.json
+    DATABASE_URL=postgresql://localhost/shuttle_bench python bench/loadtest.py --concurrency 64
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import tempfile
+import argparse
+import subprocess
+from collections import Counter
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "loadtest.db"))
+
+from common import summarize, report, start_app_server, start_kakao_stub  # noqa: E402
+
+# 대구가톨릭대 효성캠퍼스 근처 (lon, lat)
+CAMPUS = (128.8537, 35.9133)
+
+
+def chunks(rows, size=20000):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed_data(args, rng):
+    import models
+    import seed
+    import migrations
+    from database import engine
+
+    models.Base.metadata.drop_all(bind=engine)
+    migrations.migrate(engine)
+    seed.sync_routes(seed.parse_routes(seed.shuttle_data_raw))
+    with engine.connect() as conn:
+        route_ids = [r for (r,) in conn.execute(models.BusRoute.__table__.select().with_only_columns(models.BusRoute.id))]
+
+    base = datetime(2026, 3, 2)
+    for batch in chunks({
+        "id": i, "email": f"user{i}@cu.ac.kr", "hashed_password": "pw", "name": f"학생{i}", "points": 100000,
+    } for i in range(1, args.users + 1)):
+        with engine.begin() as conn:
+            conn.execute(models.User.__table__.insert(), batch)
+    with engine.begin() as conn:
+        conn.execute(models.Favorite.__table__.insert(), [
+            {"user_id": i, "route_id": r}
+            for i in range(1, args.users + 1) for r in rng.sample(route_ids, rng.randint(0, 3))
+        ])
+    for batch in chunks({
+        "user_id": rng.randint(1, args.users), "route_id": rng.choice(route_ids),
+        "status": "cancelled", "booked_at": base + timedelta(minutes=n),
+    } for n in range(args.bookings)):
+        with engine.begin() as conn:
+            conn.execute(models.Booking.__table__.insert(), batch)
+    for batch in chunks({
+        "receiver_id": rng.randint(1, args.users), "title": "노선 변경 안내", "content": "운행 시간이 변경되었습니다. " * 4,
+        "is_read": int(rng.random() < 0.7), "created_at": base + timedelta(minutes=n),
+    } for n in range(args.messages)):
+        with engine.begin() as conn:
+            conn.execute(models.Message.__table__.insert(), batch)
+    return route_ids
+
+
+def near_campus(rng, spread=0.01):
+    return f"{CAMPUS[0] + rng.uniform(-spread, spread):.6f},{CAMPUS[1] + rng.uniform(-spread, spread):.6f}"
+
+
+def build_requests(name, args, rng, route_ids):
+    """시나리오별 (method, path, params) 목록을 만듭니다."""
+    def login():
+        return "POST", "/api/auth/login", {"email": f"user{rng.randint(1, args.users)}@cu.ac.kr", "password": "pw"}
+
+    def status():
+        return "GET", "/api/user/status", {"user_id": rng.randint(1, args.users)}
+
+    def reserve():
+        return "POST", "/api/bookings/reserve", {"user_id": rng.randint(1, args.users), "route_id": rng.choice(route_ids)}
+
+    def eta():
+        return "GET", "/api/shuttle/precise-eta", {"origin": near_campus(rng), "destination": f"{CAMPUS[0]},{CAMPUS[1]}"}
+
+    def messages():
+        return "GET", "/api/messages", {"user_id": rng.randint(1, args.users)}
+
+    def routes():
+        return "GET", "/api/routes", {}
+
+    makers = {
+        "login_storm": [(login, 1)],
+        "status_polling": [(status, 1)],
+        "reserve_burst": [(reserve, 1)],
+        "eta_polling": [(eta, 1)],
+        "mixed": [(status, 40), (routes, 20), (eta, 15), (messages, 10), (login, 10), (reserve, 5)],
+    }[name]
+    fns, weights = zip(*makers)
+    return [rng.choices(fns, weights)[0]() for _ in range(args.requests)]
+
+
+async def run_scenario(base_url, name, calls, concurrency):
+    import httpx
+
+    latencies, statuses = [], Counter()
+    queue = asyncio.Queue()
+    for call in calls:
+        queue.put_nowait(call)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker():
+            while not queue.empty():
+                method, path, params = queue.get_nowait()
+                start = time.perf_counter()
+                try:
+                    r = await client.request(method, path, params=params)
+                    statuses[r.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return summarize(name, latencies, elapsed, statuses={str(k): v for k, v in sorted(statuses.items(), key=str)})
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    route_ids = seed_data(args, rng)
+    seed_s = time.perf_counter() - start
+
+    # 카카오 클라이언트는 main import 시점의 환경 변수를 읽으므로 스텁을 먼저 띄웁니다.
+    stub, stub_url = start_kakao_stub(delay=args.kakao_delay)
+    os.environ["KAKAO_REST_API_KEY"] = "loadtest"
+    os.environ["KAKAO_DIRECTIONS_URL"] = stub_url
+    import main as app_main
+    from database import engine
+
+    server, base_url = start_app_server(app_main.app)
+    try:
+        results = []
+        for name in args.scenarios:
+            calls = build_requests(name, args, rng, route_ids)
+            results.append(asyncio.run(run_scenario(base_url, name, calls, args.concurrency)))
+    finally:
+        server.should_exit = True
+
+    output = {
+        "commit": git_commit(),
+        "database": engine.dialect.name,
+        "python": sys.version.split()[0],
+        "seed": {
+            "routes": len(route_ids), "users": args.users, "bookings": args.bookings,
+            "messages": args.messages, "seed_s": round(seed_s, 2),
+        },
+        "concurrency": args.concurrency,
+        "requests_per_scenario": args.requests,
+        "kakao_stub_calls": stub.calls,
+        "scenarios": results,
+    }
+    report(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--bookings", type=int, default=200000)
+    parser.add_argument("--messages", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=2000, help="시나리오당 요청 수")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--kakao-delay", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scenarios", nargs="+", default=["login_storm", "status_polling", "reserve_burst", "eta_polling", "mixed"])
+    parser.add_argument("--output")
+    main(parser.parse_args())
@@ -0,0 +1,198 @@
+import os
+import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select, update, delete, func, case, tuple_, literal
+
+import models
+import catalogue
+import points
+import occupancy
+from database import dialect_insert
+
+# 유료 노선 키워드와 1회 요금(포인트)
+PAID_ROUTE_KEYWORDS = ["경주", "울산", "포항"]
+PAID_ROUTE_COST = 3000
+MAX_HISTORY_PAGE = 100
+# 오늘부터 며칠 뒤 운행편까지 예약할 수 있는지
+BOOKING_DAYS_AHEAD = int(os.getenv("BOOKING_DAYS_AHEAD", "14"))
+
+
+def route_cost(route_name: str) -> int:
+    return PAID_ROUTE_COST if any(k in route_name for k in PAID_ROUTE_KEYWORDS) else 0
+
+
+def service_date(value: Optional[datetime.date] = None, today: Optional[datetime.date] = None) -> datetime.date:
+    """예약할 운행일을 확인합니다. 안 주면 오늘이고, 지난 날짜나 BOOKING_DAYS_AHEAD일 뒤보다 먼 날짜는 400입니다.
+
+    today는 기준 날짜입니다. 대기열 ticket은 접수한 날을 기준으로 확인합니다. (자정 직전 접수분이 자정 뒤 처리되어도 같은 결과)
+    """
+    today = today or datetime.date.today()
+    if value is None:
+        return today
+    if value < today or value > today + datetime.timedelta(days=BOOKING_DAYS_AHEAD):
+        raise HTTPException(status_code=400, detail=f"운행일은 오늘부터 {BOOKING_DAYS_AHEAD}일 뒤까지 선택할 수 있습니다.")
+    return value
+
+
+def ensure_seats(db, route_id: int, day: datetime.date, total_seats: int):
+    """운행편(노선, 운행일)의 좌석 행(1..total_seats)을 맞춥니다. commit은 호출한 쪽이 합니다.
+
+    좌석이 모자라면 만들고, total_seats가 줄었으면 넘는 번호의 빈 좌석을 지웁니다. (배정된 좌석은 남깁니다.)
+    이미 맞으면 좌석 수를 세는 SELECT 한 번으로 끝납니다. 요청 세션 안에서 충돌 무시 INSERT로 만들므로
+    새 운행편에 첫 예약이 몰려도 요청마다 연결을 하나만 쓰고, 같은 좌석을 동시에 만들면 한쪽만 들어갑니다.
+    프로세스마다 기억해 두지 않으므로 노선 좌석 수 변경도 바로 반영됩니다.
+    """
+    S = models.Seat
+    total_seats = total_seats or 0
+    within, beyond_free = db.execute(
+        select(
+            func.count(case((S.seat_number <= total_seats, 1))),
+            func.count(case(((S.seat_number > total_seats) & S.booking_id.is_(None), 1))),
+        ).where(S.route_id == route_id, S.service_date == day)
+    ).one()
+    if within < total_seats:
+        insert = dialect_insert(db.get_bind())
+        stmt = insert(S).on_conflict_do_nothing(index_elements=["route_id", "service_date", "seat_number"])
+        db.execute(stmt, [
+            {"route_id": route_id, "service_date": day, "seat_number": n} for n in range(1, total_seats + 1)
+        ])
+    if beyond_free:
+        db.execute(delete(S).where(
+            S.route_id == route_id, S.service_date == day,
+            S.seat_number > total_seats, S.booking_id.is_(None),
+        ).execution_options(synchronize_session=False))
+
+
+def claim_seat(db, route_id: int, day: datetime.date, booking_id: int, seat_number: Optional[int] = None) -> Optional[int]:
+    """운행편의 빈 좌석 하나를 예약에 배정하고 좌석 번호를 반환합니다. 빈 좌석이 없으면 None.
+
+    다른 트랜잭션이 잡고 있는 좌석은 SKIP LOCKED로 건너뛰기 때문에
+    같은 노선에 예약이 몰려도 서로의 커밋을 기다리지 않습니다. (SQLite에서는 FOR UPDATE가 생략됩니다.)
+    """
+    candidate = select(models.Seat.id).where(
+        models.Seat.route_id == route_id,
+        models.Seat.service_date == day,
+        models.Seat.booking_id.is_(None),
+    )
+    if seat_number is not None:
+        candidate = candidate.where(models.Seat.seat_number == seat_number)
+    candidate = candidate.order_by(models.Seat.seat_number).limit(1).with_for_update(skip_locked=True)
+
+    row = db.execute(
+        update(models.Seat)
+        .where(models.Seat.id == candidate.scalar_subquery(), models.Seat.booking_id.is_(None))
+        .values(booking_id=booking_id)
+        .returning(models.Seat.seat_number)
+    ).first()
+    return row[0] if row else None
+
+
+def release_seat(db, booking_id: int):
+    db.execute(update(models.Seat).where(models.Seat.booking_id == booking_id).values(booking_id=None))
+
+
+def seat_counts(db, route_id: int, day: datetime.date):
+    total, reserved = db.query(
+        func.count(models.Seat.id),
+        func.count(models.Seat.booking_id),
+    ).filter(models.Seat.route_id == route_id, models.Seat.service_date == day).one()
+    return {
+        "route_id": route_id, "service_date": day,
+        "total_seats": total, "reserved": reserved, "available": total - reserved,
+    }
+
+
+def reserve(db, user_id: int, route_id: int, seat_number: Optional[int] = None,
+            day: Optional[datetime.date] = None, today: Optional[datetime.date] = None) -> dict:
+    """운행편(노선, 운행일)에 대해 포인트 차감, 예약 생성, 좌석 배정을 한 트랜잭션으로 처리합니다.
+
+    day를 안 주면 오늘 운행편입니다. today는 service_date()의 기준 날짜입니다. commit은 호출한 쪽이 합니다.
+    """
+    day = service_date(day, today)
+    route = catalogue.routes.row(db, route_id)
+    if not route:
+        raise HTTPException(status_code=404, detail="정보 없음")
+    # 없는 좌석 번호는 "이미 선택된 좌석"(409)이 아니라 잘못된 요청입니다.
+    if seat_number is not None and not 1 <= seat_number <= (route["total_seats"] or 0):
+        raise HTTPException(status_code=400, detail=f"좌석 번호는 1~{route['total_seats'] or 0}번입니다.")
+    ensure_seats(db, route_id, day, route["total_seats"])
+
+    # 읽고-빼고-쓰기 대신 조건부 UPDATE 한 번으로 잔액 확인과 차감을 같이 합니다.
+    cost = route_cost(route["route_name"])
+    balance = points.change_balance(db, user_id, -cost)
+    if balance is None:
+        if db.query(models.User.id).filter(models.User.id == user_id).first() is None:
+            raise HTTPException(status_code=404, detail="정보 없음")
+        raise HTTPException(status_code=400, detail="포인트 부족")
+
+    booking = models.Booking(user_id=user_id, route_id=route_id, status="reserved", service_date=day)
+    db.add(booking)
+    db.flush()
+    if cost:
+        points.append(db, user_id, -cost, balance, "reserve", booking.id)
+
+    seat = claim_seat(db, route_id, day, booking.id, seat_number)
+    if seat is None:
+        detail = "이미 선택된 좌석입니다." if seat_number is not None else "잔여 좌석이 없습니다."
+        raise HTTPException(status_code=409, detail=detail)
+    booking.seat_number = seat
+    occupancy.record_reserve(db, route_id, day)
+    return {
+        "status": "success", "booking_id": booking.id, "service_date": day,
+        "seat_number": seat, "remaining_points": balance,
+    }
+
+
+def cancel(db, user_id: int, booking_id: int) -> dict:
+    """예약을 취소하고 좌석과 포인트를 돌려줍니다. commit은 호출한 쪽이 합니다."""
+    row = db.execute(
+        update(models.Booking)
+        .where(
+            models.Booking.id == booking_id,
+            models.Booking.user_id == user_id,
+            models.Booking.status == "reserved",
+        )
+        .values(status="cancelled")
+        .returning(models.Booking.route_id, models.Booking.service_date)
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="취소할 예약이 없습니다.")
+    release_seat(db, booking_id)
+    if row.service_date is not None:
+        occupancy.record_cancel(db, row.route_id, row.service_date)
+
+    route = catalogue.routes.row(db, row[0])
+    refund = route_cost(route["route_name"]) if route else 0
+    balance = points.apply_delta(db, user_id, refund, "refund", booking_id)
+    return {"status": "success", "booking_id": booking_id, "refunded_points": refund, "remaining_points": balance}
+
+
+def history(db, user_id: int, cursor: Optional[int] = None, limit: int = 20):
+    """사용자의 예약 내역을 최신순(booked_at, id 내림차순)으로 한 페이지 반환합니다.
+
+    쪽지 목록과 같은 방식으로 cursor(이전 페이지 마지막 예약 id) 다음부터 ix_bookings_user_booked 인덱스로 이어 읽습니다.
+    반환값은 (목록, 다음 커서)입니다.
+    """
+    B = models.Booking
+    limit = max(1, min(limit, MAX_HISTORY_PAGE))
+    query = select(B.id, B.route_id, B.status, B.service_date, B.seat_number, B.booked_at).where(B.user_id == user_id)
+    if cursor is not None:
+        cursor_booked = select(B.booked_at).where(B.id == cursor).scalar_subquery()
+        query = query.where(tuple_(B.booked_at, B.id) < tuple_(cursor_booked, literal(cursor)))
+    rows = db.execute(query.order_by(B.booked_at.desc(), B.id.desc()).limit(limit + 1)).all()
+    items = []
+    for r in rows[:limit]:
+        route = catalogue.routes.row(db, r.route_id)
+        items.append({
+            "booking_id": r.id,
+            "route_id": r.route_id,
+            "route_name": route["route_name"] if route else None,
+            "status": r.status,
+            "service_date": r.service_date,
+            "seat_number": r.seat_number,
+            "booked_at": r.booked_at,
+        })
+    next_cursor = items[-1]["booking_id"] if len(rows) > limit else None
+    return items, next_cursor
@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+import models
+from cache import TTLCache
+
+# DB의 노선 버전을 다시 확인하는 최소 간격(초). 다른 프로세스(seed.py 등)의 변경은 이 시간 안에 반영됩니다.
+CATALOGUE_RECHECK = float(os.getenv("CATALOGUE_RECHECK", "5"))
+
+ROUTES_VERSION = "routes"
+ROUTE_FIELDS = ("id", "route_name", "location", "time", "total_seats")
+
+
+def get_version(db, name: str = ROUTES_VERSION) -> int:
+    row = db.query(models.DataVersion.version).filter(models.DataVersion.name == name).first()
+    return row[0] if row else 0
+
+
+def bump_version(db, name: str = ROUTES_VERSION):
+    """버전을 1 올립니다. 호출한 쪽의 트랜잭션 안에서 실행되고 commit은 호출한 쪽이 합니다."""
+    res = db.execute(
+        update(models.DataVersion)
+        .where(models.DataVersion.name == name)
+        .values(version=models.DataVersion.version + 1)
+    )
+    if res.rowcount == 0:
+        try:
+            with db.begin_nested():
+                db.add(models.DataVersion(name=name, version=1))
+        except IntegrityError:
+            # 동시에 다른 곳에서 행을 만들었으면 다시 올립니다.
+            bump_version(db, name)
+
+
+try:
+    import orjson
+
+    def _encode(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def _encode(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+class Entry:
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = _etag(body)
+
+
+# --- [노선 카탈로그] ---
+# 노선 목록/상세를 미리 직렬화한 JSON 바이트와 ETag로 들고 있습니다.
+# 노선은 seed.py가 돌 때만 바뀌므로 data_versions의 routes 버전이 바뀔 때만 다시 읽습니다.
+# 실시간 위치(current_lat 등)는 /api/shuttle/location에서 제공하므로 카탈로그에는 넣지 않습니다.
+class RouteCatalogue:
+    def __init__(self):
+        self.version = None
+        self.rows = []
+        self.all = None
+        self.by_id = {}
+        self.row_by_id = {}
+        self._checked_at = 0.0
+        self._filtered = TTLCache(maxsize=256, ttl=3600)
+        self._lock = threading.Lock()
+
+    def _load(self, db, version: int):
+        routes = db.query(*(getattr(models.BusRoute, f) for f in ROUTE_FIELDS)).order_by(models.BusRoute.id).all()
+        rows = [dict(zip(ROUTE_FIELDS, r)) for r in routes]
+        self.rows = rows
+        self.all = Entry(_encode(rows))
+        self.by_id = {r["id"]: Entry(_encode(r)) for r in rows}
+        self.row_by_id = {r["id"]: r for r in rows}
+        self._filtered.clear()
+        self.version = version
+
+    def refresh(self, db, force: bool = False):
+        now = time.monotonic()
+        if not force and self.version is not None and now - self._checked_at < CATALOGUE_RECHECK:
+            return
+        with self._lock:
+            if not force and self.version is not None and now - self._checked_at < CATALOGUE_RECHECK:
+                return
+            version = get_version(db)
+            if force or version != self.version:
+                self._load(db, version)
+            self._checked_at = now
+
+    def stale(self) -> bool:
+        """다음 refresh()에서 DB 버전을 다시 확인해야 하면 True. (DB 세션 없이 바로 확인할 수 있습니다.)"""
+        return self.version is None or time.monotonic() - self._checked_at >= CATALOGUE_RECHECK
+
+    def has(self, route_id: int) -> bool:
+        """마지막으로 읽은 카탈로그에 있는 노선 id인지 확인합니다. (DB를 다시 읽지 않습니다.)"""
+        return route_id in self.row_by_id
+
+    def invalidate(self):
+        """다음 요청에서 DB 버전을 바로 다시 확인하도록 합니다."""
+        self._checked_at = 0.0
+
+    def list(self, db, location: Optional[str] = None, time_: Optional[str] = None) -> Entry:
+        self.refresh(db)
+        if not location and not time_:
+            return self.all
+        key = (self.version, location, time_)
+        entry = self._filtered.get(key)
+        if entry is None:
+            rows = [
+                r for r in self.rows
+                if (not location or location in (r["location"] or ""))
+                and (not time_ or r["time"] == time_)
+            ]
+            entry = Entry(_encode(rows))
+            self._filtered.set(key, entry)
+        return entry
+
+    def get(self, db, route_id: int) -> Optional[Entry]:
+        self.refresh(db)
+        return self.by_id.get(route_id)
+
+    def row(self, db, route_id: int) -> Optional[dict]:
+        self.refresh(db)
+        return self.row_by_id.get(route_id)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [t.strip() for t in if_none_match.split(",")]
+    # If-None-Match는 약한 비교를 쓰므로 W/ 접두사는 무시합니다.
+    return etag in (t[2:] if t.startswith("W/") else t for t in tags)
+
+
+routes = RouteCatalogue()
@@ -0,0 +1,164 @@
+import os
+import time
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import update, case, func
+
+import models
+import mailer
+from cache import TTLCache
+from database import SessionLocal, dialect_insert
+
+# --- [이메일 인증번호 저장소] ---
+# memory: 프로세스 안의 TTL+LRU 캐시 (워커 1개일 때만 사용)
+# db: verification_codes 테이블 (워커/서버리스 인스턴스가 여러 개여도 같은 코드를 봅니다)
+CODE_STORE = os.getenv("CODE_STORE", "db")
+CODE_TTL = int(os.getenv("CODE_TTL", "300"))
+# 같은 이메일로 CODE_RATE_WINDOW초 동안 최대 CODE_RATE_LIMIT번까지 발송합니다.
+CODE_RATE_LIMIT = int(os.getenv("CODE_RATE_LIMIT", "5"))
+CODE_RATE_WINDOW = int(os.getenv("CODE_RATE_WINDOW", "600"))
+# 코드 하나당 틀릴 수 있는 횟수. 넘으면 코드를 지워서 새로 발송받아야 합니다. (발송은 위 한도에 걸리므로 추측 횟수가 묶입니다.)
+CODE_MAX_ATTEMPTS = int(os.getenv("CODE_MAX_ATTEMPTS", "5"))
+CODE_MEMORY_SIZE = int(os.getenv("CODE_MEMORY_SIZE", "100000"))
+
+
+def new_code() -> str:
+    return str(random.randint(100000, 999999))
+
+
+class MemoryCodeStore:
+    def __init__(self, maxsize: int = CODE_MEMORY_SIZE):
+        self._codes = TTLCache(maxsize=maxsize, ttl=CODE_TTL)
+        self._sends = TTLCache(maxsize=maxsize, ttl=CODE_RATE_WINDOW)
+        self._lock = threading.Lock()
+
+    def issue(self, email: str) -> Optional[str]:
+        """새 인증번호를 저장하고 반환합니다. 발송 한도를 넘으면 None."""
+        now = time.monotonic()
+        with self._lock:
+            window_start, sent = self._sends.get(email, (now, 0))
+            if sent >= CODE_RATE_LIMIT:
+                return None
+            # 한도 창은 첫 발송 시점부터 세므로 남은 시간만큼만 다시 저장합니다.
+            self._sends.set(email, (window_start, sent + 1), ttl=window_start + CODE_RATE_WINDOW - now)
+            code = new_code()
+            # (코드, 틀린 횟수, 만료 시각)
+            self._codes.set(email, (code, 0, now + CODE_TTL))
+            return code
+
+    def consume(self, email: str, code: str) -> bool:
+        """코드가 맞으면 지우고 True를 반환합니다. 같은 코드는 한 번만 쓸 수 있습니다.
+
+        틀리면 횟수를 세고, CODE_MAX_ATTEMPTS번 틀리면 코드를 지웁니다.
+        """
+        with self._lock:
+            item = self._codes.get(email)
+            if item is None:
+                return False
+            stored, failures, expires_at = item
+            if code and stored == code:
+                self._codes.pop(email)
+                return True
+            if failures + 1 >= CODE_MAX_ATTEMPTS:
+                self._codes.pop(email)
+            else:
+                # 만료 시각은 발송 시점 기준이라 남은 시간만큼만 다시 저장합니다.
+                self._codes.set(email, (stored, failures + 1, expires_at), ttl=expires_at - time.monotonic())
+            return False
+
+
+class DBCodeStore:
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    def issue(self, email: str) -> Optional[str]:
+        """이메일별 한 행을 upsert 한 번으로 갱신합니다. 한도 검사도 같은 문장의 WHERE에서 하므로 워커 간 경쟁이 없습니다."""
+        code = new_code()
+        now = datetime.now()
+        cutoff = now - timedelta(seconds=CODE_RATE_WINDOW)
+        T = models.VerificationCode
+        db = self.session_factory()
+        try:
+            insert = dialect_insert(db.get_bind())
+            stmt = insert(T).values(
+                email=email, code=code, expires_at=now + timedelta(seconds=CODE_TTL),
+                window_start=now, sent_count=1, failed_attempts=0,
+            )
+            window_expired = T.window_start <= cutoff
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["email"],
+                set_={
+                    "code": stmt.excluded.code,
+                    "expires_at": stmt.excluded.expires_at,
+                    "failed_attempts": 0,
+                    "sent_count": case((window_expired, 1), else_=T.sent_count + 1),
+                    "window_start": case((window_expired, stmt.excluded.window_start), else_=T.window_start),
+                },
+                where=window_expired | (T.sent_count < CODE_RATE_LIMIT),
+            ).returning(T.email)
+            issued = db.execute(stmt).first() is not None
+            db.commit()
+            return code if issued else None
+        finally:
+            db.close()
+
+    def consume(self, email: str, code: str) -> bool:
+        """맞는 코드를 UPDATE ... RETURNING으로 비우면서 확인합니다. 동시에 두 번 써도 한 번만 성공합니다.
+
+        틀리면 같은 행의 failed_attempts를 UPDATE 한 번으로 올리고, CODE_MAX_ATTEMPTS번째에 코드를 비웁니다.
+        """
+        T = models.VerificationCode
+        now = datetime.now()
+        failures = func.coalesce(T.failed_attempts, 0)
+        db = self.session_factory()
+        try:
+            res = None
+            if code:
+                res = db.execute(
+                    update(T)
+                    .where(T.email == email, T.code == code, T.expires_at > now, failures < CODE_MAX_ATTEMPTS)
+                    .values(code=None, expires_at=None)
+                    .returning(T.email)
+                ).first()
+            if res is None:
+                locked_out = failures + 1 >= CODE_MAX_ATTEMPTS
+                db.execute(
+                    update(T)
+                    .where(T.email == email, T.code.isnot(None))
+                    .values(
+                        failed_attempts=failures + 1,
+                        code=case((locked_out, None), else_=T.code),
+                        expires_at=case((locked_out, None), else_=T.expires_at),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+            return res is not None
+        finally:
+            db.close()
+
+
+def issue_and_send(email: str) -> bool:
+    """인증번호를 만들어 메일로 보냅니다. 발송 한도를 넘으면 False, 메일 발송이 안 되면 mailer.MailError."""
+    if not mailer.configured():
+        # 한도를 쓰기 전에 먼저 막습니다.
+        raise mailer.MailError("메일 발송이 설정되지 않았습니다.")
+    code = store.issue(email)
+    if code is None:
+        return False
+    mailer.send_code(email, code, max(1, CODE_TTL // 60))
+    return True
+
+
+def get_store(kind: str = CODE_STORE):
+    if kind == "memory":
+        return MemoryCodeStore()
+    if kind == "db":
+        return DBCodeStore()
+    raise ValueError(f"알 수 없는 CODE_STORE: {kind}")
+
+
+store = get_store()
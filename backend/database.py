@@ -1,4 +1,5 @@
 import os
+import metrics
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -19,13 +20,45 @@ if SQLALCHEMY_DATABASE_URL and SQLALCHEMY_DATABASE_URL.startswith("postgres://")
     SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
 # 2. 엔진 생성
-# pool_pre_ping: 연결이 유효한지 체크 (연결 끊김 방지)
+# pool_pre_ping: 연결이 유효한지 체크 (연결 끊김 방지). 체크아웃마다 왕복이 한 번 더 생기므로
+#   DB_POOL_RECYCLE을 DB/프록시의 유휴 연결 종료 시간보다 짧게 두었다면 DB_POOL_PRE_PING=0으로 꺼도 됩니다.
 # pool_recycle: 연결 유지 시간 설정
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300
-)
+# DB_POOL_SIZE/DB_MAX_OVERFLOW: 워커당 유지할 연결 수와 순간적으로 더 열 수 있는 연결 수
+# DB_POOL_TIMEOUT: 풀이 가득 찼을 때 연결을 기다리는 최대 시간(초)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "300"))
+# SQLite 파일 DB에서 다른 연결이 쓰는 중일 때 쓰기 잠금을 기다리는 최대 시간(초). 드라이버 기본값(5초)은
+# 대기열 작업자의 배치 트랜잭션과 요청들이 동시에 쓰면 모자라서 "database is locked"로 실패할 수 있습니다.
+DB_SQLITE_TIMEOUT = float(os.getenv("DB_SQLITE_TIMEOUT", "30"))
+# DB_ASYNC=1이면 AsyncSession을 쓰는 비동기 엔진도 만들고, 자주 불리는 API를 비동기 버전으로 제공합니다.
+DB_ASYNC = os.getenv("DB_ASYNC", "0") == "1"
+
+
+def pool_options(url: str) -> dict:
+    options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    # SQLite 메모리 DB는 연결 하나를 공유하는 풀이라 크기 옵션을 받지 않습니다.
+    if not (url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":"))):
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+        if url.startswith("sqlite"):
+            options["connect_args"] = {"timeout": DB_SQLITE_TIMEOUT}
+    return options
+
+
+def async_url(url: str) -> str:
+    """동기 드라이버 주소를 비동기 드라이버(asyncpg, aiosqlite) 주소로 바꿉니다."""
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **pool_options(SQLALCHEMY_DATABASE_URL))
+# 요청별 쿼리 수/DB 시간 집계 (metrics.py)
+metrics.instrument_engine(engine)
 
 # 3. 세션 및 베이스 클래스 생성
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -38,3 +71,36 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# 비동기 엔진은 DB_ASYNC=1일 때만 만듭니다. (asyncpg/aiosqlite가 필요합니다.)
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(
+        async_url(SQLALCHEMY_DATABASE_URL), **pool_options(SQLALCHEMY_DATABASE_URL)
+    )
+    metrics.instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# 5. 방언별 insert (ON CONFLICT 절을 쓰기 위함)
+def dialect_insert(bind):
+    if bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+# 6. 배치 작업용 바깥 트랜잭션 시작
+# pysqlite는 SAVEPOINT 앞에 BEGIN을 보내지 않아서, 가장 바깥 SAVEPOINT를 RELEASE할 때마다 커밋되어 버립니다.
+# 항목별 SAVEPOINT를 쓰면서 배치 전체를 한 번에 커밋하려면 SQLite에서는 BEGIN을 직접 보내야 합니다.
+# 배치는 쓰기 트랜잭션이므로 IMMEDIATE로 처음부터 쓰기 잠금을 잡습니다. (읽다가 쓰기로 올리는 도중
+# 다른 연결이 먼저 쓰면 SQLite는 기다리지 않고 바로 "database is locked"를 냅니다.)
+def begin_batch(db):
+    if db.get_bind().dialect.name == "sqlite":
+        db.connection().exec_driver_sql("BEGIN IMMEDIATE")
@@ -0,0 +1,63 @@
+import math
+from typing import List, TYPE_CHECKING
+
+# numpy는 일괄 ETA 계산에서만 쓰므로 처음 호출될 때 불러옵니다. (서버리스 콜드 스타트 단축)
+if TYPE_CHECKING:
+    import numpy as np
+
+# --- [ETA 추정 모델] ---
+# 카카오 길찾기를 쓸 수 없을 때 쓰는 직선거리 기반 추정입니다.
+# 평균 35km/h로 달리고 정차 등으로 2분이 더 걸린다고 가정합니다.
+EARTH_RADIUS_KM = 6371
+AVG_SPEED_KMH = 35
+EXTRA_MIN = 2
+
+
+def get_haversine_distance(origin_str: str, dest_str: str):
+    try:
+        lon1, lat1 = map(float, origin_str.split(','))
+        lon2, lat2 = map(float, dest_str.split(','))
+        R = EARTH_RADIUS_KM
+        d_lat, d_lon = math.radians(lat2 - lat1), math.radians(lon2 - lon1)
+        a = math.sin(d_lat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(d_lon/2)**2
+        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+        dist = R * c
+        return round(dist, 1), math.ceil((dist/AVG_SPEED_KMH)*60)+EXTRA_MIN
+    except: return 0.0, 0
+
+
+def parse_coords(points: List[str]) -> "np.ndarray":
+    """"lon,lat" 문자열 목록을 (N, 2) 배열로 바꿉니다. 해석할 수 없는 값은 NaN이 됩니다."""
+    import numpy as np
+
+    coords = np.full((len(points), 2), np.nan)
+    for i, p in enumerate(points):
+        try:
+            lon, lat = map(float, p.split(','))
+            coords[i] = (lon, lat)
+        except (ValueError, AttributeError):
+            pass
+    return coords
+
+
+def haversine_matrix(origins: List[str], destinations: List[str]):
+    """N개 출발지 × M개 도착지의 (거리 km, 소요 분) 행렬을 한 번의 벡터 연산으로 구합니다.
+
+    get_haversine_distance와 같은 모델을 쓰고, 좌표를 해석할 수 없는 칸은 (0.0, 0)입니다.
+    """
+    import numpy as np
+
+    o = np.radians(parse_coords(origins))
+    d = np.radians(parse_coords(destinations))
+    lon1, lat1 = o[:, 0:1], o[:, 1:2]
+    lon2, lat2 = d[:, 0], d[:, 1]
+
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    dist = EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    invalid = np.isnan(dist)
+    duration = np.ceil(dist / AVG_SPEED_KMH * 60) + EXTRA_MIN
+    dist_km = np.round(dist, 1)
+    dist_km[invalid] = 0.0
+    duration[invalid] = 0
+    return dist_km, duration.astype(np.int64)
@@ -0,0 +1,155 @@
+from typing import List, Optional
+
+from sqlalchemy import select, update, insert, func, tuple_, literal, union, Integer
+
+import models
+
+# 목록 화면에서 본문 대신 보여줄 미리보기 글자 수
+PREVIEW_LENGTH = 80
+MAX_PAGE_SIZE = 100
+# 수신자 목록을 직접 줄 때 한 번의 executemany로 넣는 행 수
+BROADCAST_CHUNK = 5000
+AUDIENCES = ("favorites", "bookings", "all", "everyone")
+
+
+def _page_query(user_id: int, cursor: Optional[int], limit: int):
+    M = models.Message
+    query = select(
+        M.id, M.title, M.sender_id, M.is_read, M.created_at,
+        func.substr(M.content, 1, PREVIEW_LENGTH).label("preview"),
+    ).where(M.receiver_id == user_id)
+    if cursor is not None:
+        cursor_created = select(M.created_at).where(M.id == cursor).scalar_subquery()
+        query = query.where(tuple_(M.created_at, M.id) < tuple_(cursor_created, literal(cursor)))
+    return query.order_by(M.created_at.desc(), M.id.desc()).limit(limit + 1)
+
+
+def _page_result(rows, limit: int):
+    items = [{
+        "id": r.id,
+        "title": r.title,
+        "preview": r.preview,
+        "sender_id": r.sender_id,
+        "is_read": r.is_read,
+        "created_at": r.created_at,
+    } for r in rows[:limit]]
+    next_cursor = items[-1]["id"] if len(rows) > limit else None
+    return items, next_cursor
+
+
+def list_page(db, user_id: int, cursor: Optional[int] = None, limit: int = 20):
+    """받은 쪽지를 최신순(created_at, id 내림차순)으로 한 페이지 반환합니다.
+
+    cursor는 이전 페이지 마지막 쪽지의 id입니다. OFFSET 대신 (created_at, id) < 커서 조건으로
+    인덱스에서 바로 이어 읽기 때문에 쪽지가 아무리 많아도 페이지당 비용이 일정합니다.
+    반환값은 (목록, 다음 커서)이고 마지막 페이지면 다음 커서는 None입니다.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return _page_result(db.execute(_page_query(user_id, cursor, limit)).all(), limit)
+
+
+async def list_page_async(db, user_id: int, cursor: Optional[int] = None, limit: int = 20):
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    return _page_result((await db.execute(_page_query(user_id, cursor, limit))).all(), limit)
+
+
+def get_detail(db, message_id: int, user_id: int) -> Optional[dict]:
+    """받은 사람(receiver_id)이 user_id인 쪽지만 반환합니다. 남의 쪽지는 없는 것(None)과 같게 취급합니다."""
+    m = db.query(models.Message).filter(
+        models.Message.id == message_id,
+        models.Message.receiver_id == user_id,
+    ).first()
+    if m is None:
+        return None
+    return {
+        "id": m.id,
+        "title": m.title,
+        "content": m.content,
+        "sender_id": m.sender_id,
+        "is_read": m.is_read,
+        "created_at": m.created_at,
+    }
+
+
+def _unread_query(user_id: int):
+    return select(func.count(models.Message.id)).where(
+        models.Message.receiver_id == user_id,
+        models.Message.is_read == 0,
+    )
+
+
+def unread_count(db, user_id: int) -> int:
+    return db.execute(_unread_query(user_id)).scalar()
+
+
+async def unread_count_async(db, user_id: int) -> int:
+    return (await db.execute(_unread_query(user_id))).scalar()
+
+
+def mark_read(db, user_id: int, message_ids: Optional[List[int]] = None) -> int:
+    """읽음 처리를 UPDATE 한 번으로 합니다. message_ids가 없으면 안 읽은 쪽지 전체가 대상입니다."""
+    stmt = update(models.Message).where(
+        models.Message.receiver_id == user_id,
+        models.Message.is_read == 0,
+    )
+    if message_ids is not None:
+        stmt = stmt.where(models.Message.id.in_(message_ids))
+    return db.execute(stmt.values(is_read=1).execution_options(synchronize_session=False)).rowcount
+
+
+# --- [공지 일괄 발송] ---
+def _recipients(route_id: Optional[int], audience: str):
+    """공지 대상 user_id를 고르는 SELECT를 만듭니다. 중복은 UNION으로 제거합니다."""
+    if audience == "everyone":
+        return select(models.User.id.label("user_id"))
+    favorites = select(models.Favorite.user_id).where(models.Favorite.route_id == route_id)
+    bookings = select(models.Booking.user_id).where(
+        models.Booking.route_id == route_id,
+        models.Booking.status == "reserved",
+    )
+    if audience == "favorites":
+        return favorites.distinct()
+    if audience == "bookings":
+        return bookings.distinct()
+    return union(favorites, bookings)
+
+
+def broadcast(db, title: str, content: str, route_id: Optional[int] = None, audience: str = "all", sender_id: Optional[int] = None):
+    """노선 즐겨찾기/예약자(또는 전체 사용자)에게 INSERT ... SELECT 한 문장으로 쪽지를 보냅니다.
+
+    보낸 건수를 반환합니다. commit은 호출한 쪽이 합니다.
+    """
+    recipients = _recipients(route_id, audience).subquery()
+    rows = select(
+        literal(sender_id, Integer),
+        recipients.c.user_id,
+        literal(title),
+        literal(content),
+        literal(0),
+        func.now(),
+    )
+    res = db.execute(
+        insert(models.Message).from_select(["sender_id", "receiver_id", "title", "content", "is_read", "created_at"], rows)
+    )
+    return res.rowcount
+
+
+def send_bulk(db, receiver_ids: List[int], title: str, content: str, sender_id: Optional[int] = None):
+    """수신자 id 목록이 정해져 있을 때 BROADCAST_CHUNK개씩 executemany로 넣습니다.
+
+    중복 id는 한 번만 보내고, 없는 사용자 id는 건너뜁니다. 보낸 건수를 반환합니다.
+    """
+    table = models.Message.__table__
+    receiver_ids = list(dict.fromkeys(receiver_ids))
+    sent = 0
+    for i in range(0, len(receiver_ids), BROADCAST_CHUNK):
+        chunk = receiver_ids[i:i + BROADCAST_CHUNK]
+        existing = {uid for (uid,) in db.execute(select(models.User.id).where(models.User.id.in_(chunk)))}
+        rows = [
+            {"sender_id": sender_id, "receiver_id": uid, "title": title, "content": content, "is_read": 0}
+            for uid in chunk if uid in existing
+        ]
+        if rows:
+            db.execute(table.insert().values(created_at=func.now()), rows)
+        sent += len(rows)
+    return sent
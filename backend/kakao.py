@@ -0,0 +1,115 @@
+import os
+import math
+import asyncio
+import logging
+from typing import Optional, Tuple
+
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# --- [환경 변수] ---
+KAKAO_REST_API_KEY = os.getenv("KAKAO_REST_API_KEY")
+KAKAO_DIRECTIONS_URL = os.getenv("KAKAO_DIRECTIONS_URL", "https://apis-navi.kakaomobility.com/v1/directions")
+KAKAO_TIMEOUT = float(os.getenv("KAKAO_TIMEOUT", "5"))
+KAKAO_POOL_SIZE = int(os.getenv("KAKAO_POOL_SIZE", "20"))
+KAKAO_CACHE_TTL = float(os.getenv("KAKAO_CACHE_TTL", "30"))
+KAKAO_CACHE_SIZE = int(os.getenv("KAKAO_CACHE_SIZE", "2048"))
+# 좌표를 이 격자(도 단위) 크기로 반올림해서 캐시 키를 만듭니다. 0.0005도 ≈ 50m
+KAKAO_CACHE_GRID = float(os.getenv("KAKAO_CACHE_GRID", "0.0005"))
+
+
+def grid_key(origin: str, destination: str, grid: float = KAKAO_CACHE_GRID):
+    """"lon,lat" 문자열 두 개를 격자 단위로 반올림한 캐시 키로 바꿉니다."""
+    lon1, lat1 = map(float, origin.split(','))
+    lon2, lat2 = map(float, destination.split(','))
+    return tuple(round(v / grid) for v in (lon1, lat1, lon2, lat2))
+
+
+# --- [카카오 모빌리티 길찾기 클라이언트] ---
+# 커넥션 풀을 공유하는 비동기 클라이언트입니다.
+# 같은 격자 키로 동시에 들어온 요청은 업스트림 호출 하나로 합쳐지고,
+# 성공한 결과는 TTL 동안 캐시에서 바로 응답합니다.
+class DirectionsClient:
+    def __init__(
+        self,
+        api_key: str,
+        url: str = KAKAO_DIRECTIONS_URL,
+        timeout: float = KAKAO_TIMEOUT,
+        pool_size: int = KAKAO_POOL_SIZE,
+        cache_ttl: float = KAKAO_CACHE_TTL,
+        cache_size: int = KAKAO_CACHE_SIZE,
+        grid: float = KAKAO_CACHE_GRID,
+    ):
+        self.url = url
+        self.grid = grid
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self._inflight = {}
+        # httpx는 API 키가 있어 클라이언트를 만들 때만 불러옵니다.
+        import httpx
+
+        self._http = httpx.AsyncClient(
+            headers={"Authorization": f"KakaoAK {api_key}"},
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+        )
+
+    async def get_route(self, origin: str, destination: str) -> Optional[Tuple[float, int]]:
+        """(거리 km, 소요 분)을 반환합니다. 경로가 없으면 None, 통신 오류는 예외로 올립니다."""
+        key = grid_key(origin, destination, self.grid)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, origin, destination))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # 한 요청이 취소되어도 같은 키를 기다리는 다른 요청에는 영향이 없도록 shield 합니다.
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key, origin: str, destination: str):
+        self.upstream_calls += 1
+        res = await self._http.get(
+            self.url,
+            params={"origin": origin, "destination": destination, "priority": "TIME"},
+        )
+        data = res.json()
+        if res.status_code != 200 or not data.get("routes"):
+            return None
+        route = data["routes"][0]
+        if "summary" not in route:
+            return None
+        s = route["summary"]
+        result = (round(s["distance"] / 1000, 1), math.ceil(s["duration"] / 60))
+        self.cache.set(key, result)
+        return result
+
+    def stats(self):
+        return {"upstream_calls": self.upstream_calls, "coalesced": self.coalesced, "cache": self.cache.stats()}
+
+    async def aclose(self):
+        await self._http.aclose()
+
+
+_client: Optional[DirectionsClient] = None
+
+
+def get_client() -> Optional[DirectionsClient]:
+    """API 키가 있으면 프로세스 공용 클라이언트를, 없으면 None을 반환합니다."""
+    global _client
+    if _client is None and KAKAO_REST_API_KEY:
+        _client = DirectionsClient(KAKAO_REST_API_KEY)
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,74 @@
+import os
+import time
+import base64
+import logging
+import threading
+from email.message import EmailMessage
+
+logger = logging.getLogger(__name__)
+
+# --- [메일 발송 (Gmail API)] ---
+# 인증번호는 응답이나 로그에 남기지 않고 메일로만 보냅니다.
+# GMAIL_CLIENT_ID/GMAIL_CLIENT_SECRET/GMAIL_REFRESH_TOKEN으로 액세스 토큰을 받아 보낸 사람 계정(me)으로 발송합니다.
+GMAIL_CLIENT_ID = os.getenv("GMAIL_CLIENT_ID")
+GMAIL_CLIENT_SECRET = os.getenv("GMAIL_CLIENT_SECRET")
+GMAIL_REFRESH_TOKEN = os.getenv("GMAIL_REFRESH_TOKEN")
+GMAIL_TOKEN_URL = os.getenv("GMAIL_TOKEN_URL", "https://oauth2.googleapis.com/token")
+GMAIL_SEND_URL = os.getenv("GMAIL_SEND_URL", "https://gmail.googleapis.com/gmail/v1/users/me/messages/send")
+MAIL_TIMEOUT = float(os.getenv("MAIL_TIMEOUT", "10"))
+
+
+class MailError(Exception):
+    pass
+
+
+def configured() -> bool:
+    return bool(GMAIL_CLIENT_ID and GMAIL_CLIENT_SECRET and GMAIL_REFRESH_TOKEN)
+
+
+_token = None
+_token_expires = 0.0
+_token_lock = threading.Lock()
+
+
+def _access_token(http) -> str:
+    global _token, _token_expires
+    with _token_lock:
+        if _token is None or time.monotonic() >= _token_expires:
+            res = http.post(GMAIL_TOKEN_URL, data={
+                "client_id": GMAIL_CLIENT_ID,
+                "client_secret": GMAIL_CLIENT_SECRET,
+                "refresh_token": GMAIL_REFRESH_TOKEN,
+                "grant_type": "refresh_token",
+            })
+            if res.status_code != 200:
+                raise MailError(f"토큰 발급 실패 ({res.status_code})")
+            body = res.json()
+            _token = body["access_token"]
+            # 만료 1분 전에 미리 새로 받습니다.
+            _token_expires = time.monotonic() + max(0, int(body.get("expires_in", 3600)) - 60)
+        return _token
+
+
+def send(to: str, subject: str, text: str):
+    """메일 한 통을 보냅니다. 설정이 없거나 실패하면 MailError."""
+    if not configured():
+        raise MailError("메일 발송이 설정되지 않았습니다.")
+    import httpx
+
+    message = EmailMessage()
+    message["To"] = to
+    message["Subject"] = subject
+    message.set_content(text)
+    raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
+    try:
+        with httpx.Client(timeout=MAIL_TIMEOUT) as http:
+            res = http.post(GMAIL_SEND_URL, json={"raw": raw}, headers={"Authorization": f"Bearer {_access_token(http)}"})
+    except httpx.HTTPError as e:
+        raise MailError(str(e)) from e
+    if res.status_code != 200:
+        raise MailError(f"메일 발송 실패 ({res.status_code})")
+
+
+def send_code(to: str, code: str, valid_minutes: int):
+    send(to, "[DCU 셔틀] 인증번호 안내", f"인증번호는 {code} 입니다.\n{valid_minutes}분 안에 입력해주세요.")
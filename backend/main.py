@@ -1,22 +1,40 @@
 import os
-import random
+import hmac
+import time
 import datetime
 import logging
-import base64
-import math
-import requests
-from typing import List, Optional, Dict
-from email.mime.text import MIMEText
+import json
+import asyncio
+from typing import List, Optional
 
-from fastapi import FastAPI, Depends, HTTPException, status, Body, Query
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, Header
+from fastapi.responses import StreamingResponse, Response, JSONResponse, PlainTextResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-import uvicorn
 
 # 프로젝트 내부 모듈
 import models
-from database import engine, get_db
+import kakao
+import tracking
+import pubsub
+import catalogue
+import timetable
+import booking
+import admission
+import snapshots
+import migrations
+import inbox
+import codes
+import mailer
+import metrics
+import points
+import occupancy
+import passes
+import schemas
+from geo import get_haversine_distance, haversine_matrix
+from database import engine, get_db, SessionLocal, dialect_insert, async_engine, DB_ASYNC
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,13 +43,55 @@ logger = logging.getLogger(__name__)
 class DeleteAccountRequest(BaseModel):
     user_id: int
 
-app = FastAPI()
+class EtaBatchRequest(BaseModel):
+    origins: List[str]
+    destinations: List[str]
+    routed: bool = False
+
+class MarkReadRequest(BaseModel):
+    user_id: int
+    message_ids: Optional[List[int]] = None
+
+class BroadcastRequest(BaseModel):
+    title: str
+    content: str
+    route_id: Optional[int] = None
+    audience: str = "all"
+    user_ids: Optional[List[int]] = None
+
+class PassPurchaseRequest(BaseModel):
+    user_id: int
+    pass_type: str = "SEMESTER"
+
+class BusPositionUpdate(BaseModel):
+    route_id: int
+    lat: float
+    lng: float
+    is_running: int = 1
+    recorded_at: Optional[datetime.datetime] = None
+
+# orjson이 설치되어 있으면 기본 응답을 orjson으로 직렬화합니다. (없으면 표준 json)
+try:
+    import orjson  # noqa: F401
+    DefaultResponse = ORJSONResponse
+except ImportError:
+    DefaultResponse = JSONResponse
+
+app = FastAPI(default_response_class=DefaultResponse)
 
 # --- [환경 변수] ---
-GMAIL_CLIENT_ID = os.getenv("GMAIL_CLIENT_ID")
-GMAIL_CLIENT_SECRET = os.getenv("GMAIL_CLIENT_SECRET")
-GMAIL_REFRESH_TOKEN = os.getenv("GMAIL_REFRESH_TOKEN")
-KAKAO_REST_API_KEY = os.getenv("KAKAO_REST_API_KEY")
+# 메일 발송 설정(GMAIL_*)은 mailer.py에서 읽습니다.
+ETA_BATCH_MAX_CELLS = int(os.getenv("ETA_BATCH_MAX_CELLS", "10000"))
+ETA_BATCH_MAX_ROUTED = int(os.getenv("ETA_BATCH_MAX_ROUTED", "100"))
+# 0이면 시작할 때 마이그레이션을 돌리지 않습니다. (서버리스처럼 인스턴스가 자주 새로 뜨는 환경에서는
+# 배포 단계에서 python migrations.py를 한 번 실행하고 0으로 둡니다.)
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "1") == "1"
+# 응답 압축: gzip(기본), br(brotli-asgi 패키지 필요, br을 못 받는 클라이언트에는 gzip), off
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "gzip")
+# 이보다 작은 응답(바이트)은 압축하지 않습니다.
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1000"))
+# 관리자 API(공지 발송 등)를 부를 때 X-Admin-Key 헤더로 보내야 하는 값. 없으면 관리자 API는 모두 막힙니다.
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY")
 
 # --- [Middleware] ---
 app.add_middleware(
@@ -40,24 +100,56 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "Server-Timing"],
 )
+# 노선 목록, 쪽지 목록처럼 큰 응답만 압축합니다. (SSE 스트림은 GZipMiddleware가 알아서 건너뜁니다.)
+if RESPONSE_COMPRESSION == "br":
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_SIZE, gzip_fallback=True)
+elif RESPONSE_COMPRESSION == "gzip":
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+# 경로별 지연 시간/쿼리 수 집계는 가장 바깥에 둡니다.
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# 같은 경로는 먼저 등록된 라우트가 처리하므로 비동기 버전을 동기 라우트보다 앞에 둡니다.
+if DB_ASYNC:
+    import async_routes
+    app.include_router(async_routes.router)
 
 @app.on_event("startup")
 def startup():
-    models.Base.metadata.create_all(bind=engine)
+    if AUTO_MIGRATE:
+        migrations.migrate(engine)
+        migrations.check(engine)
 
-# --- [유틸리티] ---
-def get_haversine_distance(origin_str: str, dest_str: str):
-    try:
-        lon1, lat1 = map(float, origin_str.split(','))
-        lon2, lat2 = map(float, dest_str.split(','))
-        R = 6371
-        d_lat, d_lon = math.radians(lat2 - lat1), math.radians(lon2 - lon1)
-        a = math.sin(d_lat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(d_lon/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        dist = R * c
-        return round(dist, 1), math.ceil((dist/35)*60)+2
-    except: return 0.0, 0
+# 위치가 바뀐 노선만 구독자에게 전달합니다.
+tracking.store.listeners.append(lambda route_id, pos: pubsub.broker.publish(route_id, pos.to_dict(route_id)))
+
+@app.on_event("startup")
+async def start_background_tasks():
+    def load_positions():
+        db = SessionLocal()
+        try:
+            catalogue.routes.refresh(db)
+            return tracking.store.load(db)
+        finally:
+            db.close()
+    await asyncio.to_thread(load_positions)
+    tracking.start_flusher()
+    if admission.ADMISSION_WORKER:
+        admission.queue.start()
+    if passes.PASS_WORKER:
+        passes.start_worker()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await admission.queue.stop()
+    await passes.stop_worker()
+    await tracking.stop_flusher()
+    await kakao.close_client()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 # --- [API 엔드포인트] ---
 
@@ -66,26 +158,16 @@ def root():
     return {"status": "running", "message": "DCU Shuttle API Server"}
 
 # ✅ 로그인
-@app.post("/api/auth/login")
+@app.post("/api/auth/login", response_model=schemas.UserStatus)
 def login(
     email: str = Query(...), 
     password: str = Query(...), 
     db: Session = Depends(get_db)
 ):
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if not user or user.hashed_password != password:
+    user = snapshots.authenticate(db, email, password)
+    if not user:
         raise HTTPException(status_code=401, detail="이메일 또는 비밀번호가 잘못되었습니다.")
-    
-    favs = [f.route_id for f in db.query(models.Favorite).filter(models.Favorite.user_id == user.id).all()]
-    return {
-        "user_id": user.id,
-        "name": user.name,
-        "email": user.email,
-        "points": user.points,
-        "phone": getattr(user, 'phone', "연락처 미등록"),
-        "favorites": favs,
-        "status": "success"
-    }
+    return {**user, "status": "success"}
 
 # ✅ 비밀번호 변경을 위한 인증번호 발송
 @app.post("/api/auth/send-code")
@@ -100,33 +182,43 @@ def send_verification_code(
     if not user:
         raise HTTPException(status_code=404, detail="USER_NOT_FOUND_IN_DB")
     
-    # 6자리 랜덤 인증번호 생성
-    code = str(random.randint(100000, 999999))
-    logger.info(f"Verification code for {email}: {code}")
-    
+    # 6자리 인증번호를 만들어 메일로만 보냅니다. (응답과 로그에는 남기지 않습니다.)
+    _send_code(email)
     return {
         "status": "success",
         "message": "인증 번호가 발송되었습니다.",
-        "verification_code": code
     }
 
+def _send_code(email: str):
+    try:
+        sent = codes.issue_and_send(email)
+    except mailer.MailError as e:
+        logger.warning(f"인증번호 메일 발송 실패: {e}")
+        raise HTTPException(status_code=503, detail="인증번호 메일을 보낼 수 없습니다. 잠시 후 다시 시도해주세요.")
+    if not sent:
+        raise HTTPException(status_code=429, detail="인증번호 요청이 너무 많습니다. 잠시 후 다시 시도해주세요.")
+
+# ✅ 비밀번호 재설정 (메일로 받은 인증번호 확인, 틀리면 CODE_MAX_ATTEMPTS번까지만 시도 가능)
+@app.post("/api/auth/reset-password")
+def reset_password(email: str, code: str, new_password: str, db: Session = Depends(get_db)):
+    if not new_password:
+        raise HTTPException(status_code=400, detail="새 비밀번호를 입력해주세요.")
+    if not codes.store.consume(email, code):
+        raise HTTPException(status_code=400, detail="인증번호가 일치하지 않거나 만료되었습니다.")
+    user = db.query(models.User).filter(models.User.email == email).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+    user.hashed_password = new_password
+    db.commit()
+    return {"status": "success", "message": "비밀번호가 성공적으로 변경되었습니다."}
+
 # ✅ 유저 상태 조회
-@app.get("/api/user/status")
+@app.get("/api/user/status", response_model=schemas.UserStatus)
 def get_status(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = snapshots.get(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    favs = [f.route_id for f in db.query(models.Favorite).filter(models.Favorite.user_id == user.id).all()]
-    return {
-        "user_id": user.id, 
-        "name": user.name, 
-        "email": user.email,
-        "points": user.points, 
-        "phone": getattr(user, 'phone', "연락처 미등록"),
-        "favorites": favs, 
-        "status": "success"
-    }
+    return {**user, "status": "success"}
 
 # ✅ 회원 탈퇴 기능
 @app.post("/api/auth/delete-account")
@@ -139,101 +231,469 @@ def delete_account(
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
     
     db.query(models.Favorite).filter(models.Favorite.user_id == req.user_id).delete()
+    # 좌석이 예약을 참조하고 있으므로 예약을 지우기 전에 좌석부터 비웁니다.
+    user_bookings = db.query(models.Booking.id).filter(models.Booking.user_id == req.user_id)
+    db.query(models.Seat).filter(models.Seat.booking_id.in_(user_bookings.scalar_subquery())).update(
+        {models.Seat.booking_id: None}, synchronize_session=False)
+    occupancy.remove_bookings(db, models.Booking.user_id == req.user_id)
     db.query(models.Booking).filter(models.Booking.user_id == req.user_id).delete()
     db.query(models.Message).filter((models.Message.sender_id == req.user_id) | (models.Message.receiver_id == req.user_id)).delete()
     
     db.delete(user)
     db.commit()
+    snapshots.invalidate(req.user_id)
     return {"status": "success", "message": "계정이 삭제되었습니다."}
 
 # ✅ 포인트 충전 기능
-@app.post("/api/user/charge")
+@app.post("/api/user/charge", response_model=schemas.ChargeResult)
 def charge_points(
     user_id: int = Query(...), 
     amount: int = Query(...), 
     db: Session = Depends(get_db)
 ):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not user:
+    if amount <= 0:
+        raise HTTPException(status_code=400, detail="충전 금액이 올바르지 않습니다.")
+    balance = points.apply_delta(db, user_id, amount, "charge")
+    if balance is None:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
-    
-    user.points += amount
     db.commit()
-    return {"status": "success", "new_balance": user.points}
-
-# ✅ 쪽지 목록 조회
-@app.get("/api/messages")
-def get_messages(user_id: int, db: Session = Depends(get_db)):
-    msgs = db.query(models.Message).filter(models.Message.receiver_id == user_id).all()
-    return [{
-        "id": m.id,
-        "title": m.title,
-        "content": m.content,
-        "sender_id": m.sender_id,
-        "created_at": m.created_at
-    } for m in msgs]
+    snapshots.invalidate(user_id)
+    return {"status": "success", "new_balance": balance}
+
+# ✅ 포인트 사용 내역 (최근 순)
+@app.get("/api/user/points/history", response_model=List[schemas.PointsEntry])
+def points_history(
+    user_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    return points.history(db, user_id, limit)
+
+# ✅ 쪽지 목록 조회 (본문 대신 미리보기, 다음 페이지 커서는 X-Next-Cursor 헤더로 전달)
+@app.get("/api/messages", response_model=List[schemas.MessagePreview])
+def get_messages(
+    response: Response,
+    user_id: int,
+    cursor: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=inbox.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    items, next_cursor = inbox.list_page(db, user_id, cursor, limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return items
+
+# ✅ 안 읽은 쪽지 수
+@app.get("/api/messages/unread-count", response_model=schemas.UnreadCount)
+def get_unread_count(user_id: int, db: Session = Depends(get_db)):
+    return {"status": "success", "unread": inbox.unread_count(db, user_id)}
+
+# ✅ 쪽지 읽음 처리 (message_ids가 없으면 전체)
+@app.post("/api/messages/read")
+def mark_messages_read(req: MarkReadRequest, db: Session = Depends(get_db)):
+    updated = inbox.mark_read(db, req.user_id, req.message_ids)
+    db.commit()
+    return {"status": "success", "updated": updated}
+
+# ✅ 관리자 확인 (서버에 설정한 ADMIN_API_KEY와 X-Admin-Key 헤더 비교)
+def require_admin(x_admin_key: Optional[str] = Header(None)):
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=403, detail="관리자 API가 설정되지 않았습니다.")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, ADMIN_API_KEY):
+        raise HTTPException(status_code=401, detail="관리자 인증이 필요합니다.")
+
+# ✅ 노선 변경 공지 일괄 발송 (관리자 전용, 보낸 사람은 시스템(sender_id 없음)으로 기록)
+@app.post("/api/messages/broadcast", dependencies=[Depends(require_admin)])
+def broadcast_notice(req: BroadcastRequest, db: Session = Depends(get_db)):
+    start = time.perf_counter()
+    if req.user_ids is not None:
+        sent = inbox.send_bulk(db, req.user_ids, req.title, req.content)
+    else:
+        if req.audience not in inbox.AUDIENCES:
+            raise HTTPException(status_code=400, detail=f"audience는 {', '.join(inbox.AUDIENCES)} 중 하나여야 합니다.")
+        if req.route_id is None and req.audience != "everyone":
+            raise HTTPException(status_code=400, detail="route_id가 필요합니다.")
+        sent = inbox.broadcast(db, req.title, req.content, req.route_id, req.audience)
+    db.commit()
+    elapsed = time.perf_counter() - start
+    return {
+        "status": "success",
+        "sent": sent,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "rows_per_sec": round(sent / elapsed) if elapsed else sent,
+    }
+
+# ✅ 쪽지 상세 조회
+@app.get("/api/messages/{message_id}", response_model=schemas.MessageDetail)
+def get_message_detail(message_id: int, user_id: int, db: Session = Depends(get_db)):
+    message = inbox.get_detail(db, message_id, user_id)
+    if not message:
+        raise HTTPException(status_code=404, detail="쪽지를 찾을 수 없습니다.")
+    return message
+
+# ✅ Prometheus 수집용 지표
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+# ✅ 캐시 적중률 확인용
+@app.get("/api/stats/cache")
+def get_cache_stats():
+    return {
+        "user_snapshot": snapshots.stats(),
+        "kakao": kakao.get_client().stats() if kakao.get_client() else None,
+        "route_catalogue_version": catalogue.routes.version,
+    }
 
 # ✅ 실시간 도착 정보
 @app.get("/api/shuttle/precise-eta")
 async def get_precise_eta(origin: str, destination: str):
-    if not KAKAO_REST_API_KEY:
+    client = kakao.get_client()
+    if client is None:
         d, t = get_haversine_distance(origin, destination)
         return {"status": "fallback", "duration_min": t, "distance_km": d}
     
-    url = "https://apis-navi.kakaomobility.com/v1/directions"
-    headers = {"Authorization": f"KakaoAK {KAKAO_REST_API_KEY}"}
     try:
-        res = requests.get(url, headers=headers, params={"origin":origin, "destination":destination, "priority":"TIME"}, timeout=5)
-        data = res.json()
-        if res.status_code != 200 or "routes" not in data or not data['routes']:
+        result = await client.get_route(origin, destination)
+        if result is None:
             d, t = get_haversine_distance(origin, destination)
             return {"status": "fallback", "duration_min": t, "distance_km": d}
-        s = data['routes'][0]['summary']
-        return {"status": "success", "duration_min": math.ceil(s['duration']/60), "distance_km": round(s['distance']/1000, 1)}
-    except:
+        d, t = result
+        return {"status": "success", "duration_min": t, "distance_km": d}
+    except Exception:
         d, t = get_haversine_distance(origin, destination)
         return {"status": "error", "duration_min": t, "distance_km": d}
 
-# ✅ 노선 조회 API들
-@app.get("/api/routes")
-def get_routes(db: Session = Depends(get_db)):
-    return db.query(models.BusRoute).all()
+# ✅ 여러 정류장/버스의 도착 정보를 한 번에 계산
+@app.post("/api/shuttle/eta/batch")
+async def get_eta_batch(req: EtaBatchRequest):
+    cells = len(req.origins) * len(req.destinations)
+    if cells > ETA_BATCH_MAX_CELLS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {ETA_BATCH_MAX_CELLS}개 조합까지 계산할 수 있습니다.")
 
-@app.get("/api/routes/{route_id}")
-def get_route_detail(route_id: int, db: Session = Depends(get_db)):
-    route = db.query(models.BusRoute).filter(models.BusRoute.id == route_id).first()
-    if not route: raise HTTPException(status_code=404, detail="Route not found")
-    return route
+    dist, dur = haversine_matrix(req.origins, req.destinations)
+    source = [["fallback"] * len(req.destinations) for _ in req.origins]
+
+    client = kakao.get_client()
+    if req.routed and client is not None:
+        if cells > ETA_BATCH_MAX_ROUTED:
+            raise HTTPException(status_code=400, detail=f"실제 경로 계산은 최대 {ETA_BATCH_MAX_ROUTED}개 조합까지 가능합니다.")
+        pairs = [(i, j) for i in range(len(req.origins)) for j in range(len(req.destinations))]
+        results = await asyncio.gather(
+            *(client.get_route(req.origins[i], req.destinations[j]) for i, j in pairs),
+            return_exceptions=True,
+        )
+        # 실패한 칸은 직선거리 추정값을 그대로 둡니다.
+        for (i, j), result in zip(pairs, results):
+            if isinstance(result, tuple):
+                dist[i, j], dur[i, j] = result
+                source[i][j] = "success"
+
+    return {
+        "status": "success",
+        "distance_km": dist.tolist(),
+        "duration_min": dur.tolist(),
+        "source": source,
+    }
+
+# ✅ 정류장별 다음 출발편
+@app.get("/api/shuttle/next-departures")
+def get_next_departures(stop: str, after: Optional[str] = None, limit: int = 5, db: Session = Depends(get_db)):
+    if after is None:
+        minutes = timetable.now_minutes()
+    else:
+        minutes = timetable.to_minutes(after)
+        if minutes is None:
+            raise HTTPException(status_code=400, detail="after는 HH:MM 형식이어야 합니다.")
+    timetable.index.refresh(db)
+    return {
+        "stop": stop,
+        "after": f"{minutes // 60:02d}:{minutes % 60:02d}",
+        "departures": timetable.index.next_departures(stop, minutes, limit),
+    }
+
+# 위치 수신은 노선 id를 카탈로그로 확인하므로, 카탈로그가 오래됐을 때만 스레드에서 DB 버전을 다시 확인합니다.
+async def _refresh_catalogue():
+    if not catalogue.routes.stale():
+        return
+    def refresh():
+        db = SessionLocal()
+        try:
+            catalogue.routes.refresh(db)
+        finally:
+            db.close()
+    await asyncio.to_thread(refresh)
+
+# ✅ 버스 GPS 위치 수신 (단말 → 서버)
+@app.post("/api/shuttle/location")
+async def post_bus_location(pos: BusPositionUpdate):
+    await _refresh_catalogue()
+    if not catalogue.routes.has(pos.route_id):
+        raise HTTPException(status_code=404, detail="Route not found")
+    accepted = tracking.store.update(pos.route_id, pos.lat, pos.lng, pos.recorded_at, pos.is_running)
+    return {"status": "success", "accepted": int(accepted)}
+
+# ✅ 여러 위치를 한 번에 수신 (NDJSON: 한 줄에 위치 하나)
+@app.post("/api/shuttle/location/batch")
+async def post_bus_locations(request: Request):
+    accepted, rejected = 0, 0
+    await _refresh_catalogue()
+    body = await request.body()
+    for line in body.splitlines():
+        if not line.strip():
+            continue
+        try:
+            pos = BusPositionUpdate.model_validate_json(line)
+        except ValueError:
+            rejected += 1
+            continue
+        if tracking.store.update(pos.route_id, pos.lat, pos.lng, pos.recorded_at, pos.is_running):
+            accepted += 1
+        else:
+            rejected += 1
+    return {"status": "success", "accepted": accepted, "rejected": rejected}
+
+# ✅ 버스 현재 위치 조회 (메모리에서 바로 응답)
+@app.get("/api/shuttle/location/{route_id}")
+async def get_bus_location(route_id: int):
+    pos = tracking.store.get(route_id)
+    if pos is None:
+        raise HTTPException(status_code=404, detail="운행 정보가 없습니다.")
+    return {"status": "success", **pos.to_dict(route_id)}
+
+# --- [실시간 위치 push (WebSocket / SSE)] ---
+# destination("lon,lat")을 주면 위치가 바뀔 때마다 ETA도 함께 계산해서 보냅니다.
+def _location_event(message, destination: Optional[str]):
+    payload, encoded = message
+    if not destination:
+        return encoded
+    d, t = get_haversine_distance(f"{payload['lng']},{payload['lat']}", destination)
+    return json.dumps({**payload, "duration_min": t, "distance_km": d}, ensure_ascii=False)
+
+def _current_location(route_id: int):
+    pos = tracking.store.get(route_id)
+    if pos is None:
+        return None
+    payload = pos.to_dict(route_id)
+    return payload, json.dumps(payload, ensure_ascii=False)
+
+@app.websocket("/ws/shuttle/{route_id}")
+async def bus_location_ws(websocket: WebSocket, route_id: int, destination: Optional[str] = None):
+    await websocket.accept()
+    sub = pubsub.broker.subscribe(route_id)
+    # 위치 변경이 없는 노선에서도 연결 종료를 바로 알 수 있도록 수신 대기와 구독 대기를 같이 기다립니다.
+    receiver = asyncio.ensure_future(websocket.receive())
+    getter = asyncio.ensure_future(sub.get())
+    try:
+        current = _current_location(route_id)
+        if current is not None:
+            await websocket.send_text(_location_event(current, destination))
+        while True:
+            done, _ = await asyncio.wait({receiver, getter}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                if receiver.result()["type"] == "websocket.disconnect":
+                    break
+                # 단말이 보내는 메시지는 쓰지 않습니다.
+                receiver = asyncio.ensure_future(websocket.receive())
+            if getter in done:
+                await websocket.send_text(_location_event(getter.result(), destination))
+                getter = asyncio.ensure_future(sub.get())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        getter.cancel()
+        pubsub.broker.unsubscribe(sub)
+
+@app.get("/api/shuttle/location/{route_id}/stream")
+async def bus_location_sse(route_id: int, request: Request, destination: Optional[str] = None):
+    async def events():
+        sub = pubsub.broker.subscribe(route_id)
+        try:
+            current = _current_location(route_id)
+            if current is not None:
+                yield f"data: {_location_event(current, destination)}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(sub.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # 프록시가 연결을 끊지 않도록 주기적으로 주석 줄을 보냅니다.
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {_location_event(message, destination)}\n\n"
+        finally:
+            pubsub.broker.unsubscribe(sub)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+# ✅ 노선 조회 API들 (미리 직렬화한 카탈로그에서 응답, If-None-Match가 맞으면 304)
+def _catalogue_response(entry: "catalogue.Entry", if_none_match: Optional[str]):
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if catalogue.etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+@app.get("/api/routes", response_model=List[schemas.Route])
+def get_routes(
+    location: Optional[str] = None,
+    time: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    entry = catalogue.routes.list(db, location=location, time_=time)
+    return _catalogue_response(entry, if_none_match)
+
+@app.get("/api/routes/{route_id}", response_model=schemas.Route)
+def get_route_detail(route_id: int, if_none_match: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    entry = catalogue.routes.get(db, route_id)
+    if not entry: raise HTTPException(status_code=404, detail="Route not found")
+    return _catalogue_response(entry, if_none_match)
 
 # ✅ 예약 및 즐겨찾기 토글
-@app.post("/api/bookings/reserve")
-def reserve(user_id: int = Query(...), route_id: int = Query(...), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    route = db.query(models.BusRoute).filter(models.BusRoute.id == route_id).first()
-    
-    if not user or not route:
-        raise HTTPException(status_code=404, detail="정보 없음")
-    
-    cost = 3000 if any(k in route.route_name for k in ["경주", "울산", "포항"]) else 0
-    if user.points < cost:
-        raise HTTPException(status_code=400, detail="포인트 부족")
-    
-    user.points -= cost
-    db.add(models.Booking(user_id=user_id, route_id=route_id, status="reserved"))
+@app.post(
+    "/api/bookings/reserve",
+    response_model=schemas.ReserveResult,
+    responses={202: {"model": schemas.AdmissionTicket, "description": "신청 폭주 노선: 대기열 접수"}},
+)
+def reserve(
+    user_id: int = Query(...),
+    route_id: int = Query(...),
+    seat_number: Optional[int] = Query(None),
+    service_date: Optional[datetime.date] = Query(None),
+    db: Session = Depends(get_db),
+):
+    day = booking.service_date(service_date)
+    # 신청 폭주 노선은 대기열에 접수만 하고 ticket을 바로 돌려줍니다. (결과는 ticket 조회로 확인)
+    route = catalogue.routes.row(db, route_id)
+    if route and admission.queue.is_rush_route(route):
+        ticket = admission.queue.submit(db, user_id, route_id, seat_number, day)
+        db.commit()
+        admission.queue.notify()
+        # response_model은 200 응답에만 적용되므로 202 ticket은 스키마를 직접 거쳐 내보냅니다.
+        return DefaultResponse(
+            status_code=202,
+            content=schemas.AdmissionTicket(**ticket).model_dump(mode="json", exclude_none=True),
+        )
+
+    result = booking.reserve(db, user_id, route_id, seat_number, day)
+    db.commit()
+    snapshots.invalidate(user_id)
+    return result
+
+@app.get(
+    "/api/bookings/tickets/{ticket_id}",
+    response_model=schemas.AdmissionTicket,
+    response_model_exclude_none=True,
+)
+def get_booking_ticket(ticket_id: str, db: Session = Depends(get_db)):
+    result = admission.queue.status(db, ticket_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="접수 내역이 없습니다.")
+    return result
+
+@app.post("/api/bookings/cancel", response_model=schemas.CancelResult)
+def cancel_booking(user_id: int = Query(...), booking_id: int = Query(...), db: Session = Depends(get_db)):
+    result = booking.cancel(db, user_id, booking_id)
+    db.commit()
+    snapshots.invalidate(user_id)
+    return result
+
+@app.get("/api/routes/{route_id}/seats", response_model=schemas.SeatCounts)
+def get_route_seats(route_id: int, service_date: Optional[datetime.date] = None, db: Session = Depends(get_db)):
+    day = booking.service_date(service_date)
+    route = catalogue.routes.row(db, route_id)
+    if not route: raise HTTPException(status_code=404, detail="Route not found")
+    booking.ensure_seats(db, route_id, day, route["total_seats"])
+    counts = booking.seat_counts(db, route_id, day)
     db.commit()
-    return {"status": "success", "remaining_points": user.points}
+    return counts
+
+# ✅ 정기권 신청 (대기열에 접수만 하고, 정원 확인과 포인트 차감은 작업자가 배치로 처리)
+@app.post("/api/pass/purchase", status_code=202, response_model=schemas.PassPurchaseResult)
+def purchase_pass(req: PassPurchaseRequest, db: Session = Depends(get_db)):
+    result = passes.apply(db, req.user_id, req.pass_type)
+    db.commit()
+    passes.notify()
+    return result
+
+# ✅ 정기권 신청/사용 현황
+@app.get("/api/pass/status", response_model=schemas.PassStatus)
+def get_pass_status(user_id: int, db: Session = Depends(get_db)):
+    return passes.status(db, user_id)
+
+# ✅ 예약 내역 (최신순, 다음 페이지 커서는 X-Next-Cursor 헤더로 전달)
+@app.get("/api/user/bookings", response_model=List[schemas.BookingHistoryItem])
+def get_booking_history(
+    response: Response,
+    user_id: int,
+    cursor: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=booking.MAX_HISTORY_PAGE),
+    db: Session = Depends(get_db),
+):
+    items, next_cursor = booking.history(db, user_id, cursor, limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return items
+
+# ✅ 노선 날짜별 점유율 (기본: 이번 달, 집계 테이블에서 조회)
+def _report_range(start: Optional[datetime.date], end: Optional[datetime.date]):
+    default_start, default_end = occupancy.month_range()
+    start, end = start or default_start, end or default_end
+    try:
+        occupancy.check_range(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return start, end
+
+@app.get("/api/routes/{route_id}/occupancy", response_model=List[schemas.OccupancyDay])
+def get_route_occupancy(
+    response: Response,
+    route_id: int,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    cursor: Optional[datetime.date] = None,
+    limit: int = Query(31, ge=1, le=occupancy.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    route = catalogue.routes.row(db, route_id)
+    if not route: raise HTTPException(status_code=404, detail="Route not found")
+    start, end = _report_range(start, end)
+    items, next_cursor = occupancy.route_days(db, route, start, end, cursor, limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor.isoformat()
+    return items
+
+# ✅ 기간별 노선 점유율 보고서 (노선 id순, 다음 페이지 커서는 X-Next-Cursor 헤더로 전달)
+@app.get("/api/reports/occupancy", response_model=List[schemas.RouteOccupancy])
+def get_occupancy_report(
+    response: Response,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=occupancy.MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    start, end = _report_range(start, end)
+    catalogue.routes.refresh(db)
+    items, next_cursor = occupancy.summary(db, catalogue.routes.row_by_id, start, end, cursor, limit)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return items
 
 @app.post("/api/user/favorite-toggle")
 def toggle_favorite(user_id: int = Query(...), route_id: int = Query(...), db: Session = Depends(get_db)):
-    fav = db.query(models.Favorite).filter(models.Favorite.user_id == user_id, models.Favorite.route_id == route_id).first()
-    if fav:
-        db.delete(fav)
+    # (user_id, route_id) 유니크 인덱스 덕분에 삭제를 먼저 시도하고, 없으면 충돌 무시 INSERT로 추가합니다.
+    deleted = db.query(models.Favorite).filter(models.Favorite.user_id == user_id, models.Favorite.route_id == route_id).delete()
+    if deleted:
         action = "removed"
     else:
-        db.add(models.Favorite(user_id=user_id, route_id=route_id))
+        insert = dialect_insert(db.get_bind())
+        db.execute(insert(models.Favorite).values(user_id=user_id, route_id=route_id).on_conflict_do_nothing())
         action = "added"
     db.commit()
+    snapshots.invalidate(user_id)
     return {"status": "success", "action": action}
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
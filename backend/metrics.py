@@ -0,0 +1,184 @@
+import os
+import time
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# --- [요청/쿼리 계측] ---
+# METRICS_ENABLED=0이면 미들웨어와 SQL 이벤트를 걸지 않습니다.
+# METRICS_SERVER_TIMING=1이면 응답에 Server-Timing 헤더(app, db 시간과 쿼리 수)를 붙입니다.
+# 한 요청 안에서 같은 SQL 문장이 METRICS_N_PLUS_ONE번 이상 실행되면 N+1 패턴으로 봅니다.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "0") == "1"
+METRICS_N_PLUS_ONE = int(os.getenv("METRICS_N_PLUS_ONE", "5"))
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = {}
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        i = 0
+        while i < len(BUCKETS) and value > BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.total += value
+        self.count += 1
+
+
+class Registry:
+    def __init__(self):
+        self.latency = {}
+        self.requests = {}
+        self.db_queries = {}
+        self.db_time = {}
+        self.n_plus_one = {}
+        self.background_queries = 0
+        self._warned = set()
+        self._lock = threading.Lock()
+
+    def record(self, method: str, route: str, status: int, elapsed: float, stats: RequestStats):
+        key = (method, route)
+        repeated = [sql for sql, n in stats.statements.items() if n >= METRICS_N_PLUS_ONE]
+        with self._lock:
+            hist = self.latency.get(key)
+            if hist is None:
+                hist = self.latency[key] = Histogram()
+            hist.observe(elapsed)
+            self.requests[(method, route, status)] = self.requests.get((method, route, status), 0) + 1
+            self.db_queries[key] = self.db_queries.get(key, 0) + stats.queries
+            self.db_time[key] = self.db_time.get(key, 0.0) + stats.db_time
+            if repeated:
+                self.n_plus_one[key] = self.n_plus_one.get(key, 0) + 1
+        for sql in repeated:
+            if (key, sql) not in self._warned:
+                self._warned.add((key, sql))
+                logger.warning(
+                    f"N+1 의심: {method} {route} 요청에서 같은 쿼리를 {stats.statements[sql]}번 실행했습니다: {sql[:200]}"
+                )
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식으로 내보냅니다."""
+        lines = [
+            "# HELP http_request_duration_seconds 경로별 요청 처리 시간",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            for (method, route), hist in sorted(self.latency.items()):
+                labels = f'method="{method}",route="{_escape(route)}"'
+                cumulative = 0
+                for le, n in zip(BUCKETS, hist.counts):
+                    cumulative += n
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {hist.count}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {hist.total:.6f}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {hist.count}")
+
+            lines += ["# HELP http_requests_total 경로/상태 코드별 요청 수", "# TYPE http_requests_total counter"]
+            for (method, route, status), n in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {n}')
+
+            lines += ["# HELP db_queries_total 경로별 SQL 실행 수", "# TYPE db_queries_total counter"]
+            for (method, route), n in sorted(self.db_queries.items()):
+                lines.append(f'db_queries_total{{method="{method}",route="{_escape(route)}"}} {n}')
+            lines.append(f'db_queries_total{{method="",route="background"}} {self.background_queries}')
+
+            lines += ["# HELP db_time_seconds_total 경로별 SQL 실행 시간 합계", "# TYPE db_time_seconds_total counter"]
+            for (method, route), t in sorted(self.db_time.items()):
+                lines.append(f'db_time_seconds_total{{method="{method}",route="{_escape(route)}"}} {t:.6f}')
+
+            lines += ["# HELP db_n_plus_one_total 같은 쿼리를 반복 실행한 요청 수", "# TYPE db_n_plus_one_total counter"]
+            for (method, route), n in sorted(self.n_plus_one.items()):
+                lines.append(f'db_n_plus_one_total{{method="{method}",route="{_escape(route)}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+registry = Registry()
+
+
+# --- [SQLAlchemy 이벤트] ---
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is None:
+        # 요청 밖(위치 flush, 예약 대기열 등)에서 실행된 쿼리
+        registry.background_queries += 1
+        return
+    stats.queries += 1
+    stats.db_time += elapsed
+    stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+
+def instrument_engine(engine):
+    if not METRICS_ENABLED:
+        return
+    from sqlalchemy import event
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# --- [ASGI 미들웨어] ---
+# 요청마다 RequestStats를 contextvar에 두고, 끝나면 경로 템플릿(/api/routes/{route_id}) 기준으로 기록합니다.
+# 동기 엔드포인트는 스레드풀에서 돌지만 contextvar가 복사되어 같은 RequestStats 객체를 봅니다.
+class MetricsMiddleware:
+    def __init__(self, app, server_timing: bool = METRICS_SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    app_ms = (time.perf_counter() - start) * 1000
+                    value = f'app;dur={app_ms:.1f}, db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries"'
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", value.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            registry.record(
+                scope["method"], route.path if route is not None else "unmatched",
+                status, time.perf_counter() - start, stats,
+            )
@@ -0,0 +1,328 @@
+import sys
+import logging
+from contextlib import contextmanager
+
+from sqlalchemy import inspect, text, Integer, String, Float, Date, DateTime, Text
+
+import models
+import occupancy
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+
+def _add_columns(conn, table_name, columns):
+    """{컬럼 이름: SQLAlchemy 타입} 중 테이블에 없는 것만 nullable로 추가하고, 추가한 컬럼 이름을 반환합니다.
+
+    나중에 models.py가 바뀌어도 결과가 같도록, models.py를 읽지 않고 마이그레이션을 만들 때의 정의를 그대로 적어서 넘깁니다.
+    """
+    existing = {c["name"] for c in inspect(conn).get_columns(table_name)}
+    added = []
+    for name, type_ in columns.items():
+        if name not in existing:
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {name} {type_.compile(dialect=conn.dialect)}"))
+            added.append(name)
+    return added
+
+
+def _create_indexes(conn, table, *names):
+    """models.py에 정의된 인덱스 중 이름이 주어진 것들을 (없을 때만) 만듭니다."""
+    indexes = {idx.name: idx for idx in table.indexes}
+    for name in names:
+        indexes[name].create(conn, checkfirst=True)
+
+
+# --- [마이그레이션 목록] ---
+# create_all은 이미 있는 테이블에 컬럼/인덱스/제약을 추가하지 않으므로, 기존 DB에 필요한 변경은 여기에 버전을 붙여 추가합니다.
+# 각 함수는 하나의 트랜잭션 안에서 실행되고, 적용된 버전은 schema_migrations 테이블에 기록됩니다.
+# 마이그레이션 1을 만들 때의 컬럼 목록입니다. 이후에 생긴 컬럼은 각 버전의 마이그레이션이 추가합니다.
+M001_COLUMNS = {
+    "users": {"email": String(), "hashed_password": String(), "name": String(), "phone": String(), "points": Integer()},
+    "bus_routes": {
+        "route_name": String(), "location": String(), "time": String(), "total_seats": Integer(),
+        "current_lat": Float(), "current_lng": Float(), "last_updated": DateTime(), "is_running": Integer(),
+    },
+    "favorites": {"user_id": Integer(), "route_id": Integer()},
+    "bookings": {
+        "user_id": Integer(), "route_id": Integer(), "status": String(), "seat_number": Integer(), "booked_at": DateTime(),
+    },
+    "semester_passes": {"user_id": Integer(), "route_type": String(), "status": String(), "applied_at": DateTime()},
+    "messages": {
+        "sender_id": Integer(), "receiver_id": Integer(), "title": String(), "content": Text(),
+        "is_read": Integer(), "created_at": DateTime(timezone=True),
+    },
+}
+
+
+def m001_add_missing_columns(conn):
+    for table_name, columns in M001_COLUMNS.items():
+        added = _add_columns(conn, table_name, columns)
+        if table_name == "bookings" and "status" in added:
+            conn.execute(text("UPDATE bookings SET status = 'reserved' WHERE status IS NULL"))
+        if table_name == "messages" and "receiver_id" in added:
+            # 예전 스키마는 받는 사람을 user_id 컬럼에 저장했습니다.
+            columns = {c["name"] for c in inspect(conn).get_columns("messages")}
+            if "user_id" in columns:
+                conn.execute(text("UPDATE messages SET receiver_id = user_id WHERE receiver_id IS NULL"))
+
+
+def m002_hot_lookup_indexes(conn):
+    # 유니크 인덱스를 만들기 전에 중복 즐겨찾기를 하나만 남기고 지웁니다.
+    conn.execute(text(
+        "DELETE FROM favorites WHERE id NOT IN ("
+        " SELECT MIN(id) FROM favorites GROUP BY user_id, route_id)"
+    ))
+    _create_indexes(conn, models.Favorite.__table__, "uq_favorites_user_route", "ix_favorites_route_id")
+    _create_indexes(conn, models.Booking.__table__, "ix_bookings_user_booked", "ix_bookings_route_status")
+    _create_indexes(
+        conn, models.Message.__table__,
+        "ix_messages_receiver_created", "ix_messages_receiver_unread", "ix_messages_sender_id",
+    )
+
+
+def _merge_route(conn, keep: int, dup: int):
+    """중복 노선 dup을 keep으로 합칩니다. 즐겨찾기/예약/좌석을 keep으로 옮긴 뒤 dup을 지웁니다."""
+    params = {"keep": keep, "dup": dup}
+    conn.execute(text(
+        "DELETE FROM favorites WHERE route_id = :dup"
+        " AND user_id IN (SELECT user_id FROM favorites WHERE route_id = :keep)"
+    ), params)
+    conn.execute(text("UPDATE favorites SET route_id = :keep WHERE route_id = :dup"), params)
+    conn.execute(text("UPDATE bookings SET route_id = :keep WHERE route_id = :dup"), params)
+    # 좌석: 빈 좌석은 버리고(ensure_seats가 다시 만듭니다), 예약된 좌석은 같은 번호의 빈 좌석 자리로 옮깁니다.
+    # 두 노선에서 같은 번호가 모두 예약되어 있으면 dup 쪽 좌석 행만 지웁니다. (예약 자체는 남습니다.)
+    conn.execute(text("DELETE FROM seats WHERE route_id = :dup AND booking_id IS NULL"), params)
+    conn.execute(text(
+        "DELETE FROM seats WHERE route_id = :keep AND booking_id IS NULL"
+        " AND seat_number IN (SELECT seat_number FROM seats WHERE route_id = :dup)"
+    ), params)
+    conn.execute(text(
+        "DELETE FROM seats WHERE route_id = :dup"
+        " AND seat_number IN (SELECT seat_number FROM seats WHERE route_id = :keep)"
+    ), params)
+    conn.execute(text("UPDATE seats SET route_id = :keep WHERE route_id = :dup"), params)
+    conn.execute(text("DELETE FROM bus_routes WHERE id = :dup"), params)
+
+
+def m003_unique_route_names(conn):
+    # seed.py가 route_name 기준으로 upsert하므로, 같은 이름으로 중복 생성된 노선을 가장 작은 id로 합친 뒤 유니크 인덱스를 만듭니다.
+    rows = conn.execute(text(
+        "SELECT route_name, id FROM bus_routes WHERE route_name IN ("
+        " SELECT route_name FROM bus_routes GROUP BY route_name HAVING COUNT(*) > 1)"
+        " ORDER BY route_name, id"
+    )).all()
+    keep = {}
+    for name, route_id in rows:
+        if name not in keep:
+            keep[name] = route_id
+        else:
+            _merge_route(conn, keep[name], route_id)
+    if rows:
+        conn.execute(text("UPDATE data_versions SET version = version + 1 WHERE name = 'routes'"))
+    _create_indexes(conn, models.BusRoute.__table__, "uq_bus_routes_route_name")
+
+
+def m004_points_opening_balances(conn):
+    # 원장이 생기기 전의 잔액을 "opening" 기록으로 한 번 넣어서 원장 합계와 users.points가 맞도록 합니다.
+    conn.execute(text(
+        "INSERT INTO points_ledger (user_id, delta, balance_after, reason, created_at)"
+        " SELECT id, COALESCE(points, 0), COALESCE(points, 0), 'opening', CURRENT_TIMESTAMP FROM users"
+        " WHERE COALESCE(points, 0) != 0"
+        " AND NOT EXISTS (SELECT 1 FROM points_ledger l WHERE l.user_id = users.id)"
+    ))
+
+
+def m005_booking_daily_rollup(conn):
+    # 주기 재계산 작업이 날짜 범위로 bookings를 읽으므로 booked_at 인덱스를 만듭니다.
+    # 집계는 운행일(service_date) 기준이라 그 컬럼이 생긴 뒤 마이그레이션 9에서 채웁니다.
+    _create_indexes(conn, models.Booking.__table__, "ix_bookings_booked_at")
+
+
+def m006_semester_pass_processing(conn):
+    # 정기권 작업자가 쓰는 컬럼/인덱스를 추가합니다. 같은 사용자의 같은 종류 신청이 여러 건 대기 중이면 가장 먼저 한 것만 남깁니다.
+    _add_columns(conn, "semester_passes", {"processed_at": DateTime(), "expires_at": DateTime(), "reason": String()})
+    conn.execute(text(
+        "UPDATE semester_passes SET status = 'rejected', reason = '중복 신청'"
+        " WHERE status IN ('pending', 'processing', 'approved') AND id NOT IN ("
+        " SELECT MIN(id) FROM semester_passes WHERE status IN ('pending', 'processing', 'approved')"
+        " GROUP BY user_id, route_type)"
+    ))
+    conn.execute(text("UPDATE semester_passes SET status = 'pending' WHERE status = 'processing'"))
+    _create_indexes(conn, models.SemesterPass.__table__, "ix_semester_passes_status", "uq_semester_passes_active")
+
+
+def m007_departure_seats(conn):
+    # 좌석을 노선마다 한 벌이 아니라 운행편(노선, 운행일)마다 한 벌씩 둡니다.
+    # 예전 예약은 예약한 날을 운행일로 보고, 예약 중인 것만 그 운행편의 좌석으로 다시 배정합니다.
+    # (빈 좌석은 booking.ensure_seats가 처음 예약할 때 만듭니다.)
+    _add_columns(conn, "bookings", {"service_date": Date()})
+    conn.execute(text("UPDATE bookings SET service_date = date(booked_at) WHERE service_date IS NULL AND booked_at IS NOT NULL"))
+    models.Seat.__table__.drop(conn, checkfirst=True)
+    models.Seat.__table__.create(conn)
+
+    rows = conn.execute(text(
+        "SELECT id, route_id, service_date, seat_number FROM bookings"
+        " WHERE status = 'reserved' AND route_id IS NOT NULL AND service_date IS NOT NULL"
+        " ORDER BY id"
+    )).all()
+    taken, seats, moved = {}, [], []
+    for booking_id, route_id, day, seat_number in rows:
+        used = taken.setdefault((route_id, day), set())
+        if seat_number is None or seat_number < 1 or seat_number in used:
+            new = 1
+            while new in used:
+                new += 1
+            moved.append({"id": booking_id, "seat_number": new})
+            seat_number = new
+        used.add(seat_number)
+        seats.append({"route_id": route_id, "service_date": day, "seat_number": seat_number, "booking_id": booking_id})
+    for i in range(0, len(seats), 5000):
+        conn.execute(text(
+            "INSERT INTO seats (route_id, service_date, seat_number, booking_id)"
+            " VALUES (:route_id, :service_date, :seat_number, :booking_id)"
+        ), seats[i:i + 5000])
+    if moved:
+        conn.execute(text("UPDATE bookings SET seat_number = :seat_number WHERE id = :id"), moved)
+
+
+def m008_verification_code_attempts(conn):
+    # 인증번호를 틀린 횟수를 세어 추측 공격을 막습니다.
+    _add_columns(conn, "verification_codes", {"failed_attempts": Integer()})
+
+
+def m009_booking_daily_by_service_date(conn):
+    # 일간 집계의 날짜를 예약한 날(booked_at)에서 운행일(service_date)로 바꿉니다. 인덱스를 만들고 집계를 다시 계산합니다.
+    _create_indexes(conn, models.Booking.__table__, "ix_bookings_service_date")
+    occupancy.rebuild(conn)
+
+
+def m010_pass_quota_used(conn):
+    # 정기권 작업자가 정원을 조건부 UPDATE로 잡도록 pass_quotas에 사용 중인 자리 수(used)를 둡니다.
+    # 처리 중이던 신청은 claimed_at이 없으므로 pending으로 되돌리고, used는 승인된 신청 수로 채웁니다.
+    # (기간이 지났지만 아직 expired로 바뀌지 않은 것도 세어 두면, 작업자가 expire()로 바꾸면서 돌려줍니다.)
+    _add_columns(conn, "pass_quotas", {"used": Integer()})
+    _add_columns(conn, "semester_passes", {"claimed_at": DateTime()})
+    conn.execute(text("UPDATE semester_passes SET status = 'pending' WHERE status = 'processing'"))
+    conn.execute(text(
+        "UPDATE pass_quotas SET used = (SELECT COUNT(*) FROM semester_passes p"
+        " WHERE p.route_type = pass_quotas.route_type AND p.status = 'approved')"
+    ))
+
+
+def m011_message_created_at(conn):
+    # 예전 DB의 messages.created_at에는 기본값이 없어서 공지 일괄 발송으로 들어간 쪽지가 NULL로 남았습니다.
+    # 쪽지 목록은 (created_at, id)로 페이지를 넘기므로 NULL인 쪽지는 목록에서 빠집니다. 지금 시각으로 채우고
+    # (같은 시각끼리는 id순으로 정렬됩니다) Postgres에서는 컬럼 기본값도 줍니다. (SQLite는 models.py의 INSERT 기본값을 씁니다.)
+    conn.execute(text("UPDATE messages SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL"))
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("ALTER TABLE messages ALTER COLUMN created_at SET DEFAULT now()"))
+
+
+MIGRATIONS = [
+    (1, "예전 스키마에 없는 컬럼 추가", m001_add_missing_columns),
+    (2, "favorites/bookings/messages 조회용 인덱스와 즐겨찾기 유니크 제약", m002_hot_lookup_indexes),
+    (3, "중복 노선 병합과 노선 이름 유니크 제약", m003_unique_route_names),
+    (4, "포인트 원장 시작 잔액 기록", m004_points_opening_balances),
+    (5, "예약 시각(booked_at) 인덱스", m005_booking_daily_rollup),
+    (6, "정기권 신청 처리용 컬럼/인덱스", m006_semester_pass_processing),
+    (7, "운행편(노선, 운행일)별 좌석과 기존 예약 좌석 옮기기", m007_departure_seats),
+    (8, "인증번호 틀린 횟수 컬럼", m008_verification_code_attempts),
+    (9, "일간 예약 집계를 운행일 기준으로 다시 계산", m009_booking_daily_by_service_date),
+    (10, "정기권 정원 사용 수 컬럼", m010_pass_quota_used),
+    (11, "쪽지 작성 시각 빈 값 채우기와 기본값", m011_message_created_at),
+]
+
+
+# 여러 워커가 동시에 시작해도(AUTO_MIGRATE=1) 한 곳에서만 마이그레이션하도록 잡는 Postgres advisory lock 키
+MIGRATION_LOCK_KEY = 80_2024_0009
+
+
+def applied_versions(bind=engine):
+    with bind.connect() as conn:
+        return {v for (v,) in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+@contextmanager
+def _migration_lock(conn):
+    """다른 워커의 migrate가 끝날 때까지 기다렸다가 잠금을 잡습니다.
+
+    Postgres는 세션 advisory lock이라 버전마다 커밋해도 잠금이 유지됩니다.
+    SQLite는 BEGIN IMMEDIATE로 쓰기 잠금을 잡으므로 전체를 한 트랜잭션으로 적용하고 마지막에 커밋합니다.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        conn.commit()
+        try:
+            yield
+        finally:
+            conn.rollback()
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            conn.commit()
+    else:
+        if conn.dialect.name == "sqlite":
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        yield
+
+
+def migrate(bind=engine):
+    """새 테이블을 만들고 아직 적용되지 않은 마이그레이션을 순서대로 적용합니다. 적용한 버전 목록을 반환합니다.
+
+    잠금을 잡은 뒤에 schema_migrations를 읽으므로, 먼저 시작한 워커가 적용한 버전은 다시 실행하지 않습니다.
+    """
+    applied = []
+    with bind.connect() as conn:
+        with _migration_lock(conn):
+            commit_each = conn.dialect.name != "sqlite"
+            try:
+                models.Base.metadata.create_all(bind=conn)
+                if commit_each:
+                    conn.commit()
+                done = {v for (v,) in conn.execute(text("SELECT version FROM schema_migrations"))}
+                for version, description, fn in MIGRATIONS:
+                    if version in done:
+                        continue
+                    fn(conn)
+                    conn.execute(
+                        models.SchemaMigration.__table__.insert(),
+                        {"version": version, "description": description},
+                    )
+                    if commit_each:
+                        conn.commit()
+                    logger.info(f"마이그레이션 {version} 적용: {description}")
+                    applied.append(version)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    return applied
+
+
+def missing_indexes(bind=engine):
+    """models.py에 정의되어 있지만 실제 DB에는 없는 인덱스를 "테이블.인덱스" 목록으로 반환합니다."""
+    insp = inspect(bind)
+    existing_tables = set(insp.get_table_names())
+    missing = []
+    for table in models.Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            missing.append(table.name)
+            continue
+        names = {i["name"] for i in insp.get_indexes(table.name)}
+        names |= {c["name"] for c in insp.get_unique_constraints(table.name)}
+        missing += [f"{table.name}.{idx.name}" for idx in table.indexes if idx.name not in names]
+    return missing
+
+
+def check(bind=engine):
+    missing = missing_indexes(bind)
+    if missing:
+        logger.warning(f"누락된 인덱스/테이블: {', '.join(missing)} (python migrations.py 로 적용하세요)")
+    return missing
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if "--check" in sys.argv:
+        sys.exit(1 if check() else 0)
+    applied = migrate()
+    print(f"✅ 적용된 마이그레이션: {applied or '없음'}")
+    check()
@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Boolean, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, Date, DateTime, Float, Boolean, Text, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from database import Base  # ✅ 중요: 여기서 가져온 Base만 사용해야 합니다.
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 
 
 class User(Base):
@@ -16,6 +16,9 @@ class User(Base):
 
 class BusRoute(Base):
     __tablename__ = "bus_routes"
+    __table_args__ = (
+        Index("uq_bus_routes_route_name", "route_name", unique=True),
+    )
     id = Column(Integer, primary_key=True, index=True)
     route_name = Column(String)
     location = Column(String)
@@ -28,36 +31,156 @@ class BusRoute(Base):
 
 class Favorite(Base):
     __tablename__ = "favorites"
+    __table_args__ = (
+        Index("uq_favorites_user_route", "user_id", "route_id", unique=True),
+        Index("ix_favorites_route_id", "route_id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     route_id = Column(Integer, ForeignKey("bus_routes.id"))
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        Index("ix_bookings_user_booked", "user_id", "booked_at"),
+        Index("ix_bookings_route_status", "route_id", "status"),
+        Index("ix_bookings_booked_at", "booked_at"),
+        Index("ix_bookings_service_date", "service_date"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     route_id = Column(Integer, ForeignKey("bus_routes.id"))
     status = Column(String, default="reserved")
+    # 타는 날(운행일). 좌석은 (노선, 운행일)마다 따로 있습니다.
+    service_date = Column(Date, nullable=True)
     seat_number = Column(Integer, nullable=True)
     booked_at = Column(DateTime, default=datetime.now)
     
     user = relationship("User")
     route = relationship("BusRoute")
 
+class Seat(Base):
+    # 운행편(노선 x 운행일)별 좌석. booking.ensure_seats가 운행편마다 1..total_seats를 만듭니다.
+    __tablename__ = "seats"
+    __table_args__ = (
+        UniqueConstraint("route_id", "service_date", "seat_number", name="uq_seats_departure_seat"),
+        Index("ix_seats_booking_id", "booking_id"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    route_id = Column(Integer, ForeignKey("bus_routes.id"), nullable=False)
+    service_date = Column(Date, nullable=False)
+    seat_number = Column(Integer, nullable=False)
+    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=True)
+
 class SemesterPass(Base):
     __tablename__ = "semester_passes"
+    __table_args__ = (
+        Index("ix_semester_passes_status", "status", "id"),
+        # 같은 종류의 정기권은 신청 중이거나 사용 중인 것이 한 사람당 하나만 있도록 합니다.
+        Index(
+            "uq_semester_passes_active", "user_id", "route_type", unique=True,
+            sqlite_where=text("status IN ('pending', 'processing', 'approved')"),
+            postgresql_where=text("status IN ('pending', 'processing', 'approved')"),
+        ),
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer)
     route_type = Column(String)
     status = Column(String, default="pending")
     applied_at = Column(DateTime, default=datetime.now)
+    processed_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
+    reason = Column(String, nullable=True)
+    claimed_at = Column(DateTime, nullable=True)
+
+class PassQuota(Base):
+    # 정기권 종류(route_type)별 정원. used는 처리 중(processing)이거나 승인된 신청 수로,
+    # passes.py 작업자가 조건부 UPDATE(used + n <= capacity)로 자리를 잡고 거절/만료 때 돌려줍니다.
+    __tablename__ = "pass_quotas"
+    route_type = Column(String, primary_key=True)
+    capacity = Column(Integer, nullable=False)
+    used = Column(Integer, default=0, nullable=False)
+
+class AdmissionTicket(Base):
+    # 신청 폭주 노선의 예약 접수 대기열. admission.py 작업자가 id순으로 가져가 처리하고 결과(JSON)를 result에 남깁니다.
+    __tablename__ = "admission_tickets"
+    __table_args__ = (
+        Index("ix_admission_tickets_status", "status", "id"),
+        # 같은 사용자의 같은 운행편 접수는 처리 전인 것이 하나만 있도록 합니다.
+        Index(
+            "uq_admission_tickets_active", "user_id", "route_id", "service_date", unique=True,
+            sqlite_where=text("status IN ('queued', 'processing')"),
+            postgresql_where=text("status IN ('queued', 'processing')"),
+        ),
+    )
+    id = Column(Integer, primary_key=True)
+    ticket_id = Column(String, unique=True, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    route_id = Column(Integer, nullable=False)
+    service_date = Column(Date, nullable=False)
+    seat_number = Column(Integer, nullable=True)
+    status = Column(String, default="queued", nullable=False)
+    result = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+    claimed_at = Column(DateTime, nullable=True)
+    processed_at = Column(DateTime, nullable=True)
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        Index("ix_messages_receiver_created", "receiver_id", "created_at", "id"),
+        Index("ix_messages_receiver_unread", "receiver_id", "is_read"),
+        Index("ix_messages_sender_id", "sender_id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     receiver_id = Column(Integer, ForeignKey("users.id"))
     title = Column(String)
     content = Column(Text)
     is_read = Column(Integer, default=0)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # 예전 DB에서 마이그레이션으로 붙은 컬럼에는 서버 기본값이 없으므로 INSERT할 때도 now()를 넣습니다.
+    # (쪽지 목록이 (created_at, id)로 페이지를 넘기므로 NULL이면 목록에서 빠집니다.)
+    created_at = Column(DateTime(timezone=True), default=func.now(), server_default=func.now())
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+    name = Column(String, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+    version = Column(Integer, primary_key=True)
+    description = Column(String)
+    applied_at = Column(DateTime, default=datetime.now)
+
+class VerificationCode(Base):
+    __tablename__ = "verification_codes"
+    email = Column(String, primary_key=True)
+    code = Column(String, nullable=True)
+    expires_at = Column(DateTime, nullable=True)
+    window_start = Column(DateTime, nullable=False)
+    sent_count = Column(Integer, default=0, nullable=False)
+    # 지금 코드로 틀린 횟수 (codes.CODE_MAX_ATTEMPTS번이면 코드를 비웁니다)
+    failed_attempts = Column(Integer, default=0)
+
+class PointsLedger(Base):
+    __tablename__ = "points_ledger"
+    __table_args__ = (
+        Index("ix_points_ledger_user_id", "user_id", "id"),
+    )
+    id = Column(Integer, primary_key=True)
+    # 탈퇴한 사용자의 내역도 남기기 위해 users에 외래 키를 걸지 않습니다.
+    user_id = Column(Integer, nullable=False)
+    delta = Column(Integer, nullable=False)
+    balance_after = Column(Integer, nullable=False)
+    reason = Column(String, nullable=False)
+    ref_id = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+
+class BookingDaily(Base):
+    # 노선 x 운행일(bookings.service_date)별 상태(reserved/cancelled)별 예약 수. occupancy.py가 예약/취소 때마다 올리고 내립니다.
+    __tablename__ = "booking_daily"
+    route_id = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    reserved = Column(Integer, default=0, nullable=False)
+    cancelled = Column(Integer, default=0, nullable=False)
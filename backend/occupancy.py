@@ -0,0 +1,203 @@
+import os
+import time
+import logging
+import argparse
+import datetime
+from typing import Optional
+
+from sqlalchemy import select, update, delete, func, case
+
+import models
+from database import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+# 0이면 예약/취소 때 집계 테이블을 바로 고치지 않고 주기 작업(python occupancy.py --days N)에만 맡깁니다.
+OCCUPANCY_INLINE = os.getenv("OCCUPANCY_INLINE", "1") == "1"
+# 한 번에 조회할 수 있는 최대 기간(일)
+MAX_REPORT_DAYS = 366
+MAX_PAGE_SIZE = 100
+
+
+# --- [노선별 일간 예약 집계] ---
+# booking_daily에 (노선, 운행일)별 reserved/cancelled 수를 들고 있어서, 점유율/기간 보고서는 bookings를 훑지 않고
+# 노선 수 x 일 수 크기의 집계 행만 읽습니다. 예약/취소 API가 같은 트랜잭션에서 해당 행을 +1/-1 하고,
+# rebuild()는 지정한 기간을 bookings에서 다시 계산해 덮어씁니다. (누락 보정과 처음 채우기용)
+# 날짜는 예약한 날(booked_at)이 아니라 버스가 다니는 날(bookings.service_date)이라 좌석 수와 나눠 점유율을 냅니다.
+STATUSES = ("reserved", "cancelled")
+
+
+def _upsert(db, deltas):
+    """[(route_id, day, reserved 증감, cancelled 증감), ...]를 집계 행에 더합니다.
+
+    ON CONFLICT 문은 SQLAlchemy 컴파일 캐시에 들어가지 않아 매번 컴파일되므로, 대부분인 "행이 이미 있는" 경우는
+    캐시되는 UPDATE로 처리하고 그 날 첫 예약일 때만 upsert합니다. (동시에 첫 행을 만들어도 upsert가 합쳐 줍니다.)
+    """
+    D = models.BookingDaily
+    missing = []
+    for route_id, day, reserved, cancelled in deltas:
+        result = db.execute(
+            update(D)
+            .where(D.route_id == route_id, D.day == day)
+            .values(reserved=D.reserved + reserved, cancelled=D.cancelled + cancelled)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            missing.append({"route_id": route_id, "day": day, "reserved": reserved, "cancelled": cancelled})
+    if missing:
+        insert = dialect_insert(db.get_bind())
+        stmt = insert(D)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[D.route_id, D.day],
+            set_={
+                "reserved": D.reserved + stmt.excluded.reserved,
+                "cancelled": D.cancelled + stmt.excluded.cancelled,
+            },
+        )
+        db.execute(stmt, missing)
+
+
+def record_reserve(db, route_id: int, service_date: datetime.date):
+    if OCCUPANCY_INLINE:
+        _upsert(db, [(route_id, service_date, 1, 0)])
+
+
+def record_cancel(db, route_id: int, service_date: datetime.date):
+    if OCCUPANCY_INLINE:
+        _upsert(db, [(route_id, service_date, -1, 1)])
+
+
+def _counts(*criteria):
+    """bookings를 (노선, 운행일)별로 묶어 reserved/cancelled 수를 세는 쿼리."""
+    B = models.Booking
+    return select(
+        B.route_id, B.service_date,
+        *(func.count(case((B.status == s, 1))) for s in STATUSES),
+    ).where(B.route_id.isnot(None), B.service_date.isnot(None), *criteria).group_by(B.route_id, B.service_date)
+
+
+def remove_bookings(db, *criteria):
+    """지워질 예약들(criteria에 맞는 bookings)을 집계에서 뺍니다. 예약을 지우기 전에 호출합니다."""
+    if OCCUPANCY_INLINE:
+        _upsert(db, [(r, d, -n, -c) for r, d, n, c in db.execute(_counts(*criteria))])
+
+
+def rebuild(db, start: Optional[datetime.date] = None, end: Optional[datetime.date] = None) -> int:
+    """start~end(포함) 운행일의 집계를 bookings에서 다시 계산합니다. 기간을 안 주면 전체를 다시 만듭니다.
+
+    Session이나 Connection 모두 받고, commit은 호출한 쪽이 합니다. 새로 넣은 집계 행 수를 반환합니다.
+    """
+    B, D = models.Booking, models.BookingDaily
+    criteria = []
+    clear = delete(D)
+    if start is not None:
+        criteria.append(B.service_date >= start)
+        clear = clear.where(D.day >= start)
+    if end is not None:
+        criteria.append(B.service_date <= end)
+        clear = clear.where(D.day <= end)
+    db.execute(clear)
+    result = db.execute(D.__table__.insert().from_select(["route_id", "day", *STATUSES], _counts(*criteria)))
+    return result.rowcount
+
+
+def month_range(today: Optional[datetime.date] = None):
+    """이번 달 1일~말일. 앞으로 운행할 날의 예약도 보이도록 오늘이 아니라 말일까지입니다."""
+    today = today or datetime.date.today()
+    first = today.replace(day=1)
+    next_month = (first + datetime.timedelta(days=32)).replace(day=1)
+    return first, next_month - datetime.timedelta(days=1)
+
+
+def check_range(start: datetime.date, end: datetime.date):
+    if end < start:
+        raise ValueError("end가 start보다 빠릅니다.")
+    if (end - start).days + 1 > MAX_REPORT_DAYS:
+        raise ValueError(f"기간은 최대 {MAX_REPORT_DAYS}일입니다.")
+
+
+def _rate(reserved: int, total_seats: Optional[int]) -> Optional[float]:
+    return round(reserved / total_seats, 4) if total_seats else None
+
+
+def route_days(db, route: dict, start: datetime.date, end: datetime.date,
+               cursor: Optional[datetime.date] = None, limit: int = 31):
+    """한 노선의 날짜별 예약 수와 점유율을 날짜순으로 한 페이지 반환합니다. 예약이 없는 날은 빠집니다.
+
+    cursor는 이전 페이지 마지막 날짜이고, 반환값은 (목록, 다음 커서)입니다.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    D = models.BookingDaily
+    query = select(D.day, D.reserved, D.cancelled).where(D.route_id == route["id"], D.day >= start, D.day <= end)
+    if cursor is not None:
+        query = query.where(D.day > cursor)
+    rows = db.execute(query.order_by(D.day).limit(limit + 1)).all()
+    items = [{
+        "day": r.day,
+        "reserved": r.reserved,
+        "cancelled": r.cancelled,
+        "total_seats": route["total_seats"],
+        "occupancy": _rate(r.reserved, route["total_seats"]),
+    } for r in rows[:limit]]
+    next_cursor = items[-1]["day"] if len(rows) > limit else None
+    return items, next_cursor
+
+
+def summary(db, routes: dict, start: datetime.date, end: datetime.date,
+            cursor: Optional[int] = None, limit: int = 50):
+    """기간 안의 노선별 합계(예약/취소 수, 예약이 있던 날 수, 하루 최대 예약 수, 평균 점유율)를 노선 id순으로 반환합니다.
+
+    routes는 {route_id: 노선 행} (카탈로그)이고, cursor는 이전 페이지 마지막 노선 id입니다.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    D = models.BookingDaily
+    query = select(
+        D.route_id,
+        func.sum(D.reserved).label("reserved"),
+        func.sum(D.cancelled).label("cancelled"),
+        func.count().label("days"),
+        func.max(D.reserved).label("peak"),
+    ).where(D.day >= start, D.day <= end)
+    if cursor is not None:
+        query = query.where(D.route_id > cursor)
+    rows = db.execute(query.group_by(D.route_id).order_by(D.route_id).limit(limit + 1)).all()
+    items = []
+    for r in rows[:limit]:
+        route = routes.get(r.route_id) or {}
+        total_seats = route.get("total_seats")
+        items.append({
+            "route_id": r.route_id,
+            "route_name": route.get("route_name"),
+            "reserved": r.reserved,
+            "cancelled": r.cancelled,
+            "days": r.days,
+            "peak_reserved": r.peak,
+            "avg_occupancy": _rate(r.reserved / r.days, total_seats) if r.days else None,
+        })
+    next_cursor = items[-1]["route_id"] if len(rows) > limit else None
+    return items, next_cursor
+
+
+if __name__ == "__main__":
+    # 주기 작업: python occupancy.py --days 2 (어제 운행편부터 앞으로 운행할 날까지 다시 계산), 처음 채우기: python occupancy.py --all
+    from database import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser()
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--days", type=int, help="오늘부터 거슬러 올라가 다시 계산할 일 수 (오늘 이후 운행일은 모두 포함)")
+    group.add_argument("--all", action="store_true", help="전체 기간을 다시 계산")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        if args.all:
+            rows = rebuild(db)
+        else:
+            today = datetime.date.today()
+            rows = rebuild(db, today - datetime.timedelta(days=args.days - 1))
+        db.commit()
+    finally:
+        db.close()
+    print(f"✅ 집계 {rows}행을 다시 계산했습니다. ({(time.perf_counter() - started) * 1000:.1f}ms)")
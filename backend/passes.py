@@ -0,0 +1,390 @@
+import os
+import time
+import asyncio
+import logging
+import argparse
+import datetime
+from collections import Counter, defaultdict
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select, update, func
+from sqlalchemy.exc import IntegrityError
+
+import inbox
+import models
+import points
+import snapshots
+from database import SessionLocal, dialect_insert
+
+logger = logging.getLogger(__name__)
+
+# 정기권 종류별 가격(포인트). 프론트엔드 PointAndPass의 SEMESTER_PASS_PRICE와 같아야 합니다.
+PASS_PRICES = {"SEMESTER": int(os.getenv("SEMESTER_PASS_PRICE", "150000"))}
+# 종류별 정원 ("SEMESTER=3000,..."). pass_quotas에 행이 없을 때만 이 값으로 만들고, 이후에는 DB 값을 씁니다.
+PASS_CAPACITY = {
+    k.strip(): int(v)
+    for k, v in (item.split("=") for item in os.getenv("PASS_CAPACITY", "SEMESTER=3000").split(",") if item.strip())
+}
+PASS_BATCH_SIZE = int(os.getenv("PASS_BATCH_SIZE", "500"))
+# 신청이 없어도 대기 중인 신청을 확인하는 간격(초)
+PASS_WORKER_INTERVAL = float(os.getenv("PASS_WORKER_INTERVAL", "30"))
+# processing인 채로 이 시간(초)이 지난 신청은 작업자가 중간에 죽은 것으로 보고 다시 가져옵니다.
+PASS_STALE_AFTER = float(os.getenv("PASS_STALE_AFTER", "300"))
+# 0이면 앱 안에서 작업자를 띄우지 않습니다. (서버리스 등에서는 python passes.py를 주기적으로 실행)
+PASS_WORKER = os.getenv("PASS_WORKER", "1") == "1"
+
+
+def semester_end(now: datetime.datetime) -> datetime.datetime:
+    """1학기(3~8월) 승인분은 8월 31일, 2학기(9~2월) 승인분은 2월 말일까지 사용할 수 있습니다."""
+    if 3 <= now.month <= 8:
+        end = datetime.date(now.year, 8, 31)
+    else:
+        end = datetime.date(now.year + 1 if now.month >= 9 else now.year, 3, 1) - datetime.timedelta(days=1)
+    return datetime.datetime.combine(end, datetime.time(23, 59, 59))
+
+
+def _release(db, counts):
+    """{종류: 개수}만큼 pass_quotas.used를 줄여 자리를 돌려줍니다."""
+    Q = models.PassQuota
+    for route_type, n in sorted(counts.items()):
+        if n:
+            db.execute(update(Q).where(Q.route_type == route_type).values(used=Q.used - n))
+
+
+def expire(db, now: datetime.datetime, user_id: Optional[int] = None) -> int:
+    """기간이 끝난 승인 정기권을 expired로 바꾸고 정원 자리를 돌려줍니다. (같은 종류를 다시 신청할 수 있도록)"""
+    P = models.SemesterPass
+    stmt = update(P).where(P.status == "approved", P.expires_at <= now)
+    if user_id is not None:
+        stmt = stmt.where(P.user_id == user_id)
+    expired = Counter(t for (t,) in db.execute(
+        stmt.values(status="expired").returning(P.route_type).execution_options(synchronize_session=False)
+    ))
+    _release(db, expired)
+    return sum(expired.values())
+
+
+# --- [정기권 신청] ---
+# 신청은 pending 행만 만들고 바로 응답합니다. 정원 확인과 포인트 차감은 아래 작업자가 배치로 처리합니다.
+def apply(db, user_id: int, pass_type: str) -> dict:
+    price = PASS_PRICES.get(pass_type)
+    if price is None:
+        raise HTTPException(status_code=400, detail="알 수 없는 정기권 종류입니다.")
+    row = db.query(models.User.points).filter(models.User.id == user_id).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+    if (row[0] or 0) < price:
+        raise HTTPException(status_code=400, detail="포인트 부족")
+
+    now = datetime.datetime.now()
+    expire(db, now, user_id)
+    new_pass = models.SemesterPass(user_id=user_id, route_type=pass_type, status="pending", applied_at=now)
+    try:
+        with db.begin_nested():
+            db.add(new_pass)
+            db.flush()
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="이미 신청했거나 사용 중인 정기권이 있습니다.")
+    return {"status": "pending", "pass_id": new_pass.id, "pass_type": pass_type, "price": price}
+
+
+def status(db, user_id: int, limit: int = 10) -> dict:
+    P = models.SemesterPass
+    rows = db.execute(
+        select(P.id, P.route_type, P.status, P.applied_at, P.processed_at, P.expires_at, P.reason)
+        .where(P.user_id == user_id)
+        .order_by(P.id.desc())
+        .limit(limit)
+    ).all()
+    now = datetime.datetime.now()
+    active = [r for r in rows if r.status == "approved" and r.expires_at and r.expires_at > now]
+    return {
+        "status": "success",
+        "has_pass": bool(active),
+        "expires_at": max((r.expires_at for r in active), default=None),
+        "passes": [{
+            "pass_id": r.id,
+            "pass_type": r.route_type,
+            "status": r.status,
+            "applied_at": r.applied_at,
+            "processed_at": r.processed_at,
+            "expires_at": r.expires_at,
+            "reason": r.reason,
+        } for r in rows],
+    }
+
+
+# --- [정기권 승인 작업자] ---
+# 배치 하나를 두 트랜잭션으로 처리합니다.
+#   1) pending 신청을 id순으로 batch_size개 processing으로 바꾸며 가져오고 (FOR UPDATE SKIP LOCKED라 작업자 여러 개가 서로 다른 신청을 가져감)
+#      종류별 신청 수만큼 조건부 UPDATE 한 번(used + n <= capacity)으로 정원 자리를 잡은 뒤 바로 커밋합니다.
+#      pass_quotas 행은 이 UPDATE부터 커밋까지만 잠기므로, 다른 작업자가 배치를 처리하는 동안 기다리지 않습니다.
+#      잔액이 모자란 신청은 자리를 잡기 전에 (잠그지 않고 읽은 잔액으로) 먼저 거절하고, 자리를 못 잡은 신청은 "정원 초과"로 거절합니다.
+#   2) 신청 순서대로 잔액을 확인해 승인/거절을 정하고, 포인트 차감(금액별 UPDATE 한 번), 원장 기록(executemany),
+#      상태 변경(결과별 UPDATE 한 번)을 집합 단위로 실행합니다. 거절된 신청이 잡고 있던 자리는 돌려줍니다.
+# processing 신청은 모두 정원 자리를 하나씩 잡고 있습니다. 2)가 실패하면 롤백되어 processing으로 남고,
+# PASS_STALE_AFTER초 뒤 다음 작업자가 (자리를 다시 잡지 않고) 이어서 처리합니다.
+# 거절된 신청은 사용자에게 쪽지로 사유를 보냅니다.
+def ensure_quotas(db):
+    insert = dialect_insert(db.get_bind())
+    db.execute(insert(models.PassQuota).on_conflict_do_nothing(), [
+        {"route_type": t, "capacity": PASS_CAPACITY.get(t, 0), "used": 0} for t in PASS_PRICES
+    ])
+
+
+def _claim(db, batch_size: int, now: datetime.datetime):
+    """오래 멈춘 processing 신청과 pending 신청을 id순으로 가져옵니다. (다시 가져온 것, 새로 가져온 것)을 반환합니다."""
+    P = models.SemesterPass
+
+    def claim(ready, limit):
+        candidate = select(P.id).where(ready).order_by(P.id).limit(limit).with_for_update(skip_locked=True)
+        return db.execute(
+            update(P)
+            .where(P.id.in_(candidate), ready)
+            .values(status="processing", claimed_at=now)
+            .returning(P.id, P.user_id, P.route_type)
+            .execution_options(synchronize_session=False)
+        ).all()
+
+    stale = now - datetime.timedelta(seconds=PASS_STALE_AFTER)
+    resumed = claim((P.status == "processing") & (P.claimed_at < stale), batch_size)
+    claimed = claim(P.status == "pending", batch_size - len(resumed)) if len(resumed) < batch_size else []
+    return sorted(resumed, key=lambda r: r.id), sorted(claimed, key=lambda r: r.id)
+
+
+def _reserve(db, route_type: str, n: int) -> int:
+    """정원에서 최대 n자리를 잡고 잡은 수를 반환합니다. 조건부 UPDATE라 정원을 넘겨 잡는 일은 없습니다."""
+    Q = models.PassQuota
+    while n > 0:
+        if db.execute(
+            update(Q)
+            .where(Q.route_type == route_type, Q.used + n <= Q.capacity)
+            .values(used=Q.used + n)
+            .returning(Q.used)
+        ).first() is not None:
+            return n
+        # 다 못 들어가면 남은 자리만큼 다시 시도합니다. (그 사이 다른 작업자가 잡았을 수도 있음)
+        left = db.execute(select(Q.capacity - Q.used).where(Q.route_type == route_type)).scalar()
+        if not left or left <= 0:
+            return 0
+        n = min(n, left)
+    return 0
+
+
+def _reject(db, rejected, now: datetime.datetime):
+    """{사유: [신청 행, ...]}를 사유별 UPDATE 한 번으로 거절하고, 사용자에게 사유를 쪽지로 보냅니다."""
+    P = models.SemesterPass
+    for reason, rows in rejected.items():
+        if not rows:
+            continue
+        db.execute(
+            update(P).where(P.id.in_([r.id for r in rows]))
+            .values(status="rejected", processed_at=now, reason=reason)
+            .execution_options(synchronize_session=False)
+        )
+        inbox.send_bulk(
+            db, [r.user_id for r in rows], "정기권 신청 결과 안내",
+            f"정기권 신청이 거절되었습니다. (사유: {reason})\n포인트는 차감되지 않았습니다.",
+        )
+
+
+def reserve_batch(db, batch_size: int = PASS_BATCH_SIZE):
+    """1) 신청을 가져와 정원 자리를 잡습니다. commit은 호출한 쪽이 바로 합니다.
+
+    (자리를 잡은 신청 목록, {사유: 거절한 신청 목록})을 반환합니다.
+    """
+    U = models.User
+    now = datetime.datetime.now()
+    resumed, claimed = _claim(db, batch_size, now)
+    held, rejected = list(resumed), defaultdict(list)
+    # 잔액이 모자라 2)에서 거절될 신청이 자리를 잡아 두면, 그 사이 다른 작업자가 정원이 찬 줄 알고 거절하게 되므로 먼저 거릅니다.
+    # 2)에서 잠근 잔액으로 다시 확인하므로 여기서는 잠그지 않습니다.
+    balances = dict(db.execute(
+        select(U.id, func.coalesce(U.points, 0)).where(U.id.in_({r.user_id for r in claimed}))
+    ).all()) if claimed else {}
+    by_type = defaultdict(list)
+    for r in claimed:
+        price = PASS_PRICES.get(r.route_type)
+        if price is None:
+            rejected["알 수 없는 정기권 종류입니다."].append(r)
+        elif r.user_id not in balances:
+            rejected["사용자를 찾을 수 없습니다."].append(r)
+        elif balances[r.user_id] < price:
+            rejected["포인트 부족"].append(r)
+        else:
+            balances[r.user_id] -= price
+            by_type[r.route_type].append(r)
+    for route_type in sorted(by_type):
+        rows = by_type[route_type]
+        granted = _reserve(db, route_type, len(rows))
+        held += rows[:granted]
+        rejected["정원 초과"] += rows[granted:]
+    _reject(db, rejected, now)
+    return sorted(held, key=lambda r: r.id), rejected
+
+
+def process_batch(db, held) -> dict:
+    """2) 정원 자리를 잡은 신청의 잔액을 확인해 승인/거절합니다. {approved, rejected, users}를 반환하고, commit은 호출한 쪽이 합니다."""
+    P, U = models.SemesterPass, models.User
+    now = datetime.datetime.now()
+    if not held:
+        return {"approved": 0, "rejected": 0, "users": set()}
+    user_ids = sorted({r.user_id for r in held})
+    balances = dict(db.execute(
+        select(U.id, func.coalesce(U.points, 0)).where(U.id.in_(user_ids)).order_by(U.id).with_for_update()
+    ).all())
+
+    approved, rejected = [], defaultdict(list)
+    charges = defaultdict(int)
+    for r in held:
+        price = PASS_PRICES[r.route_type]
+        if r.user_id not in balances:
+            rejected["사용자를 찾을 수 없습니다."].append(r)
+        elif balances[r.user_id] < price:
+            rejected["포인트 부족"].append(r)
+        else:
+            balances[r.user_id] -= price
+            charges[r.user_id] += price
+            approved.append(r)
+
+    # 금액이 같은 사용자끼리 묶어 UPDATE 한 번으로 차감합니다. (대부분 한 사람이 한 장이라 금액 종류는 몇 개뿐입니다.)
+    by_amount = defaultdict(list)
+    for user_id, amount in charges.items():
+        by_amount[amount].append(user_id)
+    final = {}
+    for amount, ids in by_amount.items():
+        balance = func.coalesce(U.points, 0)
+        final.update(db.execute(
+            update(U)
+            .where(U.id.in_(ids), balance >= amount)
+            .values(points=balance - amount)
+            .returning(U.id, U.points)
+            .execution_options(synchronize_session=False)
+        ).all())
+
+    # 원장의 balance_after는 사용자별 최종 잔액에서 거꾸로 계산합니다.
+    ledger = []
+    running = {user_id: final[user_id] + charges[user_id] for user_id in final}
+    for r in approved:
+        if r.user_id not in final:
+            continue
+        running[r.user_id] -= PASS_PRICES[r.route_type]
+        ledger.append({
+            "user_id": r.user_id, "delta": -PASS_PRICES[r.route_type], "balance_after": running[r.user_id],
+            "reason": "pass", "ref_id": r.id,
+        })
+    # 잠근 잔액으로 판단했으므로 차감이 빠지는 일은 없어야 하지만, 혹시 빠지면 승인하지 않습니다.
+    rejected["포인트 부족"] += [r for r in approved if r.user_id not in final]
+    approved_ids = [r.id for r in approved if r.user_id in final]
+
+    points.append_many(db, ledger)
+    if approved_ids:
+        db.execute(
+            update(P).where(P.id.in_(approved_ids))
+            .values(status="approved", processed_at=now, expires_at=semester_end(now), reason=None)
+            .execution_options(synchronize_session=False)
+        )
+    _reject(db, rejected, now)
+    _release(db, Counter(r.route_type for rows in rejected.values() for r in rows))
+    return {
+        "approved": len(approved_ids),
+        "rejected": sum(len(rows) for rows in rejected.values()),
+        "users": set(user_ids),
+    }
+
+
+def run_batch(session_factory=SessionLocal, batch_size: int = PASS_BATCH_SIZE) -> dict:
+    """배치 하나를 처리하고 {claimed, approved, rejected, users}를 반환합니다. (가져온 신청이 없으면 claimed 0)"""
+    db = session_factory()
+    try:
+        held, rejected = reserve_batch(db, batch_size)
+        db.commit()
+        result = process_batch(db, held)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    turned_down = [r for rows in rejected.values() for r in rows]
+    result["claimed"] = len(held) + len(turned_down)
+    result["rejected"] += len(turned_down)
+    result["users"] |= {r.user_id for r in turned_down}
+    for user_id in result["users"]:
+        snapshots.invalidate(user_id)
+    return result
+
+
+def drain(session_factory=SessionLocal, batch_size: int = PASS_BATCH_SIZE) -> dict:
+    """대기 중인 신청이 없을 때까지 배치를 처리하고 합계를 반환합니다."""
+    db = session_factory()
+    try:
+        ensure_quotas(db)
+        expire(db, datetime.datetime.now())
+        db.commit()
+    finally:
+        db.close()
+    totals = {"batches": 0, "claimed": 0, "approved": 0, "rejected": 0}
+    while True:
+        result = run_batch(session_factory, batch_size)
+        if not result["claimed"]:
+            return totals
+        totals["batches"] += 1
+        for key in ("claimed", "approved", "rejected"):
+            totals[key] += result[key]
+
+
+_worker: Optional[asyncio.Task] = None
+_wakeup: Optional[asyncio.Event] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def _worker_loop():
+    while True:
+        try:
+            totals = await asyncio.to_thread(drain)
+            if totals["claimed"]:
+                logger.info(f"정기권 신청 처리: {totals}")
+        except Exception as e:
+            logger.warning(f"정기권 신청 처리 실패: {e}")
+        try:
+            await asyncio.wait_for(_wakeup.wait(), PASS_WORKER_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+
+
+def notify():
+    """새 신청이 들어왔음을 작업자에게 알립니다. (다음 주기를 기다리지 않고 바로 처리)"""
+    if _loop is not None:
+        _loop.call_soon_threadsafe(_wakeup.set)
+
+
+def start_worker():
+    global _worker, _wakeup, _loop
+    if _worker is None:
+        _loop = asyncio.get_running_loop()
+        _wakeup = asyncio.Event()
+        _worker = asyncio.create_task(_worker_loop())
+
+
+async def stop_worker():
+    global _worker, _loop
+    if _worker is not None:
+        _worker.cancel()
+        _worker = None
+        _loop = None
+
+
+if __name__ == "__main__":
+    # cron 등에서 주기적으로 실행: python passes.py (대기 중인 신청을 모두 처리하고 종료)
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=PASS_BATCH_SIZE)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    totals = drain(batch_size=args.batch_size)
+    elapsed = time.perf_counter() - started
+    print(f"✅ 정기권 신청 {totals['claimed']}건 처리 (승인 {totals['approved']}, 거절 {totals['rejected']}, "
+          f"배치 {totals['batches']}개, {elapsed:.2f}초)")
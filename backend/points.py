@@ -0,0 +1,100 @@
+import sys
+import logging
+from typing import Optional
+
+from sqlalchemy import update, select, func, literal
+
+import models
+
+logger = logging.getLogger(__name__)
+
+# 정합성 검사를 한 번에 훑는 사용자 id 범위
+RECONCILE_CHUNK = 10000
+
+
+# --- [포인트 원장] ---
+# users.points는 잔액 스냅샷이고(조회는 O(1)), 모든 증감은 points_ledger에 한 줄씩 추가만 합니다.
+# 잔액은 읽고-더하고-쓰기 대신 UPDATE ... RETURNING 한 문장으로 바꾸므로 동시에 충전/사용해도 유실이 없습니다.
+def change_balance(db, user_id: int, delta: int, allow_negative: bool = False) -> Optional[int]:
+    """잔액을 delta만큼 바꾸고 새 잔액을 반환합니다. 사용자가 없거나 잔액이 모자라면 None."""
+    balance = func.coalesce(models.User.points, 0)
+    stmt = update(models.User).where(models.User.id == user_id)
+    if delta < 0 and not allow_negative:
+        stmt = stmt.where(balance >= -delta)
+    return db.execute(stmt.values(points=balance + delta).returning(models.User.points)).scalar()
+
+
+def append(db, user_id: int, delta: int, balance: int, reason: str, ref_id: Optional[int] = None):
+    db.execute(models.PointsLedger.__table__.insert().values(
+        user_id=user_id, delta=delta, balance_after=balance, reason=reason, ref_id=ref_id,
+    ))
+
+
+def append_many(db, rows):
+    """[{user_id, delta, balance_after, reason, ref_id}, ...]를 executemany 한 번으로 기록합니다. (배치 작업용)"""
+    if rows:
+        db.execute(models.PointsLedger.__table__.insert(), rows)
+
+
+def apply_delta(db, user_id: int, delta: int, reason: str, ref_id: Optional[int] = None, allow_negative: bool = False) -> Optional[int]:
+    """잔액 변경과 원장 기록을 같은 트랜잭션에서 합니다. commit은 호출한 쪽이 합니다."""
+    balance = change_balance(db, user_id, delta, allow_negative)
+    if balance is not None and delta != 0:
+        append(db, user_id, delta, balance, reason, ref_id)
+    return balance
+
+
+def history(db, user_id: int, limit: int = 50):
+    L = models.PointsLedger
+    rows = db.execute(
+        select(L.id, L.delta, L.balance_after, L.reason, L.ref_id, L.created_at)
+        .where(L.user_id == user_id)
+        .order_by(L.id.desc())
+        .limit(limit)
+    ).all()
+    return [dict(r._mapping) for r in rows]
+
+
+def reconcile(db, chunk: int = RECONCILE_CHUNK):
+    """users.points와 원장 합계/마지막 balance_after가 다른 사용자를 찾아 목록으로 반환합니다."""
+    U, L = models.User, models.PointsLedger
+    max_id = db.execute(select(func.max(U.id))).scalar() or 0
+    mismatches = []
+    for lo in range(0, max_id + 1, chunk):
+        hi = lo + chunk
+        sums = (
+            select(L.user_id, func.sum(L.delta).label("total"), func.max(L.id).label("last_id"))
+            .where(L.user_id >= lo, L.user_id < hi)
+            .group_by(L.user_id)
+            .subquery()
+        )
+        rows = db.execute(
+            select(U.id, U.points, func.coalesce(sums.c.total, literal(0)).label("total"), L.balance_after)
+            .outerjoin(sums, sums.c.user_id == U.id)
+            .outerjoin(L, L.id == sums.c.last_id)
+            .where(U.id >= lo, U.id < hi)
+            .where(
+                (func.coalesce(sums.c.total, literal(0)) != func.coalesce(U.points, literal(0)))
+                | (L.balance_after != U.points)
+            )
+        ).all()
+        mismatches += [
+            {"user_id": r.id, "balance": r.points, "ledger_sum": r.total, "last_balance_after": r.balance_after}
+            for r in rows
+        ]
+    return mismatches
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        found = reconcile(db)
+    finally:
+        db.close()
+    for m in found:
+        print(f"❌ user {m['user_id']}: 잔액 {m['balance']}, 원장 합계 {m['ledger_sum']}, 마지막 기록 {m['last_balance_after']}")
+    print(f"{'✅ 원장과 잔액이 모두 일치합니다.' if not found else f'불일치 {len(found)}명'}")
+    sys.exit(1 if found else 0)
@@ -0,0 +1,82 @@
+import os
+import json
+import asyncio
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# 구독자 하나당 쌓아 둘 수 있는 최대 메시지 수. 넘치면 가장 오래된 메시지부터 버립니다.
+PUBSUB_QUEUE_SIZE = int(os.getenv("PUBSUB_QUEUE_SIZE", "8"))
+
+
+class Subscription:
+    __slots__ = ("topic", "queue", "dropped")
+
+    def __init__(self, topic, maxsize: int):
+        self.topic = topic
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, message):
+        # 느린 단말 때문에 발행 쪽이 기다리는 일이 없도록, 꽉 차면 가장 오래된 것을 버리고 넣습니다.
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+# --- [노선별 발행/구독 브로커] ---
+# 메시지는 (payload dict, 미리 인코딩한 JSON 문자열) 튜플로 전달해서
+# 구독자가 수천 명이어도 직렬화는 발행할 때 한 번만 합니다.
+class Broker:
+    def __init__(self, queue_size: int = PUBSUB_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.published = 0
+        self._topics = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, topic) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        sub = Subscription(topic, self.queue_size)
+        self._topics.setdefault(topic, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        subs = self._topics.get(sub.topic)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._topics[sub.topic]
+
+    def publish(self, topic, payload: dict):
+        if topic not in self._topics:
+            return 0
+        message = (payload, json.dumps(payload, ensure_ascii=False))
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            return self._fan_out(topic, message)
+        # 스레드풀(동기 엔드포인트)에서 발행하면 이벤트 루프 스레드로 넘겨서 처리합니다.
+        self._loop.call_soon_threadsafe(self._fan_out, topic, message)
+        return len(self._topics.get(topic, ()))
+
+    def _fan_out(self, topic, message):
+        subs = self._topics.get(topic, ())
+        for sub in subs:
+            sub.put(message)
+        self.published += 1
+        return len(subs)
+
+    def subscriber_count(self, topic=None):
+        if topic is not None:
+            return len(self._topics.get(topic, ()))
+        return sum(len(s) for s in self._topics.values())
+
+
+broker = Broker()
@@ -0,0 +1,155 @@
+import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+# --- [응답 스키마] ---
+# response_model로 지정하면 FastAPI가 jsonable_encoder 대신 pydantic-core로 바로 직렬화하고,
+# 여기 적힌 필드만 내보내므로 ORM 객체나 dict에 딸려 온 내부 컬럼이 응답에 섞이지 않습니다.
+class Route(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    route_name: str
+    location: Optional[str] = None
+    time: Optional[str] = None
+    total_seats: Optional[int] = None
+
+
+class UserStatus(BaseModel):
+    status: str
+    user_id: int
+    name: Optional[str] = None
+    email: Optional[str] = None
+    points: Optional[int] = None
+    phone: Optional[str] = None
+    favorites: List[int]
+    hasSemesterPass: bool = False
+    passExpiryDate: Optional[str] = None
+
+
+class MessagePreview(BaseModel):
+    id: int
+    title: Optional[str] = None
+    preview: Optional[str] = None
+    sender_id: Optional[int] = None
+    is_read: int
+    created_at: Optional[datetime.datetime] = None
+
+
+class MessageDetail(BaseModel):
+    id: int
+    title: Optional[str] = None
+    content: Optional[str] = None
+    sender_id: Optional[int] = None
+    is_read: int
+    created_at: Optional[datetime.datetime] = None
+
+
+class UnreadCount(BaseModel):
+    status: str
+    unread: int
+
+
+class ReserveResult(BaseModel):
+    status: str
+    booking_id: int
+    service_date: Optional[datetime.date] = None
+    seat_number: int
+    remaining_points: int
+
+
+# 신청 폭주 노선은 예약 대신 ticket을 202로 돌려줍니다.
+# 처리 전에는 position(대기 순번)이, 처리 뒤에는 예약 결과(success) 또는 실패 사유(failed)가 채워집니다.
+class AdmissionTicket(BaseModel):
+    ticket_id: str
+    status: str
+    position: Optional[int] = None
+    booking_id: Optional[int] = None
+    service_date: Optional[datetime.date] = None
+    seat_number: Optional[int] = None
+    remaining_points: Optional[int] = None
+    status_code: Optional[int] = None
+    detail: Optional[str] = None
+
+
+class CancelResult(BaseModel):
+    status: str
+    booking_id: int
+    refunded_points: int
+    remaining_points: int
+
+
+class SeatCounts(BaseModel):
+    route_id: int
+    service_date: datetime.date
+    total_seats: int
+    reserved: int
+    available: int
+
+
+class ChargeResult(BaseModel):
+    status: str
+    new_balance: int
+
+
+class PointsEntry(BaseModel):
+    id: int
+    delta: int
+    balance_after: int
+    reason: str
+    ref_id: Optional[int] = None
+    created_at: Optional[datetime.datetime] = None
+
+
+class PassPurchaseResult(BaseModel):
+    status: str
+    pass_id: int
+    pass_type: str
+    price: int
+
+
+class PassInfo(BaseModel):
+    pass_id: int
+    pass_type: Optional[str] = None
+    status: Optional[str] = None
+    applied_at: Optional[datetime.datetime] = None
+    processed_at: Optional[datetime.datetime] = None
+    expires_at: Optional[datetime.datetime] = None
+    reason: Optional[str] = None
+
+
+class PassStatus(BaseModel):
+    status: str
+    has_pass: bool
+    expires_at: Optional[datetime.datetime] = None
+    passes: List[PassInfo]
+
+
+class BookingHistoryItem(BaseModel):
+    booking_id: int
+    route_id: Optional[int] = None
+    route_name: Optional[str] = None
+    status: Optional[str] = None
+    service_date: Optional[datetime.date] = None
+    seat_number: Optional[int] = None
+    booked_at: Optional[datetime.datetime] = None
+
+
+class OccupancyDay(BaseModel):
+    day: datetime.date
+    reserved: int
+    cancelled: int
+    total_seats: Optional[int] = None
+    occupancy: Optional[float] = None
+
+
+class RouteOccupancy(BaseModel):
+    route_id: int
+    route_name: Optional[str] = None
+    reserved: int
+    cancelled: int
+    days: int
+    peak_reserved: int
+    avg_occupancy: Optional[float] = None
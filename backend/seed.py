@@ -1,10 +1,20 @@
 import re
-from database import SessionLocal, engine
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+
+from database import SessionLocal, engine, dialect_insert
 import models
-from sqlalchemy import text
+import catalogue
+import migrations
 
-# 데이터베이스 테이블 생성
-models.Base.metadata.create_all(bind=engine)
+DEFAULT_TOTAL_SEATS = 45
+# 노선 이름 끝의 "(HH:MM)"이 출발 시간이고, 그 부분을 뺀 나머지가 장소입니다.
+TIME_PATTERN = re.compile(r"\((\d{2}:\d{2})\)")
+SYNC_FIELDS = ("location", "time", "total_seats")
 
 # 사용자가 제공한 전체 데이터 리스트
 shuttle_data_raw = [
@@ -41,50 +51,119 @@ shuttle_data_raw = [
     "하양(대구가톨릭대)역건너(11:45)"
 ]
 
-def seed_shuttle_data():
+def parse_routes(items):
+    """노선 이름(또는 {"route_name", "total_seats"} dict) 목록을 한 번 훑어 route_name 기준으로 중복을 제거한 행 목록으로 바꿉니다."""
+    rows = {}
+    for item in items:
+        if isinstance(item, dict):
+            name = (item.get("route_name") or "").strip()
+            seats = int(item.get("total_seats") or DEFAULT_TOTAL_SEATS)
+        else:
+            name, seats = item.strip(), DEFAULT_TOTAL_SEATS
+        if not name or name in rows:
+            continue
+        match = TIME_PATTERN.search(name)
+        rows[name] = {
+            "route_name": name,
+            "location": TIME_PATTERN.sub("", name).strip(),
+            "time": match.group(1) if match else None,
+            "total_seats": seats,
+        }
+    return list(rows.values())
+
+
+def load_timetable(path: str):
+    """CSV(route_name[, total_seats] 헤더) 또는 JSON(문자열/객체 배열) 시간표 파일을 읽습니다."""
+    with open(path, encoding="utf-8-sig") as f:
+        if os.path.splitext(path)[1].lower() == ".json":
+            return parse_routes(json.load(f))
+        return parse_routes(csv.DictReader(f))
+
+
+def diff_routes(db, rows):
+    """DB와 비교해 추가/변경할 행과 시간표에 없는 기존 노선을 반환합니다."""
+    existing = {
+        r.route_name: r
+        for r in db.query(
+            models.BusRoute.route_name, models.BusRoute.location, models.BusRoute.time, models.BusRoute.total_seats,
+        )
+    }
+    added, updated = [], []
+    for row in rows:
+        current = existing.get(row["route_name"])
+        if current is None:
+            added.append(row)
+        elif any(getattr(current, f) != row[f] for f in SYNC_FIELDS):
+            updated.append(row)
+    names = {row["route_name"] for row in rows}
+    # 시간표에서 빠진 노선은 예약/즐겨찾기가 걸려 있을 수 있어 지우지 않고 보고만 합니다.
+    missing = [name for name in existing if name not in names]
+    return {"added": added, "updated": updated, "unchanged": len(rows) - len(added) - len(updated), "missing": missing}
+
+
+def apply_diff(db, diff):
+    """추가/변경분을 route_name 충돌 시 갱신하는 upsert 한 번으로 반영하고 노선 버전을 올립니다. commit은 호출한 쪽이 합니다."""
+    rows = diff["added"] + diff["updated"]
+    if not rows:
+        return 0
+    insert = dialect_insert(db.get_bind())
+    stmt = insert(models.BusRoute)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["route_name"],
+        set_={f: stmt.excluded[f] for f in SYNC_FIELDS},
+    )
+    db.execute(stmt, rows)
+    # 실행 중인 API 서버의 노선 카탈로그가 새 데이터를 다시 읽도록 버전을 올립니다.
+    catalogue.bump_version(db)
+    return len(rows)
+
+
+def sync_routes(rows, dry_run: bool = False):
     db = SessionLocal()
     try:
-        print("🔄 노선 데이터 동기화를 시작합니다 (Upsert 방식)...")
-        
-        # 1. 현재 DB에 있는 모든 노선을 이름을 키로 가져옴
-        existing_routes = {r.route_name: r for r in db.query(models.BusRoute).all()}
-        
-        count_added = 0
-        count_updated = 0
-        
-        for item in shuttle_data_raw:
-            # 시간 및 장소 추출 로직
-            time_match = re.search(r"\((\d{2}:\d{2})\)", item)
-            extracted_time = time_match.group(1) if time_match else None
-            location_name = re.sub(r"\(\d{2}:\d{2}\)", "", item).strip()
-            
-            if item in existing_routes:
-                # 🌟 [Update] 이미 있는 노선이면 정보만 업데이트 (ID 유지)
-                route = existing_routes[item]
-                route.location = location_name
-                route.time = extracted_time
-                route.total_seats = 45
-                count_updated += 1
-            else:
-                # 🌟 [Insert] 없는 노선이면 새로 추가
-                new_route = models.BusRoute(
-                    route_name=item,
-                    location=location_name,
-                    time=extracted_time,
-                    total_seats=45
-                )
-                db.add(new_route)
-                count_added += 1
-        
-        db.commit()
-        print(f"✅ 동기화 완료: 업데이트 {count_updated}건, 신규 추가 {count_added}건.")
-        print("💡 사용자의 즐겨찾기 및 예약 데이터가 안전하게 보존되었습니다.")
-        
-    except Exception as e:
-        print(f"❌ 오류 발생: {e}")
+        start = time.perf_counter()
+        diff = diff_routes(db, rows)
+        if not dry_run:
+            apply_diff(db, diff)
+            db.commit()
+        diff["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return diff
+    except Exception:
         db.rollback()
+        raise
     finally:
         db.close()
 
+
+def print_report(diff, dry_run: bool):
+    print(("🔍 변경 예정" if dry_run else "✅ 동기화 완료") + f" ({diff['elapsed_ms']}ms)")
+    for row in diff["added"]:
+        print(f"  + {row['route_name']}")
+    for row in diff["updated"]:
+        print(f"  ~ {row['route_name']} ({row['location']}, {row['time']}, {row['total_seats']}석)")
+    for name in diff["missing"]:
+        print(f"  ? {name} (시간표에 없음, 유지)")
+    print(f"추가 {len(diff['added'])}건, 변경 {len(diff['updated'])}건, 그대로 {diff['unchanged']}건, 시간표에 없음 {len(diff['missing'])}건")
+
+
+def seed_shuttle_data(path: str = None, dry_run: bool = False):
+    migrations.migrate(engine)
+    rows = load_timetable(path) if path else parse_routes(shuttle_data_raw)
+    print("🔄 노선 데이터 동기화를 시작합니다 (Upsert 방식)...")
+    try:
+        diff = sync_routes(rows, dry_run=dry_run)
+    except Exception as e:
+        print(f"❌ 오류 발생: {e}")
+        return None
+    print_report(diff, dry_run)
+    if not dry_run:
+        print("💡 사용자의 즐겨찾기 및 예약 데이터가 안전하게 보존되었습니다.")
+    return diff
+
+
 if __name__ == "__main__":
-    seed_shuttle_data()
+    parser = argparse.ArgumentParser(description="노선 시간표를 DB와 동기화합니다.")
+    parser.add_argument("timetable", nargs="?", help="CSV 또는 JSON 시간표 파일 (없으면 내장 목록 사용)")
+    parser.add_argument("--dry-run", action="store_true", help="DB를 바꾸지 않고 차이만 출력")
+    args = parser.parse_args()
+    sys.exit(0 if seed_shuttle_data(args.timetable, args.dry_run) is not None else 1)
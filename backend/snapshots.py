@@ -0,0 +1,102 @@
+import os
+import datetime
+from typing import Optional
+
+from sqlalchemy import select, func
+
+import models
+from cache import TTLCache
+
+# 사용자 상태(포인트, 즐겨찾기)를 캐시해 두는 시간(초). 쓰기 API는 커밋 후 바로 무효화합니다.
+USER_SNAPSHOT_TTL = float(os.getenv("USER_SNAPSHOT_TTL", "5"))
+USER_SNAPSHOT_SIZE = int(os.getenv("USER_SNAPSHOT_SIZE", "10000"))
+
+cache = TTLCache(maxsize=USER_SNAPSHOT_SIZE, ttl=USER_SNAPSHOT_TTL)
+
+
+def _pass_expiry():
+    P = models.SemesterPass
+    return (
+        select(func.max(P.expires_at))
+        .where(P.user_id == models.User.id, P.status == "approved", P.expires_at > datetime.datetime.now())
+        .scalar_subquery()
+        .label("pass_expires_at")
+    )
+
+
+def _query(*criteria):
+    """사용자와 즐겨찾기 노선 id(LEFT JOIN), 사용 중인 정기권 만료일(서브쿼리)을 쿼리 한 번으로 읽습니다."""
+    return select(
+        models.User.id, models.User.name, models.User.email, models.User.points,
+        models.User.phone, models.User.hashed_password, models.Favorite.route_id, _pass_expiry(),
+    ).outerjoin(models.Favorite, models.Favorite.user_id == models.User.id).where(*criteria)
+
+
+def _to_snapshot(rows):
+    """쿼리 결과 행들을 (snapshot, hashed_password)로 바꿉니다."""
+    if not rows:
+        return None, None
+    first = rows[0]
+    snapshot = {
+        "user_id": first.id,
+        "name": first.name,
+        "email": first.email,
+        "points": first.points,
+        "phone": first.phone,
+        "favorites": [r.route_id for r in rows if r.route_id is not None],
+        # 프론트엔드(PointAndPass)가 읽는 이름 그대로 내보냅니다.
+        "hasSemesterPass": first.pass_expires_at is not None,
+        "passExpiryDate": first.pass_expires_at.date().isoformat() if first.pass_expires_at else None,
+    }
+    return snapshot, first.hashed_password
+
+
+def _fetch(db, *criteria):
+    return _to_snapshot(db.execute(_query(*criteria)).all())
+
+
+async def _fetch_async(db, *criteria):
+    return _to_snapshot((await db.execute(_query(*criteria))).all())
+
+
+def get(db, user_id: int) -> Optional[dict]:
+    snapshot = cache.get(user_id)
+    if snapshot is None:
+        snapshot, _ = _fetch(db, models.User.id == user_id)
+        if snapshot is not None:
+            cache.set(user_id, snapshot)
+    return snapshot
+
+
+def authenticate(db, email: str, password: str) -> Optional[dict]:
+    """로그인은 항상 DB에서 확인하고, 성공하면 그 결과로 캐시를 채웁니다."""
+    snapshot, hashed_password = _fetch(db, models.User.email == email)
+    if snapshot is None or hashed_password != password:
+        return None
+    cache.set(snapshot["user_id"], snapshot)
+    return snapshot
+
+
+async def get_async(db, user_id: int) -> Optional[dict]:
+    snapshot = cache.get(user_id)
+    if snapshot is None:
+        snapshot, _ = await _fetch_async(db, models.User.id == user_id)
+        if snapshot is not None:
+            cache.set(user_id, snapshot)
+    return snapshot
+
+
+async def authenticate_async(db, email: str, password: str) -> Optional[dict]:
+    snapshot, hashed_password = await _fetch_async(db, models.User.email == email)
+    if snapshot is None or hashed_password != password:
+        return None
+    cache.set(snapshot["user_id"], snapshot)
+    return snapshot
+
+
+def invalidate(user_id: int):
+    cache.pop(user_id)
+
+
+def stats():
+    return cache.stats()
@@ -0,0 +1,52 @@
+"""예전 DB(shuttle.db)를 migrations.migrate로 올린 뒤 공지를 보내고, 쪽지 목록을 끝까지 넘겨 빠지는 쪽지가 없는지 확인합니다.
+
+예전 messages.created_at에는 기본값이 없어서 공지가 NULL 시각으로 들어가 (created_at, id) 페이지 넘김에서 빠졌습니다.
+
+    cd backend && python -m pytest -q tests
+"""
+import os
+import sys
+import shutil
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(tempfile.mkdtemp(), "legacy.db")
+shutil.copy(os.path.join(BACKEND, "shuttle.db"), DB_PATH)
+os.environ["DATABASE_URL"] = "sqlite:///" + DB_PATH
+sys.path.insert(0, BACKEND)
+
+from sqlalchemy import select, func  # noqa: E402
+
+import inbox  # noqa: E402
+import models  # noqa: E402
+import migrations  # noqa: E402
+from database import engine, SessionLocal  # noqa: E402
+
+
+def test_broadcast_pages_to_the_end_on_migrated_db():
+    migrations.migrate(engine)
+    db = SessionLocal()
+    try:
+        users = [uid for (uid,) in db.execute(select(models.User.id).order_by(models.User.id))]
+        assert users
+        sent = inbox.broadcast(db, "공지", "운행 시간이 바뀝니다.", audience="everyone")
+        sent += inbox.send_bulk(db, users, "안내", "정기권 신청 결과 안내")
+        db.commit()
+        assert sent == 2 * len(users)
+        assert db.execute(select(func.count()).where(models.Message.created_at.is_(None))).scalar() == 0
+
+        for uid in users:
+            expected = db.execute(select(models.Message.id).where(models.Message.receiver_id == uid)).scalars().all()
+            seen, cursor = [], None
+            while True:
+                items, cursor = inbox.list_page(db, uid, cursor, limit=5)
+                seen += [item["id"] for item in items]
+                if cursor is None:
+                    break
+            assert sorted(seen) == sorted(expected)
+            assert len(seen) == len(set(seen))
+            assert inbox.unread_count(db, uid) == db.execute(
+                select(func.count()).where(models.Message.receiver_id == uid, models.Message.is_read == 0)
+            ).scalar()
+    finally:
+        db.close()
@@ -0,0 +1,112 @@
+import heapq
+import threading
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+from typing import Optional
+
+import catalogue
+
+MAX_DEPARTURES = 50
+
+
+def to_minutes(hhmm: Optional[str]) -> Optional[int]:
+    """HH:MM 문자열을 자정 기준 분으로 바꿉니다. 형식이 틀리면 None."""
+    try:
+        h, m = hhmm.split(":")
+        h, m = int(h), int(m)
+    except (AttributeError, ValueError):
+        return None
+    if not (0 <= h < 24 and 0 <= m < 60):
+        return None
+    return h * 60 + m
+
+
+def split_stops(location: Optional[str]):
+    """노선 장소 "출발지-도착지"를 (출발지, 도착지)로 나눕니다. 도착지가 없으면 None."""
+    origin, _, destination = (location or "").partition("-")
+    return origin.strip(), (destination.strip() or None)
+
+
+class StopDepartures:
+    __slots__ = ("minutes", "routes")
+
+    def __init__(self, minutes, routes):
+        self.minutes = minutes
+        self.routes = routes
+
+
+# --- [시간표 인덱스] ---
+# 노선 이름의 출발 시간과 장소("출발지-도착지")로 정류장(출발지)별 출발 시각을 분 단위 정렬 배열로 만들어 두고,
+# "다음 출발편" 조회는 이진 탐색 한 번으로 찾습니다. 노선 카탈로그 버전이 바뀌면 다시 만듭니다.
+class TimetableIndex:
+    def __init__(self):
+        self.version = None
+        self.stops = {}
+        self._source = None
+        self._lock = threading.Lock()
+
+    def build(self, rows, version=None):
+        entries = {}
+        for r in rows:
+            minutes = to_minutes(r["time"])
+            if minutes is None:
+                continue
+            origin, destination = split_stops(r["location"])
+            if not origin:
+                continue
+            entries.setdefault(origin, []).append((minutes, r["id"], {
+                "route_id": r["id"],
+                "route_name": r["route_name"],
+                "stop": origin,
+                "destination": destination,
+                "time": r["time"],
+            }))
+        stops = {}
+        for origin, items in entries.items():
+            items.sort(key=lambda x: (x[0], x[1]))
+            stops[origin] = StopDepartures(array("H", (m for m, _, _ in items)), [d for _, _, d in items])
+        self.stops = stops
+        self.version = version
+
+    def refresh(self, db):
+        cat = catalogue.routes
+        cat.refresh(db)
+        if self._source is cat.rows:
+            return
+        with self._lock:
+            if self._source is not cat.rows:
+                rows = cat.rows
+                self.build(rows, cat.version)
+                self._source = rows
+
+    def _matching(self, stop: str):
+        """정확히 같은 정류장이 있으면 그것만, 없으면 이름에 stop이 들어간 정류장을 모두 돌려줍니다."""
+        if stop in self.stops:
+            return [self.stops[stop]]
+        return [s for name, s in self.stops.items() if stop in name]
+
+    def next_departures(self, stop: str, after: int, limit: int = 5):
+        """stop에서 after(자정 기준 분) 이후(같은 분 포함) 출발하는 편을 시간순으로 최대 limit개 반환합니다."""
+        limit = max(1, min(limit, MAX_DEPARTURES))
+        streams = []
+        for s in self._matching(stop):
+            i = bisect_left(s.minutes, after)
+            streams.append(zip(s.minutes[i:i + limit], s.routes[i:i + limit]))
+        result = []
+        for minutes, dep in heapq.merge(*streams, key=lambda x: x[0]):
+            result.append({**dep, "minutes_until": minutes - after})
+            if len(result) == limit:
+                break
+        return result
+
+    def stop_names(self):
+        return sorted(self.stops)
+
+
+def now_minutes() -> int:
+    now = datetime.now()
+    return now.hour * 60 + now.minute
+
+
+index = TimetableIndex()
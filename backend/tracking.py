@@ -0,0 +1,152 @@
+import os
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import update, bindparam
+
+import models
+import catalogue
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# 메모리에 쌓인 위치를 DB(bus_routes)에 몰아서 쓰는 주기(초)
+TRACKING_FLUSH_INTERVAL = float(os.getenv("TRACKING_FLUSH_INTERVAL", "3"))
+
+
+class Position:
+    __slots__ = ("lat", "lng", "updated_at", "is_running")
+
+    def __init__(self, lat: float, lng: float, updated_at: datetime, is_running: int = 1):
+        self.lat = lat
+        self.lng = lng
+        self.updated_at = updated_at
+        self.is_running = is_running
+
+    def to_dict(self, route_id: int):
+        return {
+            "route_id": route_id,
+            "lat": self.lat,
+            "lng": self.lng,
+            "is_running": self.is_running,
+            "last_updated": self.updated_at.isoformat(),
+        }
+
+
+# --- [실시간 버스 위치 저장소] ---
+# 노선 id별 최신 위치 하나만 메모리에 들고 있고, 바뀐 노선 id를 dirty로 표시해 두었다가
+# flush()에서 한 번의 bulk UPDATE로 bus_routes에 반영합니다. 조회는 항상 메모리에서 합니다.
+# 카탈로그(catalogue.routes)에 없는 노선 id의 ping은 받지 않습니다.
+class PositionStore:
+    def __init__(self, routes=catalogue.routes):
+        self.routes = routes
+        self._positions = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        # 위치가 실제로 바뀌었을 때만 (route_id, Position)으로 호출됩니다.
+        self.listeners = []
+
+    def update(self, route_id: int, lat: float, lng: float, updated_at: Optional[datetime] = None, is_running: int = 1) -> bool:
+        """위치를 갱신합니다. 없는 노선이거나 이미 가진 값보다 오래된 ping이면 무시하고 False를 반환합니다."""
+        if not self.routes.has(route_id):
+            return False
+        updated_at = updated_at or datetime.now()
+        if updated_at.tzinfo is not None:
+            # bus_routes.last_updated는 naive 로컬 시각이므로 맞춰서 저장합니다.
+            updated_at = updated_at.astimezone().replace(tzinfo=None)
+        with self._lock:
+            current = self._positions.get(route_id)
+            if current is not None and current.updated_at > updated_at:
+                return False
+            pos = Position(lat, lng, updated_at, is_running)
+            self._positions[route_id] = pos
+            self._dirty.add(route_id)
+        changed = current is None or (current.lat, current.lng, current.is_running) != (lat, lng, is_running)
+        if changed:
+            for listener in self.listeners:
+                listener(route_id, pos)
+        return True
+
+    def get(self, route_id: int) -> Optional[Position]:
+        return self._positions.get(route_id)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._positions)
+
+    def load(self, db):
+        """서버 시작 시 DB에 남아 있는 마지막 위치로 메모리를 채웁니다."""
+        rows = db.query(
+            models.BusRoute.id, models.BusRoute.current_lat, models.BusRoute.current_lng,
+            models.BusRoute.last_updated, models.BusRoute.is_running,
+        ).filter(models.BusRoute.current_lat.isnot(None)).all()
+        with self._lock:
+            for route_id, lat, lng, updated_at, is_running in rows:
+                if route_id not in self._positions:
+                    self._positions[route_id] = Position(lat, lng, updated_at or datetime.now(), is_running or 0)
+        return len(rows)
+
+    def flush(self, session_factory=SessionLocal) -> int:
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            rows = [{
+                "route_id": route_id,
+                "current_lat": p.lat,
+                "current_lng": p.lng,
+                "last_updated": p.updated_at,
+                "is_running": p.is_running,
+            } for route_id, p in ((r, self._positions[r]) for r in dirty)]
+        if not rows:
+            return 0
+
+        db = session_factory()
+        try:
+            # 파라미터 목록을 넘기면 UPDATE 한 문장을 executemany 한 번으로 실행합니다.
+            # 없는 노선 id는 조용히 0건 갱신으로 끝나도록 ORM bulk 대신 Core 문장을 씁니다.
+            table = models.BusRoute.__table__
+            db.execute(
+                update(table).where(table.c.id == bindparam("route_id")),
+                rows,
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._dirty.update(dirty)
+            raise
+        finally:
+            db.close()
+        return len(rows)
+
+
+store = PositionStore()
+_flusher: Optional[asyncio.Task] = None
+
+
+async def _flush_loop():
+    while True:
+        await asyncio.sleep(TRACKING_FLUSH_INTERVAL)
+        try:
+            await asyncio.to_thread(store.flush)
+        except Exception as e:
+            logger.warning(f"버스 위치 flush 실패: {e}")
+
+
+def start_flusher():
+    global _flusher
+    if _flusher is None:
+        _flusher = asyncio.create_task(_flush_loop())
+
+
+async def stop_flusher():
+    global _flusher
+    if _flusher is not None:
+        _flusher.cancel()
+        _flusher = None
+    try:
+        await asyncio.to_thread(store.flush)
+    except Exception as e:
+        logger.warning(f"버스 위치 flush 실패: {e}")
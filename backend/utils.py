@@ -1,16 +1,20 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-import models, utils, datetime, database, random
+import os
+import models, utils, datetime, database, codes, mailer, migrations, points, schemas, occupancy
 from database import SessionLocal, engine
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr
 
-# 테이블 생성
-models.Base.metadata.create_all(bind=engine)
-
 app = FastAPI()
 
+# 테이블 생성은 import 시점이 아니라 서버 시작 시에 합니다. (AUTO_MIGRATE=0이면 건너뜀)
+@app.on_event("startup")
+def startup():
+    if os.getenv("AUTO_MIGRATE", "1") == "1":
+        migrations.migrate(engine)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -28,8 +32,7 @@ def get_db():
         db.close()
 
 # --- [인증 데이터 스토어] ---
-# 실제 서비스 시에는 Redis나 DB 테이블 사용 권장
-verification_codes = {}
+# 인증번호는 codes.store(CODE_STORE=db면 verification_codes 테이블)에 만료 시간과 함께 저장됩니다.
 
 # --- [기능 1] 학교 메일 인증번호 발송 ---
 @app.post("/auth/send-code")
@@ -37,24 +40,26 @@ def send_verification_code(email: str):
     if not email.endswith("@cu.ac.kr"):
         raise HTTPException(status_code=400, detail="대구가톨릭대 메일(@cu.ac.kr)만 가능합니다.")
     
-    code = str(random.randint(100000, 999999))
-    verification_codes[email] = code
-    
-    # 실제 메일 발송 로직 대신 터미널 출력으로 대체 (테스트용)
-    print(f"📧 [메일 발송] To: {email} | Code: {code}")
+    # 인증번호는 메일로만 보냅니다. (응답/로그에 남기지 않음)
+    try:
+        sent = codes.issue_and_send(email)
+    except mailer.MailError:
+        raise HTTPException(status_code=503, detail="인증번호 메일을 보낼 수 없습니다. 잠시 후 다시 시도해주세요.")
+    if not sent:
+        raise HTTPException(status_code=429, detail="인증번호 요청이 너무 많습니다. 잠시 후 다시 시도해주세요.")
     
     return {"message": "인증번호가 발송되었습니다."}
 
 # --- [기능 2] 회원가입 ---
 @app.post("/auth/signup")
 def signup(email: str, password: str, name: str, code: str, db: Session = Depends(get_db)):
-    if verification_codes.get(email) != code:
-        raise HTTPException(status_code=400, detail="인증번호가 일치하지 않습니다.")
-    
     existing_user = db.query(models.User).filter(models.User.email == email).first()
     if existing_user:
         raise HTTPException(status_code=400, detail="이미 존재하는 계정입니다.")
     
+    if not codes.store.consume(email, code):
+        raise HTTPException(status_code=400, detail="인증번호가 일치하지 않습니다.")
+    
     new_user = models.User(
         email=email,
         hashed_password=password, # 실제로는 해싱 권장
@@ -81,7 +86,7 @@ def login(email: str, password: str, db: Session = Depends(get_db)):
 # --- [기능 4] 비밀번호 재설정 ---
 @app.post("/auth/reset-password")
 def reset_password(email: str, new_password: str, code: str, db: Session = Depends(get_db)):
-    if verification_codes.get(email) != code:
+    if not codes.store.consume(email, code):
         raise HTTPException(status_code=400, detail="인증번호가 일치하지 않습니다.")
     
     user = db.query(models.User).filter(models.User.email == email).first()
@@ -93,19 +98,21 @@ def reset_password(email: str, new_password: str, code: str, db: Session = Depen
     return {"message": "비밀번호가 성공적으로 변경되었습니다."}
 
 # --- [기존 노선 및 예약 API] ---
-@app.get("/routes")
+@app.get("/routes", response_model=List[schemas.Route])
 def get_all_routes(db: Session = Depends(get_db)):
     return db.query(models.BusRoute).all()
 
 @app.post("/bookings/reserve")
 def reserve_bus(route_id: int, user_id: int, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not user or user.points < 3000:
+    balance = points.change_balance(db, user_id, -3000)
+    if balance is None:
         raise HTTPException(status_code=400, detail="포인트가 부족하거나 유저가 없습니다.")
     
-    user.points -= 3000
-    new_booking = models.Booking(user_id=user_id, route_id=route_id, booked_at=datetime.datetime.now())
+    new_booking = models.Booking(user_id=user_id, route_id=route_id, booked_at=datetime.datetime.now(), service_date=datetime.date.today())
     db.add(new_booking)
+    db.flush()
+    points.append(db, user_id, -3000, balance, "reserve", new_booking.id)
+    occupancy.record_reserve(db, route_id, new_booking.service_date)
     db.commit()
     return {"message": "예약 완료"}
 
@@ -24,7 +24,12 @@ export const MessageDetail = () => {
       try {
         setLoading(true);
         // 상세 정보 조회 (백엔드에서 이 API 호출 시 읽음 처리 로직이 실행됨)
-        const response = await axios.get<MessageDetail>(`${BACKEND_URL}/api/messages/${id}`);
+        const user = JSON.parse(localStorage.getItem("user") || "{}");
+        const userId = user.user_id || user.id;
+        // 받은 사람 본인의 쪽지만 조회할 수 있습니다.
+        const response = await axios.get<MessageDetail>(`${BACKEND_URL}/api/messages/${id}`, {
+          params: { user_id: userId }
+        });
         setMsg(response.data);
       } catch (err) {
         console.error("쪽지 상세 로드 실패:", err);
@@ -7,7 +7,7 @@ import axios from "axios";
 interface Message {
   id: number;
   title: string;
-  content: string;
+  preview: string; // 목록 API는 본문 대신 앞부분 미리보기만 내려줍니다
   is_read: number; // 백엔드에서 0 또는 1로 관리하므로 number로 변경
   created_at: string;
 }
@@ -17,12 +17,16 @@ const BACKEND_URL = "https://dcu-shuttle-bus.onrender.com";
 export const Messages = () => {
   const [messages, setMessages] = useState<Message[]>([]);
   const [loading, setLoading] = useState<boolean>(true);
+  // ✅ 다음 페이지 커서 (서버가 X-Next-Cursor 헤더로 내려주고, 마지막 페이지면 없음)
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
   const navigate = useNavigate();
 
-  // ✅ 쪽지 목록 가져오기 함수
-  const fetchMessages = useCallback(async () => {
+  // ✅ 쪽지 목록 가져오기 함수 (cursor가 있으면 그 다음 페이지를 이어 붙임)
+  const fetchMessages = useCallback(async (cursor?: string) => {
     try {
-      setLoading(true);
+      if (cursor) setLoadingMore(true);
+      else setLoading(true);
       const user = JSON.parse(localStorage.getItem("user") || "{}");
       const userId = user.user_id || user.id;
 
@@ -32,16 +36,19 @@ export const Messages = () => {
       }
 
       const response = await axios.get<Message[]>(`${BACKEND_URL}/api/messages`, {
-        params: { user_id: userId }
+        params: cursor ? { user_id: userId, cursor } : { user_id: userId }
       });
 
       if (response.data) {
-        setMessages(response.data);
+        setMessages((prev) => (cursor ? [...prev, ...response.data] : response.data));
       }
+      const next = response.headers["x-next-cursor"];
+      setNextCursor(next ? String(next) : null);
     } catch (err) {
       console.error("쪽지 목록 로드 실패:", err);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   }, []);
 
@@ -102,7 +109,7 @@ export const Messages = () => {
                 </div>
                 {/* 긴 내용은 한 줄로 줄임표 처리 */}
                 <p className="text-sm text-gray-400 line-clamp-1">
-                  {msg.content}
+                  {msg.preview}
                 </p>
               </div>
 
@@ -117,6 +124,19 @@ export const Messages = () => {
           </div>
         )}
       </div>
+
+      {/* 이전 쪽지 더 보기 */}
+      {nextCursor && (
+        <div className="mx-4 mt-4">
+          <button
+            onClick={() => fetchMessages(nextCursor)}
+            disabled={loadingMore}
+            className="w-full py-4 bg-white rounded-[2rem] shadow-sm border border-gray-100 text-sm font-bold text-gray-500 active:bg-gray-50 disabled:opacity-50"
+          >
+            {loadingMore ? "불러오는 중..." : "이전 쪽지 더 보기"}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
@@ -12,6 +12,20 @@ interface UserStatus {
   passExpiryDate?: string;
 }
 
+// /api/pass/status의 신청 내역 (최신순)
+interface PassInfo {
+  pass_id: number;
+  pass_type?: string;
+  status?: string;
+  applied_at?: string;
+  reason?: string | null;
+}
+
+interface PassStatus {
+  has_pass: boolean;
+  passes: PassInfo[];
+}
+
 interface PendingPayment {
   payment_id: string;
   amount: number;
@@ -33,6 +47,7 @@ export const PointAndPass = () => {
   const [expiryDate, setExpiryDate] = useState<string | undefined>("");
   const [loading, setLoading] = useState<boolean>(true);
   const [pendingPayment, setPendingPayment] = useState<PendingPayment | null>(null);
+  const [latestPass, setLatestPass] = useState<PassInfo | null>(null);
   
   // ✅ TS6133 에러 해결: 사용하지 않는 timeLeft 변수를 가상계좌 UI에서 사용함
   const [timeLeft, setTimeLeft] = useState<number>(0);
@@ -62,9 +77,43 @@ export const PointAndPass = () => {
     }
   }, []);
 
+  // ✅ 정기권 신청은 작업자가 처리하므로, 최근 신청의 처리 상태(대기/승인/거절)를 따로 가져옴
+  const fetchPassStatus = useCallback(async (): Promise<PassInfo | null> => {
+    try {
+      const user = JSON.parse(localStorage.getItem("user") || "{}");
+      const userId = user.user_id || user.id;
+
+      if (!userId) return null;
+
+      const response = await axios.get<PassStatus>(
+        `${BACKEND_URL}/api/pass/status`,
+        { params: { user_id: userId } }
+      );
+      const latest = response.data.passes[0] ?? null;
+      setLatestPass(latest);
+      return latest;
+    } catch (err) {
+      console.error("정기권 신청 상태 조회 실패:", err);
+      return null;
+    }
+  }, []);
+
   useEffect(() => {
     fetchUserStatus();
-  }, [fetchUserStatus]);
+    fetchPassStatus();
+  }, [fetchUserStatus, fetchPassStatus]);
+
+  const isPassPending = latestPass?.status === "pending" || latestPass?.status === "processing";
+
+  // 처리 중인 신청이 있으면 결과가 나올 때까지 3초마다 다시 확인하고, 끝나면 포인트/정기권 정보를 새로 받음
+  useEffect(() => {
+    if (!isPassPending) return;
+    const timer = setTimeout(async () => {
+      const latest = await fetchPassStatus();
+      if (latest?.status === "approved") await fetchUserStatus();
+    }, 3000);
+    return () => clearTimeout(timer);
+  }, [isPassPending, latestPass, fetchPassStatus, fetchUserStatus]);
 
   useEffect(() => {
     if (!pendingPayment) return;
@@ -125,11 +174,12 @@ export const PointAndPass = () => {
 
   const handlePurchasePass = async () => {
     if (hasPass) return alert("이미 활성화된 정기권이 있습니다.");
+    if (isPassPending) return alert("처리 중인 정기권 신청이 있습니다.");
     if (points < SEMESTER_PASS_PRICE) {
       return alert(`포인트가 부족합니다. (필요 포인트: ${SEMESTER_PASS_PRICE.toLocaleString()}P)`);
     }
 
-    if (!window.confirm(`정기권을 신청하시겠습니까?\n${SEMESTER_PASS_PRICE.toLocaleString()}P가 차감됩니다.`)) return;
+    if (!window.confirm(`정기권을 신청하시겠습니까?\n승인되면 ${SEMESTER_PASS_PRICE.toLocaleString()}P가 차감됩니다.`)) return;
 
     try {
       const user = JSON.parse(localStorage.getItem("user") || "{}");
@@ -140,8 +190,9 @@ export const PointAndPass = () => {
         pass_type: "SEMESTER"
       });
 
-      alert("정기권 신청이 완료되었습니다!");
-      await fetchUserStatus();
+      // 신청은 접수만 되고 정원/포인트 확인은 잠시 뒤 처리됨 (결과는 이 화면과 쪽지함에서 확인)
+      alert("정기권 신청이 접수되었습니다.\n처리 결과는 잠시 후 이 화면과 쪽지함에서 확인할 수 있습니다.");
+      await fetchPassStatus();
     } catch (err) {
       const axiosError = err as AxiosError<BackendError>;
       alert(axiosError.response?.data?.detail || "신청 중 에러가 발생했습니다.");
@@ -204,13 +255,27 @@ export const PointAndPass = () => {
           </div>
         ) : (
           <div className="space-y-4">
-            <div className="bg-gray-50 p-4 rounded-2xl border border-dashed border-gray-200">
-              <p className="text-gray-500 text-sm text-center">보유 중인 정기권이 없습니다.</p>
-            </div>
+            {isPassPending ? (
+              <div className="bg-yellow-50 p-4 rounded-2xl border border-yellow-100">
+                <p className="text-yellow-700 text-sm font-bold text-center animate-pulse">정기권 신청을 처리하고 있습니다...</p>
+              </div>
+            ) : latestPass?.status === "rejected" ? (
+              <div className="bg-red-50 p-4 rounded-2xl border border-red-100">
+                <p className="text-red-600 text-sm font-bold text-center">최근 정기권 신청이 거절되었습니다.</p>
+                {latestPass.reason && (
+                  <p className="text-red-500 text-xs text-center mt-1">사유: {latestPass.reason}</p>
+                )}
+              </div>
+            ) : (
+              <div className="bg-gray-50 p-4 rounded-2xl border border-dashed border-gray-200">
+                <p className="text-gray-500 text-sm text-center">보유 중인 정기권이 없습니다.</p>
+              </div>
+            )}
             
             <button
               onClick={handlePurchasePass}
-              className="w-full py-4 bg-gray-900 text-white rounded-2xl font-black text-lg active:scale-95 transition-all shadow-lg"
+              disabled={isPassPending}
+              className="w-full py-4 bg-gray-900 text-white rounded-2xl font-black text-lg active:scale-95 transition-all shadow-lg disabled:opacity-40"
             >
               학기권 신청하기 ({SEMESTER_PASS_PRICE.toLocaleString()}P)
             </button>